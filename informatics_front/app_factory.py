@@ -4,7 +4,9 @@ from flask import Flask
 
 from informatics_front import cli
 from informatics_front.model import db
-from informatics_front.plugins import gmail, migrate, internal_rmatics, tokenizer
+from informatics_front.plugins import gmail, migrate, internal_rmatics, tokenizer, executor, monitor_cacher, \
+    monitor_state_cacher, monitor_snapshot_cacher, monitor_streamer, group_index, \
+    async_internal_rmatics, event_loop, run_protocol_cacher, protocol_visibility_index
 from informatics_front.utils.auth.middleware import authenticate
 from informatics_front.utils.error_handlers import register_error_handlers
 from informatics_front.utils.tokenizer.handlers import map_action_routes
@@ -44,8 +46,18 @@ def create_app(config):
     db.init_app(app)
     migrate.init_app(app, db)
     internal_rmatics.init_app(app)
+    async_internal_rmatics.init_app(app)
+    event_loop.init_app(app)
     tokenizer.init_app(app)
     gmail.init_app(app)
+    executor.init_app(app)
+    monitor_cacher.init_app(app)
+    monitor_state_cacher.init_app(app)
+    monitor_snapshot_cacher.init_app(app)
+    run_protocol_cacher.init_app(app)
+    monitor_streamer.init_app(app)
+    group_index.init_app(app)
+    protocol_visibility_index.init_app(app)
 
     # register password change action to app
     map_action_routes(app, (
@@ -63,5 +75,6 @@ def create_app(config):
     app.register_blueprint(monitor_blueprint)
 
     app.cli.add_command(cli.test)
+    app.cli.add_command(cli.benchmark_monitor)
 
     return app
\ No newline at end of file
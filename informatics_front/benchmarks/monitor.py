@@ -0,0 +1,233 @@
+import datetime
+import random
+import time
+import tracemalloc
+from collections import namedtuple
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
+
+from dateutil.tz import UTC
+
+from informatics_front.model.contest.monitor import WorkshopMonitor
+from informatics_front.utils.enums import WorkshopMonitorType
+from informatics_front.utils.group_index import GroupMember
+from informatics_front.utils.response import jsonify
+from informatics_front.utils.run import EjudgeStatuses
+from informatics_front.view.course.monitor import monitor as monitor_view
+from informatics_front.view.course.monitor.monitor import WorkshopMonitorApi, MonitorData, \
+    VectorizedIOIResultMaker, VectorizedLightACMResultMaker, VectorizedACMResultMaker
+from informatics_front.view.course.monitor.monitor_preprocessor import MonitorPreprocessor, IOIResultMaker, \
+    LightACMResultMaker, ACMResultMaker
+from informatics_front.view.course.monitor.rows import MonitorContest, MonitorProblem, MonitorStatement
+from informatics_front.view.course.monitor.serializers.monitor import monitor_schema
+
+START_TIME = datetime.datetime(2019, 7, 1, 10, 0)
+
+DEFAULT_STATUS_MIX = {
+    EjudgeStatuses.OK: 3,
+    EjudgeStatuses.WA: 4,
+    EjudgeStatuses.TL: 1,
+    EjudgeStatuses.CE: 1,
+    EjudgeStatuses.PARTIAL: 2,
+    EjudgeStatuses.IGNORED: 0.2,
+    EjudgeStatuses.RUNNING: 0.1,
+}
+
+# Vectorized result makers are None without NumPy and are not measured then
+RESULT_MAKERS = {
+    WorkshopMonitorType.IOI: (IOIResultMaker, VectorizedIOIResultMaker),
+    WorkshopMonitorType.LightACM: (LightACMResultMaker, VectorizedLightACMResultMaker),
+    WorkshopMonitorType.ACM: (ACMResultMaker, VectorizedACMResultMaker),
+}
+
+StageResult = namedtuple('StageResult', 'name best mean items peak_memory')
+
+
+class SyntheticWorkshop:
+    """ Workshop with generated contests, users and rmatics monitor payloads
+
+    Every contest has `problems` problems, every user makes
+    from 1 to 2 * `runs_per_cell` - 1 runs for every problem
+    with statuses picked by weights of `status_mix`.
+    """
+
+    def __init__(self,
+                 contests: int = 3,
+                 users: int = 300,
+                 problems: int = 10,
+                 runs_per_cell: int = 3,
+                 status_mix: Dict[EjudgeStatuses, float] = None,
+                 virtual: bool = False,
+                 seed: int = 0):
+        self.random = random.Random(seed)
+        self.status_mix = status_mix or DEFAULT_STATUS_MIX
+        self.runs_per_cell = runs_per_cell
+
+        self.users = [GroupMember(user_id, f'User {user_id}', 'Synthetic', '', '')
+                      for user_id in range(1, users + 1)]
+        self.contests = [self._make_contest(contest_id, problems, virtual)
+                         for contest_id in range(1, contests + 1)]
+        self.start_times = self._make_start_times() if virtual else {}
+        self.payloads = {contest.id: self._make_payload(contest) for contest in self.contests}
+
+    @property
+    def user_ids(self) -> List[int]:
+        return [user.id for user in self.users]
+
+    @property
+    def runs_count(self) -> int:
+        return sum(len(problem_data['runs'])
+                   for payload in self.payloads.values()
+                   for problem_data in payload)
+
+    def _make_contest(self, contest_id: int, problems: int, virtual: bool) -> MonitorContest:
+        first_problem_id = contest_id * 1000
+        statement = MonitorStatement(contest_id, f'Contest {contest_id}', '',
+                                     [MonitorProblem(first_problem_id + i, f'Problem {i}', i + 1)
+                                      for i in range(problems)])
+        return MonitorContest(id=contest_id, workshop_id=1, position=contest_id,
+                              time_start=START_TIME, time_stop=None,
+                              is_virtual=virtual, virtual_duration=datetime.timedelta(hours=5),
+                              created_at=START_TIME, statement=statement, languages=[])
+
+    def _make_start_times(self) -> Dict[Tuple[int, int], int]:
+        start_times = {}
+        for contest in self.contests:
+            for user_id in self.user_ids:
+                start_time = START_TIME + datetime.timedelta(seconds=self.random.randint(0, 3600))
+                start_times[(contest.id, user_id)] = int(start_time.replace(tzinfo=UTC).timestamp()) * 10 ** 6
+        return start_times
+
+    def _make_payload(self, contest: MonitorContest) -> List[dict]:
+        statuses = list(self.status_mix)
+        weights = [self.status_mix[status] for status in statuses]
+
+        payload = []
+        for problem in contest.statement.problems:
+            runs = []
+            for user_id in self.user_ids:
+                for _ in range(self.random.randint(1, 2 * self.runs_per_cell - 1)):
+                    status = self.random.choices(statuses, weights)[0]
+                    create_time = START_TIME + datetime.timedelta(seconds=self.random.randint(0, 5 * 3600))
+                    runs.append({
+                        'user': {'id': user_id},
+                        'ejudge_status': status.value,
+                        'ejudge_score': self.random.randint(0, 100),
+                        'create_time': create_time.replace(tzinfo=UTC).strftime('%Y-%m-%dT%H:%M:%S%z'),
+                    })
+            payload.append({'problem_id': problem.id, 'runs': runs})
+
+        # rmatics returns runs ordered by id, which grows with create_time
+        runs = sorted((run for problem_data in payload for run in problem_data['runs']),
+                      key=lambda run: run['create_time'])
+        for run_id, run in enumerate(runs, start=contest.id * 10 ** 7 + 1):
+            run['id'] = run_id
+        for problem_data in payload:
+            problem_data['runs'].sort(key=lambda run: run['id'])
+
+        return payload
+
+
+class SyntheticRmatics:
+    """ Answers batched monitor requests by payloads of workshop instead of internal rmatics """
+
+    def __init__(self, workshop: SyntheticWorkshop):
+        self.workshop = workshop
+
+    def get_monitors(self,
+                     contests: Dict[int, List[int]],
+                     users: List[int],
+                     time_before: Optional[int],
+                     runs_after: Optional[Dict[int, int]] = None):
+        return [{'context_id': contest_id, 'data': self.workshop.payloads[contest_id]}
+                for contest_id in contests], 200
+
+
+@contextmanager
+def substitute_rmatics(rmatics: SyntheticRmatics):
+    """ Makes monitor view fetch data from `rmatics` instead of internal rmatics """
+    internal_rmatics = monitor_view.internal_rmatics
+    monitor_view.internal_rmatics = rmatics
+    try:
+        yield
+    finally:
+        monitor_view.internal_rmatics = internal_rmatics
+
+
+def measure(name: str, func: Callable, items: int, repeat: int) -> StageResult:
+    """ Times `func` `repeat` times, then measures its peak memory by one more call """
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return StageResult(name, min(timings), sum(timings) / len(timings), items, peak_memory)
+
+
+def run_monitor_benchmark(workshop: SyntheticWorkshop,
+                          monitor_type: WorkshopMonitorType,
+                          repeat: int = 3,
+                          rmatics: SyntheticRmatics = None) -> List[StageResult]:
+    """ Measures every stage of monitor pipeline separately; needs app context
+
+    Monitor data is fetched from `rmatics`, which is SyntheticRmatics
+    of workshop by default, so neither rmatics nor DB are used.
+    """
+    monitor = WorkshopMonitor(id=1, workshop_id=1, type=monitor_type)
+    contests, user_ids = workshop.contests, workshop.user_ids
+    runs_count = workshop.runs_count
+    cells_count = len(user_ids) * sum(len(contest.statement.problems) for contest in contests)
+
+    rmatics = rmatics or SyntheticRmatics(workshop)
+
+    with substitute_rmatics(rmatics):
+        stages = [measure('fetch (synthetic rmatics)',
+                          lambda: WorkshopMonitorApi._get_raw_data(monitor, user_ids, contests),
+                          runs_count, repeat)]
+
+    def preprocess():
+        return [MonitorPreprocessor(workshop.payloads[contest.id]) for contest in contests]
+
+    stages.append(measure('MonitorPreprocessor', preprocess, runs_count, repeat))
+
+    processors = preprocess()
+    results = []
+    for result_maker_cls in filter(None, RESULT_MAKERS[monitor_type]):
+        def make_result_maker(contest, result_maker_cls=result_maker_cls):
+            if result_maker_cls.is_need_time:
+                return result_maker_cls(WorkshopMonitorApi._make_start_time_retriever(contest,
+                                                                                      workshop.start_times))
+            return result_maker_cls()
+
+        def render(result_maker_cls=result_maker_cls, make_result_maker=make_result_maker):
+            return [processor.render(make_result_maker(contest))
+                    for contest, processor in zip(contests, processors)]
+
+        stages.append(measure(result_maker_cls.__name__, render, cells_count, repeat))
+        results = [{'contest_id': contest.id, 'results': data}
+                   for contest, data in zip(contests, render())]
+
+    monitor_data = MonitorData(contests, workshop.users, results, monitor_type.name, None, len(user_ids), '', False)
+    stages.append(measure('monitor_schema.dump', lambda: monitor_schema.dump(monitor_data), cells_count, repeat))
+
+    dumped = monitor_schema.dump(monitor_data).data
+    stages.append(measure('jsonify', lambda: jsonify(dumped), cells_count, repeat))
+
+    return stages
+
+
+def format_report(stages: List[StageResult]) -> str:
+    lines = [f'{"stage":<32}{"best, ms":>12}{"mean, ms":>12}{"items/s":>14}{"peak, KiB":>12}']
+    for stage in stages:
+        throughput = stage.items / stage.best if stage.best else 0
+        lines.append(f'{stage.name:<32}{stage.best * 1000:>12.1f}{stage.mean * 1000:>12.1f}'
+                     f'{throughput:>14.0f}{stage.peak_memory / 1024:>12.0f}')
+    return '\n'.join(lines)
@@ -26,5 +26,34 @@ def test(teamcity):
     sys.exit(pytest.main(pytest_args))
 
 
+@click.command('benchmark-monitor')
+@click.option('--type', 'monitor_type', type=click.Choice(['IOI', 'LightACM', 'ACM']), default='IOI')
+@click.option('--contests', type=int, default=3)
+@click.option('--users', type=int, default=300)
+@click.option('--problems', type=int, default=10)
+@click.option('--runs-per-cell', type=int, default=3)
+@click.option('--virtual', is_flag=True, default=False)
+@click.option('--repeat', type=int, default=3)
+@click.option('--seed', type=int, default=0)
+@with_appcontext
+def benchmark_monitor(monitor_type, contests, users, problems, runs_per_cell, virtual, repeat, seed):
+    """Times every stage of workshop monitor on synthetic workshop.
+
+    rmatics and DB are not used, so it can be run locally:
+
+    $ flask benchmark-monitor --users 1000 --virtual
+    """
+    from informatics_front.benchmarks.monitor import SyntheticWorkshop, run_monitor_benchmark, format_report
+    from informatics_front.utils.enums import WorkshopMonitorType
+
+    workshop = SyntheticWorkshop(contests=contests, users=users, problems=problems,
+                                 runs_per_cell=runs_per_cell, virtual=virtual, seed=seed)
+    click.echo(f'{len(workshop.contests)} contests, {users} users, {problems} problems, '
+               f'{workshop.runs_count} runs')
+
+    stages = run_monitor_benchmark(workshop, WorkshopMonitorType[monitor_type], repeat=repeat)
+    click.echo(format_report(stages))
+
+
 if __name__ == '__main__':
     test()
@@ -56,8 +56,103 @@ class BaseConfig:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = bool_(os.environ.get('SQLALCHEMY_ECHO', False))
 
+    # cache storage, process memory is used if not set
+    REDIS_URL = os.getenv('REDIS_URL')
+    # values kept in process memory by every cacher, when redis is not configured
+    MEMORY_CACHE_SIZE_ENV = os.getenv('MEMORY_CACHE_SIZE')
+    MEMORY_CACHE_SIZE = int(MEMORY_CACHE_SIZE_ENV) if MEMORY_CACHE_SIZE_ENV else 1024
+
     # services
     INTERNAL_RMATICS_URL = os.getenv('INTERNAL_RMATICS_URL')
+    INTERNAL_RMATICS_CONNECT_TIMEOUT_ENV = os.getenv('INTERNAL_RMATICS_CONNECT_TIMEOUT')
+    INTERNAL_RMATICS_CONNECT_TIMEOUT = float(INTERNAL_RMATICS_CONNECT_TIMEOUT_ENV) \
+        if INTERNAL_RMATICS_CONNECT_TIMEOUT_ENV else 3
+    INTERNAL_RMATICS_READ_TIMEOUT_ENV = os.getenv('INTERNAL_RMATICS_READ_TIMEOUT')
+    INTERNAL_RMATICS_READ_TIMEOUT = float(INTERNAL_RMATICS_READ_TIMEOUT_ENV) \
+        if INTERNAL_RMATICS_READ_TIMEOUT_ENV else 30
+    # kept alive connections; should fit concurrent requests of executor
+    INTERNAL_RMATICS_POOL_SIZE_ENV = os.getenv('INTERNAL_RMATICS_POOL_SIZE')
+    INTERNAL_RMATICS_POOL_SIZE = int(INTERNAL_RMATICS_POOL_SIZE_ENV) if INTERNAL_RMATICS_POOL_SIZE_ENV else 16
+    # retries of GET requests on connection errors and 502, 503, 504
+    INTERNAL_RMATICS_RETRIES_ENV = os.getenv('INTERNAL_RMATICS_RETRIES')
+    INTERNAL_RMATICS_RETRIES = int(INTERNAL_RMATICS_RETRIES_ENV) if INTERNAL_RMATICS_RETRIES_ENV else 2
+    # circuit breaker: endpoint is rejected with 503 (or stale response) for OPEN_DURATION
+    # seconds, when FAILURE_RATE of its calls failed or were slower than SLOW_CALL_DURATION
+    INTERNAL_RMATICS_BREAKER_FAILURE_RATE_ENV = os.getenv('INTERNAL_RMATICS_BREAKER_FAILURE_RATE')
+    INTERNAL_RMATICS_BREAKER_FAILURE_RATE = float(INTERNAL_RMATICS_BREAKER_FAILURE_RATE_ENV) \
+        if INTERNAL_RMATICS_BREAKER_FAILURE_RATE_ENV else 0.5
+    INTERNAL_RMATICS_BREAKER_SLOW_CALL_DURATION_ENV = os.getenv('INTERNAL_RMATICS_BREAKER_SLOW_CALL_DURATION')
+    INTERNAL_RMATICS_BREAKER_SLOW_CALL_DURATION = float(INTERNAL_RMATICS_BREAKER_SLOW_CALL_DURATION_ENV) \
+        if INTERNAL_RMATICS_BREAKER_SLOW_CALL_DURATION_ENV else 10
+    INTERNAL_RMATICS_BREAKER_OPEN_DURATION_ENV = os.getenv('INTERNAL_RMATICS_BREAKER_OPEN_DURATION')
+    INTERNAL_RMATICS_BREAKER_OPEN_DURATION = float(INTERNAL_RMATICS_BREAKER_OPEN_DURATION_ENV) \
+        if INTERNAL_RMATICS_BREAKER_OPEN_DURATION_ENV else 30
+    INTERNAL_RMATICS_STALE_SIZE_ENV = os.getenv('INTERNAL_RMATICS_STALE_SIZE')
+    INTERNAL_RMATICS_STALE_SIZE = int(INTERNAL_RMATICS_STALE_SIZE_ENV) if INTERNAL_RMATICS_STALE_SIZE_ENV else 256
+    # bytes of run sources and submission lists cached in process memory;
+    # with CACHE_DIR they are also shared by processes of host
+    INTERNAL_RMATICS_CACHE_SIZE_ENV = os.getenv('INTERNAL_RMATICS_CACHE_SIZE')
+    INTERNAL_RMATICS_CACHE_SIZE = int(INTERNAL_RMATICS_CACHE_SIZE_ENV) \
+        if INTERNAL_RMATICS_CACHE_SIZE_ENV else 64 * 1024 * 1024
+    INTERNAL_RMATICS_CACHE_DIR = os.getenv('INTERNAL_RMATICS_CACHE_DIR')
+    INTERNAL_RMATICS_CACHE_DIR_SIZE_ENV = os.getenv('INTERNAL_RMATICS_CACHE_DIR_SIZE')
+    INTERNAL_RMATICS_CACHE_DIR_SIZE = int(INTERNAL_RMATICS_CACHE_DIR_SIZE_ENV) \
+        if INTERNAL_RMATICS_CACHE_DIR_SIZE_ENV else 1024 * 1024 * 1024
+
+    # app-wide thread pool for fan-out requests to services
+    EXECUTOR_MAX_WORKERS_ENV = os.getenv('EXECUTOR_MAX_WORKERS')
+    EXECUTOR_MAX_WORKERS = int(EXECUTOR_MAX_WORKERS_ENV) if EXECUTOR_MAX_WORKERS_ENV else 16
+
+    # monitor
+    MONITOR_FETCH_TIMEOUT_ENV = os.getenv('MONITOR_FETCH_TIMEOUT')
+    MONITOR_FETCH_TIMEOUT = int(MONITOR_FETCH_TIMEOUT_ENV) if MONITOR_FETCH_TIMEOUT_ENV else 30
+    # Fetch contests one by one in shared event loop instead of executor threads,
+    # when rmatics is not able to batch
+    MONITOR_ASYNC_FETCH = bool_(os.getenv('MONITOR_ASYNC_FETCH', False))
+
+    MONITOR_CACHE_TTL_ENV = os.getenv('MONITOR_CACHE_TTL')
+    MONITOR_CACHE_TTL = int(MONITOR_CACHE_TTL_ENV) if MONITOR_CACHE_TTL_ENV else 30
+
+    # Keep folded monitor cells between requests and fetch only new runs.
+    # Rejudged runs are noticed only when folded cells expire.
+    MONITOR_INCREMENTAL = bool_(os.getenv('MONITOR_INCREMENTAL', False))
+    MONITOR_INCREMENTAL_TTL_ENV = os.getenv('MONITOR_INCREMENTAL_TTL')
+    MONITOR_INCREMENTAL_TTL = int(MONITOR_INCREMENTAL_TTL_ENV) if MONITOR_INCREMENTAL_TTL_ENV else 10 * 60
+
+    # The last monitor response for every workshop and args is kept to answer with changed cells only
+    MONITOR_SNAPSHOT_TTL_ENV = os.getenv('MONITOR_SNAPSHOT_TTL')
+    MONITOR_SNAPSHOT_TTL = int(MONITOR_SNAPSHOT_TTL_ENV) if MONITOR_SNAPSHOT_TTL_ENV else 5 * 60
+
+    # Push monitor changes as server-sent events; otherwise clients poll with ETag
+    MONITOR_STREAM = bool_(os.getenv('MONITOR_STREAM', False))
+    # Seconds between polls of shared monitor for streaming viewers
+    MONITOR_STREAM_INTERVAL_ENV = os.getenv('MONITOR_STREAM_INTERVAL')
+    MONITOR_STREAM_INTERVAL = int(MONITOR_STREAM_INTERVAL_ENV) if MONITOR_STREAM_INTERVAL_ENV else 5
+    # Seconds before stream is closed; EventSource reconnects with Last-Event-ID
+    MONITOR_STREAM_LIFETIME_ENV = os.getenv('MONITOR_STREAM_LIFETIME')
+    MONITOR_STREAM_LIFETIME = int(MONITOR_STREAM_LIFETIME_ENV) if MONITOR_STREAM_LIFETIME_ENV else 5 * 60
+    # Streams open at once by process, every one of them holds a worker
+    MONITOR_STREAM_MAX_CONNECTIONS_ENV = os.getenv('MONITOR_STREAM_MAX_CONNECTIONS')
+    MONITOR_STREAM_MAX_CONNECTIONS = int(MONITOR_STREAM_MAX_CONNECTIONS_ENV) \
+        if MONITOR_STREAM_MAX_CONNECTIONS_ENV else 16
+
+    # Members of groups are kept in process memory for monitor group filter
+    GROUP_INDEX_TTL_ENV = os.getenv('GROUP_INDEX_TTL')
+    GROUP_INDEX_TTL = int(GROUP_INDEX_TTL_ENV) if GROUP_INDEX_TTL_ENV else 60
+
+    # Render monitor cells of contest at once with NumPy; it's not in requirements.txt,
+    # as it doesn't build on alpine, so pure-Python rendering is used until it's installed
+    MONITOR_VECTORIZED = bool_(os.getenv('MONITOR_VECTORIZED', False))
+
+    # Filtered protocols of judged runs by visibility level, kept in redis
+    # (or process memory) without meta rows in DB
+    RUN_PROTOCOL_CACHE_TTL_ENV = os.getenv('RUN_PROTOCOL_CACHE_TTL')
+    RUN_PROTOCOL_CACHE_TTL = int(RUN_PROTOCOL_CACHE_TTL_ENV) if RUN_PROTOCOL_CACHE_TTL_ENV else 24 * 60 * 60
+
+    # Protocol visibility of contest problems is kept in process memory
+    PROTOCOL_VISIBILITY_INDEX_TTL_ENV = os.getenv('PROTOCOL_VISIBILITY_INDEX_TTL')
+    PROTOCOL_VISIBILITY_INDEX_TTL = int(PROTOCOL_VISIBILITY_INDEX_TTL_ENV) \
+        if PROTOCOL_VISIBILITY_INDEX_TTL_ENV else 5 * 60
 
     # mailers
     MAIL_FROM = os.getenv('MAIL_FROM', '')
@@ -1,6 +1,6 @@
 from .base import db
 from .comment import Comment
-from .contest.monitor import WorkshopMonitor
+from .contest.monitor import WorkshopMonitor, WorkshopMonitorSnapshot
 from .contest.statement import StatementProblem, Statement
 from .problem import Problem
 from .user.group import Group, UserGroup
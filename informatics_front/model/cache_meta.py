@@ -42,3 +42,19 @@ class CacheMeta(db.Model):
     def get_search_like_args(cls, args: Iterable[str]) -> List[str]:
         """ [problem_1] -> ['%|problem_1|%'] """
         return list(cls._get_like_args(map(cls._get_search_arg, args)))
+
+
+class CacheInvalidateArg(db.Model):
+    """ Invalidation arg of cache key; keys of arg are found by index instead of LIKE scan """
+    __table_args__ = (
+        db.Index('ix_monitor_cache_invalidate_arg_prefix_arg', 'prefix', 'arg'),
+        db.Index('ix_monitor_cache_invalidate_arg_prefix_key', 'prefix', 'key'),
+        {'schema': 'pynformatics'},
+    )
+    __tablename__ = 'monitor_cache_invalidate_arg'
+
+    id = db.Column(db.Integer(), primary_key=True)
+
+    prefix = db.Column(db.String(30), nullable=False)
+    key = db.Column(db.String(64), nullable=False)
+    arg = db.Column(db.String(64), nullable=False)
@@ -1,3 +1,5 @@
+import datetime
+
 from informatics_front.model.base import db
 from informatics_front.utils.enums import WorkshopMonitorType, WorkshopMonitorUserVisibility
 from informatics_front.utils.sqla.types import IntEnum
@@ -35,3 +37,28 @@ class WorkshopMonitor(db.Model):
 
     def is_disabled_for_students(self):
         return self.user_visibility == WorkshopMonitorUserVisibility.DISABLED_FOR_STUDENT
+
+
+class WorkshopMonitorSnapshot(db.Model):
+    """ Results of contest in frozen monitor, which can't change anymore.
+
+    Key is the same as monitor cache key of results, so it includes
+    freeze_time, and snapshot is not used after monitor is unfrozen.
+    Data is zlib compressed JSON of results and their version.
+    """
+    __table_args__ = (
+        db.UniqueConstraint('key', name='_contest_monitor_snapshot_key_uc'),
+        {'schema': 'pynformatics'},
+    )
+    __tablename__ = 'contest_monitor_snapshot'
+
+    id = db.Column(db.Integer, primary_key=True)
+    monitor_id = db.Column(
+        db.Integer,
+        db.ForeignKey('pynformatics.contest_monitor.id', ondelete='CASCADE'),
+        nullable=False)
+    contest_id = db.Column(db.Integer, nullable=False)
+    key = db.Column(db.String(64), nullable=False)
+    freeze_time = db.Column(db.DateTime, nullable=False)
+    data = db.Column(db.LargeBinary(length=2 ** 24 - 1), nullable=False)
+    created = db.Column(db.DateTime, default=datetime.datetime.utcnow)
@@ -1,10 +1,28 @@
 from flask_migrate import Migrate
 
+from informatics_front.utils.cacher.cacher import Cacher, StorageCacher
+from informatics_front.utils.event_loop import EventLoop
+from informatics_front.utils.executor import AppExecutor
+from informatics_front.utils.group_index import GroupIndex
+from informatics_front.utils.protocol_visibility_index import ProtocolVisibilityIndex
+from informatics_front.utils.services.async_internal_rmatics import AsyncInternalRmatics
 from informatics_front.utils.services.internal_rmatics import InternalRmatics
+from informatics_front.utils.streamer import Streamer
 from informatics_front.utils.tokenizer.tokenizer import Tokenizer
 from informatics_front.utils.services.mailer import Gmail
 
 internal_rmatics = InternalRmatics()
+async_internal_rmatics = AsyncInternalRmatics()
+event_loop = EventLoop()
 tokenizer = Tokenizer()
 gmail = Gmail()
 migrate = Migrate()
+executor = AppExecutor()
+monitor_cacher = Cacher(prefix='workshop_monitor', label='results', ttl_param='MONITOR_CACHE_TTL')
+monitor_state_cacher = Cacher(prefix='workshop_monitor_state', label='cells', ttl_param='MONITOR_INCREMENTAL_TTL')
+monitor_snapshot_cacher = Cacher(prefix='workshop_monitor_snapshot', label='results', ttl_param='MONITOR_SNAPSHOT_TTL')
+monitor_streamer = Streamer(interval_param='MONITOR_STREAM_INTERVAL',
+                            max_subscriptions_param='MONITOR_STREAM_MAX_CONNECTIONS')
+group_index = GroupIndex(ttl_param='GROUP_INDEX_TTL')
+run_protocol_cacher = StorageCacher(prefix='run_protocol', ttl_param='RUN_PROTOCOL_CACHE_TTL')
+protocol_visibility_index = ProtocolVisibilityIndex(ttl_param='PROTOCOL_VISIBILITY_INDEX_TTL')
@@ -0,0 +1,42 @@
+from informatics_front.benchmarks.monitor import SyntheticWorkshop, run_monitor_benchmark, format_report
+from informatics_front.utils.enums import WorkshopMonitorType
+from informatics_front.view.course.monitor.monitor import VectorizedACMResultMaker
+
+
+def test_synthetic_workshop_is_reproducible():
+    workshop = SyntheticWorkshop(contests=2, users=5, problems=3, seed=1)
+    same_workshop = SyntheticWorkshop(contests=2, users=5, problems=3, seed=1)
+
+    assert workshop.payloads == same_workshop.payloads
+    assert [len(payload) for payload in workshop.payloads.values()] == [3, 3]
+    assert workshop.runs_count >= 2 * 5 * 3
+
+
+def test_synthetic_run_ids_grow_with_create_time():
+    workshop = SyntheticWorkshop(contests=1, users=5, problems=3, seed=1)
+
+    runs = sorted((run for problem_data in workshop.payloads[1] for run in problem_data['runs']),
+                  key=lambda run: run['id'])
+    assert [run['create_time'] for run in runs] == sorted(run['create_time'] for run in runs)
+    for problem_data in workshop.payloads[1]:
+        run_ids = [run['id'] for run in problem_data['runs']]
+        assert run_ids == sorted(run_ids)
+
+
+def test_run_monitor_benchmark(local_app):
+    workshop = SyntheticWorkshop(contests=2, users=5, problems=3, virtual=True)
+
+    with local_app.app_context():
+        stages = run_monitor_benchmark(workshop, WorkshopMonitorType.ACM, repeat=1)
+
+    result_maker_stages = ['ACMResultMaker', 'VectorizedACMResultMaker'] if VectorizedACMResultMaker \
+        else ['ACMResultMaker']
+    assert [stage.name for stage in stages] == [
+        'fetch (synthetic rmatics)',
+        'MonitorPreprocessor',
+        *result_maker_stages,
+        'monitor_schema.dump',
+        'jsonify',
+    ]
+    assert all(stage.best > 0 and stage.peak_memory > 0 for stage in stages)
+    assert result_maker_stages[-1] in format_report(stages)
@@ -1,2 +1,3 @@
 from informatics_front.tests.conftests.app import *
-from informatics_front.tests.conftests.views import *
\ No newline at end of file
+from informatics_front.tests.conftests.rmatics import *
+from informatics_front.tests.conftests.views import *
@@ -0,0 +1,99 @@
+import threading
+import time
+from collections import defaultdict
+
+import pytest
+from flask import json
+from werkzeug.routing import Map, Rule
+from werkzeug.serving import make_server
+from werkzeug.wrappers import Request, Response
+
+
+class FakeRmatics:
+    """Local stand-in for internal rmatics service.
+
+    Serves canned data over real HTTP, so InternalRmatics can be tested
+    together with its ApiClient. Fill `monitors` with
+    {contest_id: [{'problem_id': ..., 'runs': [...]}, ...]},
+    `protocols` with {run_id: protocol} and `submissions` with
+    {problem_id: [run, ...]} and check `requests` for what was actually
+    asked. Set `failures` to answer next requests with 503, `delay`
+    to answer in `delay` seconds and `ignore_run_id_after` to send
+    every run of monitor.
+    """
+
+    url_map = Map([
+        Rule('/monitor/problem_monitor', methods=('GET',), endpoint='problem_monitor'),
+        Rule('/monitor/problem_monitor/batch', methods=('POST',), endpoint='problem_monitor_batch'),
+        Rule('/problem/run/<int:run_id>/protocol', methods=('GET',), endpoint='run_protocol'),
+        Rule('/problem/<int:problem_id>/submissions/', methods=('GET',), endpoint='problem_submissions'),
+    ])
+
+    def __init__(self):
+        self.monitors = defaultdict(list)
+        self.protocols = {}
+        self.submissions = defaultdict(list)
+        self.requests = []
+        self.failures = 0
+        self.delay = 0
+        self.ignore_run_id_after = False
+        self.url = None
+
+    def _filter_monitor(self, contest_id: int, problem_ids: list, run_id_after: int = 0) -> list:
+        problem_ids = set(int(problem_id) for problem_id in problem_ids)
+        if self.ignore_run_id_after:
+            run_id_after = 0
+        return [{**problem_data,
+                 'runs': [run for run in problem_data['runs'] if run.get('id', 0) > run_id_after]}
+                for problem_data in self.monitors[contest_id]
+                if problem_data['problem_id'] in problem_ids]
+
+    def problem_monitor(self, request: Request) -> dict:
+        contest_id = int(request.args['context_id'])
+        return {'data': self._filter_monitor(contest_id,
+                                             request.args.getlist('problem_id'),
+                                             int(request.args.get('run_id_after', 0)))}
+
+    def problem_monitor_batch(self, request: Request) -> dict:
+        payload = json.loads(request.get_data(as_text=True))
+        return {'data': [{'context_id': contest['context_id'],
+                          'data': self._filter_monitor(contest['context_id'],
+                                                       contest['problem_id'],
+                                                       contest.get('run_id_after', 0))}
+                         for contest in payload['contests']]}
+
+    def run_protocol(self, request: Request, run_id: int) -> dict:
+        return {'data': self.protocols[run_id]}
+
+    def problem_submissions(self, request: Request, problem_id: int) -> dict:
+        return {'data': self.submissions[problem_id]}
+
+    def __call__(self, environ, start_response):
+        request = Request(environ)
+        adapter = self.url_map.bind_to_environ(environ)
+        endpoint, values = adapter.match()
+        self.requests.append((endpoint, request))
+        time.sleep(self.delay)
+
+        if self.failures:
+            self.failures -= 1
+            return Response(status=503)(environ, start_response)
+
+        content = getattr(self, endpoint)(request, **values)
+        response = Response(json.dumps(content), mimetype='application/json')
+        return response(environ, start_response)
+
+
+@pytest.yield_fixture
+def fake_rmatics():
+    rmatics = FakeRmatics()
+    server = make_server('127.0.0.1', 0, rmatics, threaded=True)
+    rmatics.url = f'http://127.0.0.1:{server.server_port}'
+
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield rmatics
+
+    server.shutdown()
+    thread.join()
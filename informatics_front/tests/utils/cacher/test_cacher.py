@@ -0,0 +1,108 @@
+import datetime
+
+import pytest
+from flask import Flask
+
+from informatics_front.model import db
+from informatics_front.model.cache_meta import CacheInvalidateArg, CacheMeta
+from informatics_front.utils.cacher.cacher import Cacher, StorageCacher
+
+
+@pytest.yield_fixture
+def cacher(app):
+    cacher = Cacher(prefix='test', label='test', ttl_param='MONITOR_CACHE_TTL', app=app)
+
+    yield cacher
+
+    db.session.query(CacheMeta).filter(CacheMeta.prefix == 'test').delete()
+    db.session.query(CacheInvalidateArg).filter(CacheInvalidateArg.prefix == 'test').delete()
+    db.session.commit()
+
+
+def test_make_key():
+    key = Cacher.make_key(a=1, b=[1, 2])
+
+    assert len(key) == 64
+    assert key == Cacher.make_key(b=[1, 2], a=1)
+    assert key != Cacher.make_key(a=1, b=[2, 1])
+
+
+def test_storage_cacher_uses_no_db():
+    app = Flask(__name__)
+    app.config['RUN_PROTOCOL_CACHE_TTL'] = 10
+    cacher = StorageCacher(prefix='test', ttl_param='RUN_PROTOCOL_CACHE_TTL', app=app)
+    key = cacher.make_key(run_id=1)
+
+    assert cacher.get(key) is None
+    cacher.set(key, {'tests': {}})
+    assert cacher.get(key) == {'tests': {}}
+    assert cacher.storage.get(f'test:{key}') == {'tests': {}}
+
+
+def test_get_set(cacher):
+    key = cacher.make_key(contest_id=1)
+    value = {1: {2: 'result'}}
+
+    assert cacher.get(key) is None
+
+    cacher.set(key, value, invalidate_args=[10, 20])
+
+    assert cacher.get(key) == value
+
+    meta = db.session.query(CacheMeta).filter_by(prefix='test', key=key).one()
+    assert meta.invalidate_args == '|10|20|'
+    args = db.session.query(CacheInvalidateArg.arg).filter_by(prefix='test', key=key).all()
+    assert sorted(arg for arg, in args) == ['10', '20']
+    assert meta.when_expire > datetime.datetime.utcnow()
+
+
+def test_get_expired(cacher):
+    key = cacher.make_key(contest_id=1)
+    cacher.set(key, 'value', invalidate_args=[10])
+
+    db.session.query(CacheMeta).filter_by(prefix='test', key=key) \
+        .update({'when_expire': datetime.datetime.utcnow() - datetime.timedelta(seconds=1)})
+    db.session.commit()
+
+    assert cacher.get(key) is None
+
+
+def test_invalidate(cacher):
+    key1 = cacher.make_key(contest_id=1)
+    key2 = cacher.make_key(contest_id=2)
+    cacher.set(key1, 'value1', invalidate_args=[10, 20])
+    cacher.set(key2, 'value2', invalidate_args=[100])
+
+    cacher.invalidate(10)
+
+    assert cacher.get_many([key1, key2]) == {key2: 'value2'}
+
+
+def test_set_replaces_invalidate_args(cacher):
+    key = cacher.make_key(contest_id=1)
+    cacher.set(key, 'value1', invalidate_args=[10])
+    cacher.set(key, 'value2', invalidate_args=[20])
+
+    cacher.invalidate(10)
+    assert cacher.get(key) == 'value2'
+
+    cacher.invalidate(20)
+    assert cacher.get(key) is None
+
+
+def test_purge_expired(cacher):
+    expired_key = cacher.make_key(contest_id=1)
+    key = cacher.make_key(contest_id=2)
+    cacher.set(expired_key, 'value1', invalidate_args=[10])
+    cacher.set(key, 'value2', invalidate_args=[10])
+
+    db.session.query(CacheMeta).filter_by(prefix='test', key=expired_key) \
+        .update({'when_expire': datetime.datetime.utcnow() - datetime.timedelta(seconds=1)})
+    db.session.commit()
+
+    cacher.purge_expired()
+
+    keys = db.session.query(CacheMeta.key).filter_by(prefix='test').all()
+    assert keys == [(key,)]
+    arg_keys = db.session.query(CacheInvalidateArg.key).filter_by(prefix='test').all()
+    assert arg_keys == [(key,)]
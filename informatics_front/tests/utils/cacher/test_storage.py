@@ -0,0 +1,46 @@
+import time
+
+from informatics_front.utils.cacher.storage import MemoryStorage
+
+
+def test_memory_storage_get_set():
+    storage = MemoryStorage()
+    value = {1: {2: 'result'}}
+
+    storage.set('key', value, ttl=60)
+
+    assert storage.get('key') == value
+    assert storage.get('key') is not storage.get('key'), 'Every get returns a copy'
+    assert storage.get('unknown') is None
+
+
+def test_memory_storage_expiration():
+    storage = MemoryStorage()
+    storage.set('key', 'value', ttl=0)
+    time.sleep(0.01)
+
+    assert storage.get('key') is None
+
+
+def test_memory_storage_delete():
+    storage = MemoryStorage()
+    storage.set('key1', 'value', ttl=60)
+    storage.set('key2', 'value', ttl=60)
+
+    storage.delete('key1', 'key2', 'unknown')
+
+    assert storage.get('key1') is None
+    assert storage.get('key2') is None
+
+
+def test_memory_storage_evicts_least_recently_used():
+    storage = MemoryStorage(size=2)
+    storage.set('key1', 'value1', ttl=60)
+    storage.set('key2', 'value2', ttl=60)
+    storage.get('key1')
+
+    storage.set('key3', 'value3', ttl=60)
+
+    assert storage.get('key1') == 'value1'
+    assert storage.get('key2') is None
+    assert storage.get('key3') == 'value3'
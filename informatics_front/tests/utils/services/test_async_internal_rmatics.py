@@ -0,0 +1,133 @@
+import asyncio
+
+import pytest
+from flask import Flask
+
+from informatics_front.utils.event_loop import EventLoop
+from informatics_front.utils.services.async_base import AsyncApiClient
+from informatics_front.utils.services.async_internal_rmatics import AsyncInternalRmatics
+from informatics_front.utils.services.internal_rmatics import InternalRmatics
+
+
+@pytest.fixture
+def event_loop():
+    return EventLoop()
+
+
+@pytest.fixture
+def client(fake_rmatics, event_loop):
+    client = AsyncInternalRmatics()
+    client.service_url = fake_rmatics.url
+    client.client = AsyncApiClient(retries=2, backoff_factor=0)
+    yield client
+    event_loop.run(client.client.close(), timeout=5)
+
+
+@pytest.mark.internal_rmatics
+def test_get_monitor(fake_rmatics, client, event_loop):
+    fake_rmatics.monitors[1] = [{'problem_id': 1, 'runs': [{'id': 1}, {'id': 2}]},
+                                {'problem_id': 2, 'runs': [{'id': 3}]}]
+
+    data, status = event_loop.run(client.get_monitor(1, [1], [4, 5], 123, run_id_after=1), timeout=5)
+
+    assert status == 200
+    assert data == [{'problem_id': 1, 'runs': [{'id': 2}]}]
+
+    _, request = fake_rmatics.requests[0]
+    assert request.args.getlist('user_id') == ['4', '5']
+    assert request.args['time_before'] == '123'
+    assert request.args['show_hidden'] == 'True'
+
+
+@pytest.mark.internal_rmatics
+def test_requests_are_concurrent(fake_rmatics, client, event_loop):
+    fake_rmatics.monitors[1] = [{'problem_id': 1, 'runs': []}]
+    fake_rmatics.monitors[2] = [{'problem_id': 2, 'runs': []}]
+
+    async def fetch():
+        return await asyncio.gather(client.get_monitor(1, [1], [4], None),
+                                    client.get_monitor(2, [2], [4], None))
+
+    responses = event_loop.run(fetch(), timeout=5)
+
+    assert responses == [(fake_rmatics.monitors[1], 200), (fake_rmatics.monitors[2], 200)]
+    assert client.client.get_pool_stats()['requests'] == 2
+
+
+@pytest.mark.internal_rmatics
+def test_get_is_retried(fake_rmatics, client, event_loop):
+    fake_rmatics.failures = 2
+
+    data, status = event_loop.run(client.get_monitor(1, [1], [4], None), timeout=5)
+
+    assert status == 200
+    assert data == []
+    assert len(fake_rmatics.requests) == 3
+
+
+@pytest.mark.internal_rmatics
+def test_get_run_protocol(fake_rmatics, client, event_loop):
+    fake_rmatics.protocols[1] = {'audit': 'audit',
+                                 'tests': {'1': {'status': 'OK', 'input': '1' * 1000},
+                                           '2': {'status': 'WA'},
+                                           '3': {'status': 'OK'}}}
+
+    protocol, status = event_loop.run(client.get_run_protocol(1, 1, ['audit'], ['input'], first_bad_test=True),
+                                      timeout=5)
+
+    assert status == 200
+    assert protocol == {'tests': {'1': {'status': 'OK'}, '2': {'status': 'WA'}}}
+    _, request = fake_rmatics.requests[0]
+    assert request.args.getlist('exclude_test_fields') == ['input']
+
+    fake_rmatics.failures = 3
+    assert event_loop.run(client.get_run_protocol(1, 1, [], []), timeout=5) == (None, 503)
+
+
+@pytest.mark.internal_rmatics
+def test_read_timeout_is_not_retried(fake_rmatics, client, event_loop):
+    fake_rmatics.delay = 0.5
+    client.client = AsyncApiClient(timeout=0.1, retries=2, backoff_factor=0)
+
+    data, status = event_loop.run(client.get_monitor(1, [1], [4], None), timeout=5)
+    event_loop.run(client.client.close(), timeout=5)
+
+    assert (data, status) == ([], 500)
+    assert len(fake_rmatics.requests) == 1
+
+
+@pytest.mark.internal_rmatics
+def test_unavailable_rmatics(event_loop):
+    client = AsyncInternalRmatics()
+    client.service_url = 'http://127.0.0.1:1'
+    client.client = AsyncApiClient()
+
+    data, status = event_loop.run(client.get_monitor(1, [1], [4], None), timeout=5)
+    event_loop.run(client.client.close(), timeout=5)
+
+    assert (data, status) == ([], 500)
+
+
+@pytest.mark.internal_rmatics
+def test_policies_are_shared_with_sync_client(fake_rmatics, event_loop):
+    app = Flask(__name__)
+    app.config.update(INTERNAL_RMATICS_URL=fake_rmatics.url,
+                      INTERNAL_RMATICS_CACHE_SIZE=1000,
+                      INTERNAL_RMATICS_BREAKER_FAILURE_RATE=0.5)
+    rmatics = InternalRmatics(app)
+    async_rmatics = AsyncInternalRmatics(app)
+    fake_rmatics.submissions[1] = [{'id': 1}]
+
+    assert async_rmatics.client.cache is rmatics.client.cache
+    assert async_rmatics.client.breakers is rmatics.client.breakers
+    assert async_rmatics.client.stale is rmatics.client.stale
+
+    event_loop.run(async_rmatics.get_runs_filter(1, 1, {'user_id': 1}), timeout=5)
+    rmatics.get_runs_filter(1, 1, {'user_id': 1})
+    assert len(fake_rmatics.requests) == 1, 'Response cached by async client is used by sync one'
+
+    rmatics.client.invalidate_cache(rmatics._runs_filter_url(1))
+    assert rmatics.get_runs_filter(1, 1, {'user_id': 1}) == ([{'id': 1}], 200)
+    assert len(fake_rmatics.requests) == 2, 'Invalidation by sync client drops response cached by async one'
+
+    event_loop.run(async_rmatics.client.close(), timeout=5)
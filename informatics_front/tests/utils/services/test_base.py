@@ -0,0 +1,85 @@
+from flask import Flask
+
+from informatics_front.utils.services.base import ApiClient, BaseService
+from informatics_front.utils.services.internal_rmatics import InternalRmatics
+
+
+def test_connections_are_reused(fake_rmatics):
+    client = ApiClient(pool_size=2)
+
+    for _ in range(3):
+        _, status = client.get_data(f'{fake_rmatics.url}/monitor/problem_monitor',
+                                    params={'context_id': 1, 'problem_id': [1]})
+        assert status == 200
+
+    stats = client.get_pool_stats()
+    assert stats['requests'] == 3
+    assert stats['connections'] == 1
+    assert stats['in_use'] == 0
+    assert stats['waits'] == 0
+
+
+def test_get_is_retried(fake_rmatics):
+    fake_rmatics.failures = 2
+    client = ApiClient(retries=2, backoff_factor=0)
+
+    data, status = client.get_data(f'{fake_rmatics.url}/monitor/problem_monitor',
+                                   params={'context_id': 1, 'problem_id': [1]})
+
+    assert status == 200
+    assert data == []
+    assert len(fake_rmatics.requests) == 3
+
+
+def test_read_timeout_is_not_retried(fake_rmatics):
+    fake_rmatics.delay = 0.5
+    client = ApiClient(timeout=0.1, retries=2, backoff_factor=0)
+
+    _, status = client.get_data(f'{fake_rmatics.url}/monitor/problem_monitor',
+                                params={'context_id': 1, 'problem_id': [1]}, silent=True)
+
+    assert status == 500
+    assert len(fake_rmatics.requests) == 1
+
+
+def test_post_is_not_retried(fake_rmatics):
+    fake_rmatics.failures = 1
+    client = ApiClient(retries=2, backoff_factor=0)
+
+    _, status = client.post_data(f'{fake_rmatics.url}/monitor/problem_monitor/batch',
+                                 json={'contests': []}, silent=True, allow_bad_http_statuses=False)
+
+    assert status == 503
+    assert len(fake_rmatics.requests) == 1
+
+
+def test_split_timeouts():
+    assert ApiClient(timeout=30).timeout == 30
+    assert ApiClient(timeout=30, connect_timeout=3).timeout == (3, 30)
+
+
+def test_max_duration():
+    assert ApiClient(timeout=30).get_max_duration() == 60
+    assert ApiClient(timeout=30, connect_timeout=3, retries=2, backoff_factor=1).get_max_duration() == 9 + 30 + 3
+    assert ApiClient(timeout=30, connect_timeout=3, retries=2).get_max_duration('POST') == 33
+
+
+def test_service_client_config():
+    app = Flask(__name__)
+    app.config.update(INTERNAL_RMATICS_URL='http://rmatics',
+                      INTERNAL_RMATICS_CONNECT_TIMEOUT=2,
+                      INTERNAL_RMATICS_READ_TIMEOUT=20,
+                      INTERNAL_RMATICS_POOL_SIZE=7,
+                      INTERNAL_RMATICS_RETRIES=1)
+
+    service = InternalRmatics(app)
+
+    assert service.client.timeout == (2, 20)
+    assert service.get_pool_stats()['pool_maxsize'] == 7
+    assert service.client.adapter.max_retries.total == 1
+
+    class Service(BaseService):
+        service_url_param = 'SERVICE_URL'
+        default_timeout = 10
+
+    assert Service(app).client.timeout == 10
@@ -0,0 +1,107 @@
+import time
+
+import pytest
+from flask import Flask
+
+from informatics_front.utils.error_handlers import register_error_handlers
+from informatics_front.utils.services.base import ApiClient
+from informatics_front.utils.services.circuit_breaker import CircuitBreaker, CircuitBreakers, StaleResponses
+from informatics_front.utils.services.errors import ServiceUnavailableError
+
+
+def test_breaker_opens_by_failure_rate():
+    breaker = CircuitBreaker(failure_rate=0.5, window=4, min_calls=4)
+
+    for success in (True, False, True):
+        assert breaker.allow()
+        breaker.record(success)
+    assert breaker.state == CircuitBreaker.CLOSED, 'Too few calls to judge'
+
+    breaker.record(False)
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_slow_calls_are_failures():
+    breaker = CircuitBreaker(failure_rate=1, slow_call_duration=1, window=2, min_calls=2)
+
+    breaker.record(True, duration=2)
+    breaker.record(True, duration=3)
+
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_half_open_probing():
+    breaker = CircuitBreaker(failure_rate=1, window=1, min_calls=1, open_duration=0.05)
+    breaker.record(False)
+    assert not breaker.allow()
+
+    time.sleep(0.06)
+    assert breaker.allow(), 'Probe call is let through'
+    assert not breaker.allow(), 'Only one probe at once'
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.OPEN, 'Failed probe opens circuit again'
+
+    time.sleep(0.06)
+    assert breaker.allow()
+    breaker.record(True)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_endpoints():
+    assert CircuitBreakers.make_endpoint('GET', 'http://rmatics/problem/run/12/source/') == \
+        'GET /problem/run/<id>/source/'
+    assert CircuitBreakers.make_endpoint('GET', 'http://host/rmatics/problem/run/12/source/',
+                                         'http://host/rmatics') == 'GET /problem/run/<id>/source/'
+
+    breakers = CircuitBreakers(window=1)
+    assert breakers.get('GET', 'http://rmatics/problem/run/1/protocol') is \
+        breakers.get('GET', 'http://rmatics/problem/run/2/protocol')
+    assert breakers.get('GET', 'http://rmatics/problem/run/1/protocol') is not \
+        breakers.get('GET', 'http://rmatics/problem/run/1/source/')
+
+
+def test_stale_responses_are_bounded():
+    stale = StaleResponses(size=1)
+    stale.set('a', (b'{"data": 1}', 200, 'data'))
+    stale.set('b', (b'{"data": 2}', 200, 'data'))
+
+    assert stale.get('a') is None
+    assert stale.get('b') == (2, 200)
+
+
+def test_open_circuit_rejects_requests(fake_rmatics):
+    client = ApiClient(breakers=CircuitBreakers(failure_rate=1, window=1, min_calls=1), stale=StaleResponses(10))
+    url = f'{fake_rmatics.url}/monitor/problem_monitor'
+    fake_rmatics.monitors[1] = [{'problem_id': 1, 'runs': []}]
+
+    assert client.get_data(url, params={'context_id': 1, 'problem_id': [1]}) == (fake_rmatics.monitors[1], 200)
+
+    fake_rmatics.failures = 1
+    _, status = client.get_data(url, params={'context_id': 2, 'problem_id': [1]}, silent=True,
+                                allow_bad_http_statuses=False)
+    assert status == 503
+    assert client.get_circuit_states() == {'GET /monitor/problem_monitor': CircuitBreaker.OPEN}
+    requests_count = len(fake_rmatics.requests)
+
+    assert client.get_data(url, params={'context_id': 1, 'problem_id': [1]}) == (fake_rmatics.monitors[1], 200), \
+        'Stale response is returned'
+    assert client.get_data(url, params={'context_id': 2, 'problem_id': [1]}, silent=True) == (None, 503)
+    with pytest.raises(ServiceUnavailableError):
+        client.get_data(url, params={'context_id': 2, 'problem_id': [1]})
+
+    assert len(fake_rmatics.requests) == requests_count, 'Rejected requests are not sent'
+
+
+def test_unavailable_service_is_http_error():
+    app = Flask(__name__)
+    register_error_handlers(app)
+
+    @app.route('/')
+    def view():
+        raise ServiceUnavailableError()
+
+    response = app.test_client().get('/')
+
+    assert response.status_code == 503
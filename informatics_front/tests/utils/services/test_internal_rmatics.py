@@ -4,6 +4,7 @@ from unittest.mock import Mock
 import pytest
 from werkzeug.datastructures import FileStorage
 
+from informatics_front.utils.services.base import ApiClient
 from informatics_front.utils.services.internal_rmatics import InternalRmatics
 
 PROBLEM_ID = 1
@@ -53,6 +54,7 @@ def test_send_submit(client):
     file = FileStorage(
         io.BytesIO(b'sample data'), filename='test.cpp', content_type='application/pdf'
     )
+    client.client.post_data.return_value = ({}, 200)
 
     client.send_submit(file, USER_ID, PROBLEM_ID, CONTEST_ID, LANG_ID)
     client.client.post_data.assert_called_with(
@@ -61,6 +63,7 @@ def test_send_submit(client):
         files={'file': file.stream},
         silent=True
     )
+    client.client.invalidate_cache.assert_called_with(f'{client.service_url}/problem/{PROBLEM_ID}/submissions/')
 
 
 @pytest.mark.internal_rmatics
@@ -73,16 +76,6 @@ def test_get_run_source(client):
     )
 
 
-@pytest.mark.internal_rmatics
-def test_get_full_run_protocol(client):
-    client.get_full_run_protocol(RUN_ID, USER_ID, is_admin=True)
-    client.client.get_data.assert_called_with(
-        f'{client.service_url}/problem/run/{RUN_ID}/protocol',
-        params={'user_id': USER_ID, 'is_admin': True},
-        silent=True
-    )
-
-
 @pytest.mark.internal_rmatics
 def test_get_monitor(client):
     contest_id = 1
@@ -125,3 +118,60 @@ def test_get_monitor_with_time_before(client):
         silent=True,
         default=[]
     )
+
+
+@pytest.mark.internal_rmatics
+def test_get_monitors(client):
+    contests = {1: [1, 2], 2: [3]}
+    users = [4, 5, 6]
+    time_before = 123456789
+    client.get_monitors(contests, users, time_before)
+    client.client.post_data.assert_called_with(
+        f'{client.service_url}/monitor/problem_monitor/batch',
+        json={
+            'user_id': users,
+            'contests': [{'context_id': 1, 'problem_id': [1, 2]},
+                         {'context_id': 2, 'problem_id': [3]}],
+            'time_before': time_before,
+
+            'context_source': InternalRmatics.default_context_source,
+            'show_hidden': True,
+        },
+        silent=True,
+        default=[],
+        allow_bad_http_statuses=False
+    )
+
+
+@pytest.mark.internal_rmatics
+def test_get_monitors_from_fake_rmatics(fake_rmatics):
+    fake_rmatics.monitors[1] = [{'problem_id': 1, 'runs': [{'id': 1}]},
+                                {'problem_id': 2, 'runs': [{'id': 2}]}]
+    fake_rmatics.monitors[2] = [{'problem_id': 3, 'runs': [{'id': 3}]}]
+
+    client = InternalRmatics()
+    client.service_url = fake_rmatics.url
+    client.client = ApiClient()
+
+    data, status = client.get_monitors({1: [1], 2: [3]}, [4, 5], None)
+
+    assert status == 200
+    assert data == [{'context_id': 1, 'data': [{'problem_id': 1, 'runs': [{'id': 1}]}]},
+                    {'context_id': 2, 'data': [{'problem_id': 3, 'runs': [{'id': 3}]}]}]
+    assert len(fake_rmatics.requests) == 1, 'All contests are fetched by one request'
+
+
+@pytest.mark.internal_rmatics
+def test_get_monitors_with_runs_after(fake_rmatics):
+    fake_rmatics.monitors[1] = [{'problem_id': 1, 'runs': [{'id': 1}, {'id': 2}]}]
+    fake_rmatics.monitors[2] = [{'problem_id': 3, 'runs': [{'id': 3}]}]
+
+    client = InternalRmatics()
+    client.service_url = fake_rmatics.url
+    client.client = ApiClient()
+
+    data, status = client.get_monitors({1: [1], 2: [3]}, [4, 5], None, runs_after={1: 1})
+
+    assert status == 200
+    assert data == [{'context_id': 1, 'data': [{'problem_id': 1, 'runs': [{'id': 2}]}]},
+                    {'context_id': 2, 'data': [{'problem_id': 3, 'runs': [{'id': 3}]}]}]
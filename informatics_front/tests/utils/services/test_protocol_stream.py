@@ -0,0 +1,89 @@
+import io
+import json
+
+import pytest
+
+from informatics_front.utils.services.base import ApiClient
+from informatics_front.utils.services.internal_rmatics import InternalRmatics
+from informatics_front.utils.services.protocol_stream import parse_protocol
+from informatics_front.view.course.contest.run import PROTOCOL_EXCLUDE_FIELDS, PROTOCOL_EXCLUDE_TEST_FIELDS
+
+
+def make_response(protocol) -> io.BytesIO:
+    return io.BytesIO(json.dumps({'data': protocol}).encode('utf-8'))
+
+
+def test_excluded_fields_are_skipped():
+    full_protocol = {
+        'audit': [],
+        'compiler_output': '',
+        'tests': {
+            'data': {
+                'input': 1, 'big_input': 1, 'corr': 1,
+                'big_corr': 1, 'output': 1, 'big_output': 1,
+                'checker_output': 1, 'error_output': 1, 'extra': {'a': [1, 2]},
+                'time': 0.25,
+            }
+        }
+    }
+
+    protocol = parse_protocol(make_response(full_protocol), PROTOCOL_EXCLUDE_FIELDS, PROTOCOL_EXCLUDE_TEST_FIELDS)
+
+    assert protocol == {'compiler_output': '', 'tests': {'data': {'time': 0.25}}}, 'All of fields were filtered'
+
+
+def test_tests_after_bad_test_are_skipped():
+    full_protocol = {'tests':
+                     {
+                         '1': {'status': 'OK'},
+                         '2': {'status': 'OK'},
+                         '3': {'status': 'NOT OK'},
+                         '4': {'status': 'OK'},
+                         '5': {'status': 'NOT OK'},
+                     }
+                     }
+
+    protocol = parse_protocol(make_response(full_protocol), first_bad_test=True)
+
+    assert protocol['tests'] == {'1': {'status': 'OK'},
+                                 '2': {'status': 'OK'},
+                                 '3': {'status': 'NOT OK'}}, \
+        'should stay only last failed test'
+    assert parse_protocol(make_response(full_protocol)) == full_protocol
+
+
+def test_tests_in_any_order():
+    response = io.BytesIO(b'{"data": {"tests": {"1": {"status": "OK"}, "10": {"status": "WA"}, '
+                          b'"11": {"status": "OK"}, "2": {"status": "TL"}, "3": {"status": "OK"}}}}')
+
+    protocol = parse_protocol(response, first_bad_test=True)
+
+    assert list(protocol['tests']) == ['1', '2']
+
+
+def test_invalid_protocol():
+    assert parse_protocol(make_response(None)) is None
+
+    with pytest.raises(ValueError):
+        parse_protocol(io.BytesIO(b'{"data": {"tests": {"1": '))
+
+
+def test_get_run_protocol(fake_rmatics):
+    fake_rmatics.protocols[1] = {'audit': 'audit',
+                                 'tests': {'1': {'status': 'OK', 'input': '1' * 1000},
+                                           '2': {'status': 'WA', 'output': '2' * 1000},
+                                           '3': {'status': 'OK'}}}
+    client = InternalRmatics()
+    client.service_url = fake_rmatics.url
+    client.client = ApiClient()
+
+    protocol, status = client.get_run_protocol(1, 1, PROTOCOL_EXCLUDE_FIELDS, PROTOCOL_EXCLUDE_TEST_FIELDS,
+                                               first_bad_test=True)
+
+    assert status == 200
+    assert protocol == {'tests': {'1': {'status': 'OK'}, '2': {'status': 'WA'}}}
+    _, request = fake_rmatics.requests[0]
+    assert request.args.getlist('exclude_test_fields') == PROTOCOL_EXCLUDE_TEST_FIELDS
+
+    fake_rmatics.failures = 1
+    assert client.get_run_protocol(1, 1, [], []) == (None, 503)
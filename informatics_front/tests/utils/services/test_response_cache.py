@@ -0,0 +1,99 @@
+import time
+
+from flask import Flask
+
+from informatics_front.utils.services.base import ApiClient
+from informatics_front.utils.services.internal_rmatics import InternalRmatics
+from informatics_front.utils.services.response_cache import CachePolicy, CachedResponse, ResponseCache
+
+
+def test_cache_evicts_by_size():
+    cache = ResponseCache(size=10)
+    cache.set(('a', ()), CachedResponse(b'12345', 200, None, None))
+    cache.set(('b', ()), CachedResponse(b'12345', 200, None, None))
+    assert cache.get(('a', ())) is not None, 'Get makes response recently used'
+
+    cache.set(('c', ()), CachedResponse(b'123', 200, None, None))
+
+    assert cache.get(('b', ())) is None
+    assert cache.get(('a', ())) is not None
+    assert cache.get_stats()['used'] == 8
+
+
+def test_cache_expiration():
+    cache = ResponseCache(size=100)
+    now = time.time()
+    cache.set(('fresh', ()), CachedResponse(b'1', 200, now + 10, now + 20))
+    cache.set(('stale', ()), CachedResponse(b'1', 200, now - 10, now + 20))
+    cache.set(('expired', ()), CachedResponse(b'1', 200, now - 20, now - 10))
+
+    assert cache.get(('fresh', ()))[1] is True
+    assert cache.get(('stale', ()))[1] is False
+    assert cache.get(('expired', ())) is None
+
+
+def test_disk_cache_is_shared(tmpdir):
+    entry = CachedResponse(b'{"data": 1}', 200, None, None)
+    ResponseCache(size=100, disk_path=str(tmpdir), disk_size=1000).set(('url', (('a', '1'),)), entry)
+    cache = ResponseCache(size=100, disk_path=str(tmpdir), disk_size=1000)
+
+    assert cache.get(('url', (('a', '1'),))) == (entry, True)
+
+    cache.delete_url('url')
+    assert ResponseCache(size=100, disk_path=str(tmpdir)).get(('url', (('a', '1'),))) is None
+
+
+def test_stale_response_is_revalidated(fake_rmatics):
+    url = f'{fake_rmatics.url}/problem/1/submissions/'
+    client = ApiClient(cache=ResponseCache(size=1000),
+                       cache_policies={'GET /problem/<id>/submissions/': CachePolicy(ttl=0, stale_ttl=60)})
+    fake_rmatics.submissions[1] = [{'id': 1}]
+    assert client.get_data(url, params={'user_id': 1}) == ([{'id': 1}], 200)
+
+    fake_rmatics.submissions[1] = [{'id': 1}, {'id': 2}]
+    assert client.get_data(url, params={'user_id': 1}) == ([{'id': 1}], 200), 'Stale response is returned'
+
+    for _ in range(100):
+        if not client.cache.revalidating:
+            break
+        time.sleep(0.01)
+    assert len(fake_rmatics.requests) == 2
+    assert client.cache.get(client.cache.make_key(url, {'user_id': 1}))[0].content == \
+        b'{"data": [{"id": 1}, {"id": 2}]}'
+
+
+def test_immutable_responses(fake_rmatics):
+    client = ApiClient(cache=ResponseCache(size=1000),
+                       cache_policies={'GET /problem/run/<id>/protocol': CachePolicy(
+                           ttl=10, is_immutable=lambda protocol: bool(protocol.get('tests')))})
+    fake_rmatics.protocols[1] = {'tests': {'1': {'status': 'OK'}}}
+    fake_rmatics.protocols[2] = {'tests': {}}
+
+    for _ in range(2):
+        assert client.get_data(f'{fake_rmatics.url}/problem/run/1/protocol') == (fake_rmatics.protocols[1], 200)
+    assert len(fake_rmatics.requests) == 1
+
+    client.get_data(f'{fake_rmatics.url}/problem/run/2/protocol')
+    key = client.cache.make_key(f'{fake_rmatics.url}/problem/run/2/protocol', None)
+    assert client.cache.get(key)[0].expire_at is not None, 'Mutable response expires'
+
+
+def test_invalidation(fake_rmatics):
+    app = Flask(__name__)
+    app.config.update(INTERNAL_RMATICS_URL=fake_rmatics.url, INTERNAL_RMATICS_CACHE_SIZE=1000)
+    rmatics = InternalRmatics(app)
+
+    rmatics.get_runs_filter(1, 1, {'user_id': 1})
+    rmatics.client.invalidate_cache(rmatics._runs_filter_url(1))
+    rmatics.get_runs_filter(1, 1, {'user_id': 1})
+    assert rmatics.get_cache_stats()['misses'] == 2
+    assert len(fake_rmatics.requests) == 2
+
+
+def test_policies_match_service_url_with_path(fake_rmatics):
+    app = Flask(__name__)
+    app.config.update(INTERNAL_RMATICS_URL=f'{fake_rmatics.url}/problem', INTERNAL_RMATICS_CACHE_SIZE=1000)
+    rmatics = InternalRmatics(app)
+
+    assert rmatics.client._get_cache_policy('GET', f'{fake_rmatics.url}/problem/problem/1/submissions/') is \
+        rmatics.cache_policies['GET /problem/<id>/submissions/']
@@ -0,0 +1,35 @@
+import asyncio
+import concurrent.futures
+import threading
+
+import pytest
+
+from informatics_front.utils.event_loop import EventLoop
+
+
+def test_run():
+    event_loop = EventLoop()
+
+    async def get_thread_name():
+        await asyncio.sleep(0)
+        return threading.current_thread().name
+
+    assert event_loop.run(get_thread_name(), timeout=5) == 'event-loop'
+    assert event_loop.get_loop() is event_loop.get_loop(), 'Loop is shared'
+
+
+def test_run_with_timeout():
+    event_loop = EventLoop()
+    cancelled = threading.Event()
+
+    async def sleep():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(concurrent.futures.TimeoutError):
+        event_loop.run(sleep(), timeout=0.1)
+
+    assert cancelled.wait(timeout=5)
@@ -0,0 +1,20 @@
+import threading
+
+from flask import current_app
+
+from informatics_front.plugins import executor
+
+
+def test_submit_runs_in_app_context(local_client):
+    def get_config_value(key):
+        return threading.current_thread().name, current_app.config[key]
+
+    future = executor.submit(get_config_value, 'EXECUTOR_MAX_WORKERS')
+    thread_name, value = future.result(timeout=5)
+
+    assert thread_name.startswith('app-executor')
+    assert value == local_client.application.config['EXECUTOR_MAX_WORKERS']
+
+
+def test_executor_is_bounded(local_client):
+    assert executor.executor._max_workers == local_client.application.config['EXECUTOR_MAX_WORKERS']
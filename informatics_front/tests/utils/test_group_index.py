@@ -0,0 +1,66 @@
+from unittest.mock import patch
+
+from informatics_front.model import db, UserGroup
+from informatics_front.utils.group_index import GroupIndex, GroupMember
+
+MEMBERS = [GroupMember(1, 'Ivan', 'Ivanov', 'Moscow', '57')]
+
+
+def test_members_are_cached(local_app):
+    group_index = GroupIndex(ttl_param='GROUP_INDEX_TTL', app=local_app)
+
+    with patch.object(GroupIndex, '_load_members', return_value=MEMBERS) as load_members:
+        assert group_index.get_members(1) == MEMBERS
+        assert group_index.get_members(1) == MEMBERS
+        load_members.assert_called_once_with(1)
+
+        group_index.get_members(2)
+        assert load_members.call_count == 2
+
+
+def test_members_expire(local_app):
+    group_index = GroupIndex(ttl_param='GROUP_INDEX_TTL', app=local_app)
+    group_index.ttl = -1
+
+    with patch.object(GroupIndex, '_load_members', return_value=MEMBERS) as load_members:
+        group_index.get_members(1)
+        group_index.get_members(1)
+        assert load_members.call_count == 2
+
+
+def test_invalidate(local_app):
+    group_index = GroupIndex(ttl_param='GROUP_INDEX_TTL', app=local_app)
+
+    with patch.object(GroupIndex, '_load_members', return_value=MEMBERS) as load_members:
+        group_index.get_members(1)
+        group_index.get_members(2)
+
+        group_index.invalidate(1)
+        assert set(group_index.entries) == {2}
+
+        group_index.invalidate()
+        assert group_index.entries == {}
+
+        group_index.get_members(1)
+        assert load_members.call_count == 3
+
+
+def test_load_members(app, group, users):
+    group_index = GroupIndex(ttl_param='GROUP_INDEX_TTL', app=app)
+
+    members = group_index.get_members(group.id)
+
+    assert [member.id for member in members] == sorted(user['id'] for user in users)
+
+
+def test_membership_change_invalidates_group(app, group, users):
+    group_index = GroupIndex(ttl_param='GROUP_INDEX_TTL', app=app)
+    group_index.get_members(group.id)
+
+    user_group = db.session.query(UserGroup).filter(UserGroup.group_id == group.id).first()
+    db.session.delete(user_group)
+    db.session.flush()
+
+    assert group.id not in group_index.entries
+
+    db.session.rollback()
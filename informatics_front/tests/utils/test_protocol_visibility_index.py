@@ -0,0 +1,62 @@
+from unittest.mock import patch
+
+from informatics_front.model import db
+from informatics_front.utils.enums import ContestProtocolVisibility
+from informatics_front.utils.protocol_visibility_index import ProtocolVisibilityIndex
+
+CONTESTS = {1: {10: ContestProtocolVisibility.FULL, 11: ContestProtocolVisibility.FULL}}
+
+
+def test_contest_is_warmed(local_app):
+    index = ProtocolVisibilityIndex(ttl_param='PROTOCOL_VISIBILITY_INDEX_TTL', app=local_app)
+
+    with patch.object(ProtocolVisibilityIndex, '_load_contests', return_value=CONTESTS) as load_contests:
+        assert index.get_visibility(1, 10) is ContestProtocolVisibility.FULL
+        assert index.get_visibility(1, 11) is ContestProtocolVisibility.FULL
+        assert index.get_visibility(1, 12) is None, 'Problem is not in contest'
+        load_contests.assert_called_once_with([1])
+
+
+def test_contests_expire(local_app):
+    index = ProtocolVisibilityIndex(ttl_param='PROTOCOL_VISIBILITY_INDEX_TTL', app=local_app)
+    index.ttl = -1
+
+    with patch.object(ProtocolVisibilityIndex, '_load_contests', return_value=CONTESTS) as load_contests:
+        index.get_visibility(1, 10)
+        index.get_visibility(1, 10)
+        assert load_contests.call_count == 2
+
+
+def test_invalidate(local_app):
+    index = ProtocolVisibilityIndex(ttl_param='PROTOCOL_VISIBILITY_INDEX_TTL', app=local_app)
+
+    with patch.object(ProtocolVisibilityIndex, '_load_contests',
+                      return_value={**CONTESTS, 2: {}}) as load_contests:
+        index.warm([1, 2])
+        assert set(index.entries) == {1, 2}
+
+        index.invalidate(1)
+        assert set(index.entries) == {2}
+
+        index.invalidate()
+        assert index.entries == {}
+
+        index.get_visibility(1, 10)
+        assert load_contests.call_count == 2
+
+
+def test_load_contests(app, statement, contest_builder):
+    contest = contest_builder(protocol_visibility=ContestProtocolVisibility.FIRST_BAD_TEST)
+    index = ProtocolVisibilityIndex(ttl_param='PROTOCOL_VISIBILITY_INDEX_TTL', app=app)
+
+    problem_ids = [problem.id for problem in statement.problems]
+    assert index.warm([contest.id, -1]) == {
+        contest.id: {problem_id: ContestProtocolVisibility.FIRST_BAD_TEST for problem_id in problem_ids},
+        -1: {},
+    }
+
+    contest.protocol_visibility = ContestProtocolVisibility.FULL
+    db.session.flush()
+
+    assert contest.id not in index.entries, 'Change of contest invalidates it'
+    assert index.get_visibility(contest.id, problem_ids[0]) is ContestProtocolVisibility.FULL
@@ -0,0 +1,69 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from informatics_front.utils.single_flight import SingleFlight
+
+CALLERS = 5
+
+
+def make_blocking_func(result=None, error=None):
+    """ Blocks until released """
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def func():
+        calls.append(1)
+        started.set()
+        release.wait(timeout=5)
+        if error:
+            raise error
+        return result
+
+    return func, started, release, calls
+
+
+def test_concurrent_calls_are_coalesced():
+    single_flight = SingleFlight()
+    func, started, release, calls = make_blocking_func(result=[1, 2, 3])
+
+    with ThreadPoolExecutor(max_workers=CALLERS) as pool:
+        leader = pool.submit(single_flight.do, 'key', func)
+        started.wait(timeout=5)
+        followers = [pool.submit(single_flight.do, 'key', func) for _ in range(CALLERS - 1)]
+        time.sleep(0.2)
+        release.set()
+
+        results = [leader.result(timeout=5)] + [future.result(timeout=5) for future in followers]
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results), 'Result is shared'
+    assert single_flight.calls == {}
+
+
+def test_error_is_shared():
+    single_flight = SingleFlight()
+    func, _, release, calls = make_blocking_func(error=ValueError('rmatics is down'))
+    release.set()
+
+    with pytest.raises(ValueError):
+        single_flight.do('key', func)
+    assert single_flight.calls == {}
+
+
+def test_sequential_calls_are_not_coalesced():
+    single_flight = SingleFlight()
+    func, _, release, calls = make_blocking_func(result=1)
+    release.set()
+
+    assert single_flight.do('key', func) == 1
+    assert single_flight.do('key', func) == 1
+    assert len(calls) == 2
+
+
+def test_make_key():
+    assert SingleFlight.make_key('url', {'a': 1, 'b': [2]}) == SingleFlight.make_key('url', {'b': [2], 'a': 1})
+    assert SingleFlight.make_key('url', {'a': 1}) != SingleFlight.make_key('url', {'a': 2})
@@ -0,0 +1,72 @@
+import threading
+
+from informatics_front.utils.streamer import Streamer, Subscription
+
+
+def make_poll(values: list):
+    values = iter(values)
+    polled = threading.Event()
+
+    def poll():
+        polled.set()
+        return next(values, None)
+
+    return poll, polled
+
+
+def diff(previous, current):
+    if previous == current:
+        return None
+    return current - previous
+
+
+def test_subscribers_share_poller(local_app):
+    streamer = Streamer(interval_param='MONITOR_STREAM_INTERVAL',
+                        max_subscriptions_param='MONITOR_STREAM_MAX_CONNECTIONS', app=local_app)
+    streamer.interval = 0.01
+    poll, _ = make_poll([1, 1, 3])
+
+    first = streamer.subscribe('key', poll, diff)
+    assert first.get(timeout=5) == ('snapshot', 1)
+    assert first.get(timeout=5) == ('update', 2)
+
+    second = streamer.subscribe('key', lambda: 100500, diff)
+    assert second.get(timeout=5) == ('snapshot', 3), 'The last value of shared poller is sent first'
+    assert len(streamer.pollers) == 1
+
+    poller = streamer.pollers['key']
+    streamer.unsubscribe(first)
+    assert not poller.stopped.is_set()
+
+    streamer.unsubscribe(second)
+    assert poller.stopped.is_set()
+    assert streamer.pollers == {}
+
+
+def test_max_subscriptions(local_app):
+    streamer = Streamer(interval_param='MONITOR_STREAM_INTERVAL',
+                        max_subscriptions_param='MONITOR_STREAM_MAX_CONNECTIONS', app=local_app)
+    streamer.interval = 0.01
+    streamer.max_subscriptions = 2
+
+    first = streamer.subscribe('key', lambda: 1, diff)
+    second = streamer.subscribe('other key', lambda: 1, diff)
+    assert streamer.subscribe('key', lambda: 1, diff) is None
+
+    streamer.unsubscribe(first)
+    third = streamer.subscribe('key', lambda: 1, diff)
+    assert third is not None
+
+    streamer.unsubscribe(second)
+    streamer.unsubscribe(third)
+    assert streamer.pollers == {}
+
+
+def test_lagging_subscription_gets_snapshot():
+    subscription = Subscription('key', maxsize=2)
+    subscription.offer(('update', 1), 1)
+    subscription.offer(('update', 2), 3)
+    subscription.offer(('update', 3), 6)
+
+    assert subscription.get(timeout=0) == ('snapshot', 6)
+    assert subscription.get(timeout=0) is None
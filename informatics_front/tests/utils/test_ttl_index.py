@@ -0,0 +1,29 @@
+from unittest.mock import patch
+
+from informatics_front.utils.ttl_index import TTLIndex
+
+
+class SquareIndex(TTLIndex):
+    extension_name = 'square_index'
+
+    def _load(self, keys):
+        return {key: key ** 2 for key in keys}
+
+
+def test_entries_are_cached():
+    index = SquareIndex(ttl_param='SQUARE_INDEX_TTL')
+
+    with patch.object(SquareIndex, '_load', wraps=index._load) as load:
+        assert index._get(2) == 4
+        assert index._get(2) == 4
+        load.assert_called_once_with([2])
+
+
+def test_entries_are_bounded():
+    index = SquareIndex(ttl_param='SQUARE_INDEX_TTL', size=2)
+
+    index.warm([1, 2])
+    index._get(1)
+    index._get(3)
+
+    assert list(index.entries) == [1, 3], 'Least recently used entry is evicted'
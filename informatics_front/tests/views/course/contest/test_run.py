@@ -1,9 +1,12 @@
+import time
+
 import pytest
 from flask import url_for, g
 from unittest.mock import patch
 
+from informatics_front.plugins import run_protocol_cacher, internal_rmatics
 from informatics_front.utils.enums import ContestProtocolVisibility
-from informatics_front.view.course.contest.run import RunProtocolApi
+from informatics_front.view.course.contest.run import PROTOCOL_EXCLUDE_FIELDS, PROTOCOL_EXCLUDE_TEST_FIELDS
 
 NON_EXISTING_USER = -1
 NON_EXISTING_RUN = 1337
@@ -94,83 +97,121 @@ def test_get_run_comments_for_invalid_run_id(client, authorized_user):
 
 
 class TestGetRunProtocol:
-    def test_remove_fields_from_full_protocol(self):
-        full_protocol = {
-            'audit': [],
-            'tests': {
-                'data': {
-                    'input': 1, 'big_input': 1, 'corr': 1,
-                    'big_corr': 1, 'output': 1, 'big_output': 1,
-                    'checker_output': 1, 'error_output': 1, 'extra': 1
-                }
-            }
-        }
-
-        resp = RunProtocolApi._remove_fields_from_full_protocol(full_protocol)
-
-        assert resp == {'tests': {'data': {}}}, 'All of fields were filtered'
-
-    def test_remove_all_after_bad_test(self):
-        protocol = {'tests':
-                        {
-                            '1': {'status': 'OK'},
-                            '2': {'status': 'OK'},
-                            '3': {'status': 'NOT OK'},
-                            '4': {'status': 'OK'},
-                            '5': {'status': 'NOT OK'},
-                        }
-                    }
-        res = RunProtocolApi._remove_all_after_bad_test(protocol)
-
-        assert res.get('tests') == {'1': {'status': 'OK'},
-                                    '2': {'status': 'OK'},
-                                    '3': {'status': 'NOT OK'}}, \
-            'should stay only last failed test'
-
     @pytest.mark.run
     def test_get_run_protocol(self, statement, contest_builder, client, authorized_user):
         contest = contest_builder(protocol_visibility=ContestProtocolVisibility.FIRST_BAD_TEST)
-        full_protocol = {
-            'audit': [],
-            'tests': {
-                '1': {
-                    'status': 'OK',
-                    'input': 1, 'big_input': 1, 'corr': 1,
-                    'big_corr': 1, 'output': 1, 'big_output': 1,
-                    'checker_output': 1, 'error_output': 1, 'extra': 1
-                },
-                '2': {
-                    'status': 'OK'
-                },
-                '3': {
-                    'status': 'WA'
-                },
-                '4': {
-                    'status': 'OK'
-                },
-            }
-        }
+        protocol = {'tests':
+                    {
+                        '1': {'status': 'OK'},
+                        '2': {'status': 'OK'},
+                        '3': {'status': 'WA'}
+                    }
+                    }
         run_id = 3
         url = url_for('contest.run_protocol',
                       contest_id=contest.id,
                       problem_id=statement.problems[0].id,
                       run_id=run_id)
 
-        with patch('informatics_front.plugins.internal_rmatics.get_full_run_protocol',
-                   return_value=(full_protocol, 200,)) \
-                as get_full_run_protocol:
+        with patch('informatics_front.plugins.internal_rmatics.get_run_protocol',
+                   return_value=(protocol, 200,)) \
+                as get_run_protocol, \
+                patch.object(run_protocol_cacher, 'get', return_value=None), \
+                patch.object(run_protocol_cacher, 'set') as mock_set:
+
+            resp = client.get(url)
+
+        assert resp.status_code == 200
+
+        get_run_protocol.assert_called_with(run_id, g.user['id'],
+                                            exclude_fields=PROTOCOL_EXCLUDE_FIELDS,
+                                            exclude_test_fields=PROTOCOL_EXCLUDE_TEST_FIELDS,
+                                            first_bad_test=True)
+
+        assert resp.json['data'] == protocol
+
+        mock_set.assert_called_once()
+        _, cached_protocol = mock_set.call_args[0]
+        assert cached_protocol == protocol, 'Filtered protocol of judged run is cached'
+
+    @pytest.mark.run
+    def test_get_cached_run_protocol(self, statement, contest_builder, client, authorized_user):
+        contest = contest_builder(protocol_visibility=ContestProtocolVisibility.FIRST_BAD_TEST)
+        protocol = {'tests': {'1': {'status': 'WA'}}}
+        url = url_for('contest.run_protocol',
+                      contest_id=contest.id,
+                      problem_id=statement.problems[0].id,
+                      run_id=3)
 
+        with patch('informatics_front.plugins.internal_rmatics.get_run_protocol') as get_run_protocol, \
+                patch.object(run_protocol_cacher, 'get', return_value=protocol):
             resp = client.get(url)
 
         assert resp.status_code == 200
+        assert resp.json['data'] == protocol
+        get_run_protocol.assert_not_called()
+
+
+@pytest.mark.run
+def test_get_run(statement, contest_builder, client, authorized_user):
+    contest = contest_builder(protocol_visibility=ContestProtocolVisibility.FULL)
+    source = {'language_id': 1, 'source': 'print(1)'}
+    protocol = {'tests': {'1': {'status': 'OK'}}}
+    run_id = 3
+    url = url_for('contest.run',
+                  contest_id=contest.id,
+                  problem_id=statement.problems[0].id,
+                  run_id=run_id)
+
+    with patch('informatics_front.plugins.internal_rmatics.get_run_source',
+               return_value=(source, 200)) as get_run_source, \
+            patch('informatics_front.plugins.internal_rmatics.get_run_protocol',
+                  return_value=(protocol, 200)), \
+            patch.object(run_protocol_cacher, 'get', return_value=None), \
+            patch.object(run_protocol_cacher, 'set'):
+        resp = client.get(url)
+
+    assert resp.status_code == 200
+    get_run_source.assert_called_with(run_id, g.user['id'])
+    assert resp.json['data'] == {'source': source, 'protocol': protocol, 'comments': []}
+
+
+@pytest.mark.run
+def test_get_run_without_protocol(statement, contest_builder, client, authorized_user):
+    contest = contest_builder(protocol_visibility=ContestProtocolVisibility.INVISIBLE)
+    url = url_for('contest.run',
+                  contest_id=contest.id,
+                  problem_id=statement.problems[0].id,
+                  run_id=3)
+
+    with patch('informatics_front.plugins.internal_rmatics.get_run_source', return_value=({}, 200)), \
+            patch('informatics_front.plugins.internal_rmatics.get_run_protocol') as get_run_protocol:
+        resp = client.get(url)
+
+    assert resp.status_code == 200
+    assert resp.json['data']['protocol'] is None
+    get_run_protocol.assert_not_called()
+
+    with patch('informatics_front.plugins.internal_rmatics.get_run_source', return_value=({}, 404)):
+        resp = client.get(url)
 
-        get_full_run_protocol.assert_called_with(run_id, g.user['id'])
+    assert resp.status_code == 404
+
+
+@pytest.mark.run
+def test_get_run_timeout(statement, contest_builder, client, authorized_user):
+    contest = contest_builder(protocol_visibility=ContestProtocolVisibility.INVISIBLE)
+    url = url_for('contest.run',
+                  contest_id=contest.id,
+                  problem_id=statement.problems[0].id,
+                  run_id=3)
+
+    def get_run_source(*_):
+        time.sleep(0.5)
+        return {}, 200
+
+    with patch('informatics_front.plugins.internal_rmatics.get_run_source', side_effect=get_run_source), \
+            patch.object(internal_rmatics.client, 'get_max_duration', return_value=0.1):
+        resp = client.get(url)
 
-        assert resp.json['data'] == {'tests':
-                                         {
-                                             '1': {'status': 'OK'},
-                                             '2': {'status': 'OK'},
-                                             '3': {'status': 'WA'}
-                                         }
-                                     }, \
-            'All of fields were filtered'
+    assert resp.status_code == 503
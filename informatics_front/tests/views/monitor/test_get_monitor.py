@@ -1,25 +1,37 @@
+import asyncio
 import datetime
+import time
 from unittest.mock import patch, MagicMock
 
-from flask import url_for
+from flask import url_for, json, g
 from dateutil.tz import UTC
 
-from informatics_front.model import db, Problem
+from informatics_front.model import db, Problem, Statement, User
 from informatics_front.model.contest.contest import Contest
 from informatics_front.model.contest.monitor import WorkshopMonitor
-from informatics_front.utils.enums import WorkshopMonitorUserVisibility, WorkshopConnectionStatus
+from informatics_front.utils.enums import WorkshopMonitorUserVisibility, WorkshopConnectionStatus, \
+    WorkshopMonitorType
 from informatics_front.model.user.user import SimpleUser
-from informatics_front.view.course.monitor.monitor import WorkshopMonitorApi
+from informatics_front.utils.run import EjudgeStatuses
+from informatics_front.plugins import internal_rmatics, monitor_cacher, monitor_state_cacher, async_internal_rmatics, \
+    monitor_streamer
+from informatics_front.utils.auth.request_user import RequestUser
+from informatics_front.utils.services.base import ApiClient
+from informatics_front.utils.streamer import Subscription
+from informatics_front.view.course.monitor.monitor import WorkshopMonitorApi, ContestVersion
+from informatics_front.view.course.monitor.monitor_preprocessor import ACMResultMaker
+from informatics_front.view.course.monitor.monitor_stream import WorkshopMonitorStreamApi
+from informatics_front.view.course.monitor.rows import MonitorContest, MonitorProblem, MonitorStatement
+from informatics_front.view.course.monitor.run_table import to_epoch_microseconds
 
 
 def test_get_users(workshop_connection_builder):
     workshop_connection = workshop_connection_builder(WorkshopConnectionStatus.APPLIED)
     workshop = workshop_connection.workshop
-    load_only_fields = ('id',)
 
-    users = WorkshopMonitorApi._find_users_on_workshop(workshop.id, load_only_fields)
+    users = WorkshopMonitorApi._find_users_on_workshop(workshop.id)
 
-    assert users == [workshop_connection.user]
+    assert [user.id for user in users] == [workshop_connection.user.id]
 
 
 def test_get_users_when_for_user_only(authorized_user):
@@ -55,7 +67,9 @@ def test_get_users_by_group(authorized_user, users, group):
 
     users = WorkshopMonitorApi._get_users(monitor, group.id)
 
-    assert users == expected_users
+    assert [user.id for user in users] == sorted(user.id for user in expected_users)
+    assert [user.firstname for user in users] == [user.firstname
+                                                  for user in sorted(expected_users, key=lambda user: user.id)]
 
 
 def test_ensure_permissions_without_conn(workshop_connection_builder):
@@ -70,27 +84,209 @@ def test_ensure_permissions(workshop_connection_builder):
     assert WorkshopMonitorApi._ensure_permissions(workshop.id)
 
 
-def test_get_raw_data_by_contest(ongoing_workshop):
+def test_get_raw_data_concurrently(local_client):
     time_freeze = MagicMock()
     time_freeze.timestamp.return_value = '123'
     monitor = WorkshopMonitor(freeze_time=time_freeze)
     runs = [{'my': 'data'}]
     user_ids = [1, 2, 3]
-    contest = ongoing_workshop['contest']
+    contest = Contest(id=1, statement=Statement(problems=[Problem(id=1), Problem(id=2)]))
 
     with patch('informatics_front'
                '.view.course'
                '.monitor.monitor'
                '.internal_rmatics.get_monitor') as mock_get_monitor:
         mock_get_monitor.return_value = runs, 200
-        response = WorkshopMonitorApi._get_raw_data_by_contest(monitor, user_ids, contest)
+        response = WorkshopMonitorApi._get_raw_data_concurrently(monitor, user_ids, [contest])
 
-    assert response == runs
+    assert response == {contest.id: runs}
 
-    problems = contest.statement.problems
-    problem_ids = list(p.id for p in problems)
+    mock_get_monitor.assert_called_with(contest.id, [1, 2], user_ids, int(time_freeze.timestamp.return_value),
+                                        run_id_after=None)
 
-    mock_get_monitor.assert_called_with(contest.id, problem_ids, user_ids, int(time_freeze.timestamp.return_value))
+
+def test_get_raw_data_concurrently_with_failed_contests(local_client):
+    local_client.application.config['MONITOR_FETCH_TIMEOUT'] = 0.1
+    monitor = WorkshopMonitor()
+    contests = [Contest(id=1, statement=Statement(problems=[Problem(id=1)])),
+                Contest(id=2, statement=Statement(problems=[Problem(id=2)])),
+                Contest(id=3, statement=Statement(problems=[Problem(id=3)]))]
+
+    def get_monitor(contest_id, *_, **__):
+        if contest_id == 2:
+            return {'message': 'Internal error'}, 500
+        if contest_id == 3:
+            time.sleep(0.5)
+        return [{'my': 'data'}], 200
+
+    with patch('informatics_front'
+               '.view.course'
+               '.monitor.monitor'
+               '.internal_rmatics.get_monitor', side_effect=get_monitor):
+        response = WorkshopMonitorApi._get_raw_data_concurrently(monitor, [1, 2, 3], contests)
+
+    assert response == {1: [{'my': 'data'}], 2: None, 3: None}, 'Failed and timed out contests are None'
+
+
+def test_get_raw_data_async(local_client):
+    local_client.application.config['MONITOR_FETCH_TIMEOUT'] = 0.1
+    monitor = WorkshopMonitor()
+    contests = [Contest(id=1, statement=Statement(problems=[Problem(id=1)])),
+                Contest(id=2, statement=Statement(problems=[Problem(id=2)])),
+                Contest(id=3, statement=Statement(problems=[Problem(id=3)])),
+                Contest(id=4, statement=Statement(problems=[Problem(id=4)]))]
+
+    async def get_monitor(contest_id, *_, **__):
+        if contest_id == 2:
+            return {'message': 'Internal error'}, 500
+        if contest_id == 3:
+            await asyncio.sleep(0.5)
+        if contest_id == 4:
+            raise ValueError()
+        return [{'my': 'data'}], 200
+
+    with patch.object(async_internal_rmatics, 'get_monitor', side_effect=get_monitor):
+        response = WorkshopMonitorApi._get_raw_data_async(monitor, [1, 2, 3], contests)
+
+    assert response == {1: [{'my': 'data'}], 2: None, 3: None, 4: None}, 'Failed and timed out contests are None'
+
+
+def test_get_raw_data(fake_rmatics):
+    monitor = WorkshopMonitor()
+    contests = [Contest(id=1, statement=Statement(problems=[Problem(id=1), Problem(id=2)])),
+                Contest(id=2, statement=Statement(problems=[Problem(id=3)]))]
+    fake_rmatics.monitors[1] = [{'problem_id': 1, 'runs': []}]
+    fake_rmatics.monitors[2] = [{'problem_id': 3, 'runs': []}]
+
+    with patch.object(internal_rmatics, 'service_url', fake_rmatics.url), \
+            patch.object(internal_rmatics, 'client', ApiClient()):
+        response = WorkshopMonitorApi._get_raw_data(monitor, [1, 2, 3], contests)
+
+    assert [endpoint for endpoint, _ in fake_rmatics.requests] == ['problem_monitor_batch']
+    assert response == {1: fake_rmatics.monitors[1], 2: fake_rmatics.monitors[2]}
+
+
+def test_get_raw_data_with_missing_contest(local_client):
+    monitor = WorkshopMonitor()
+    contests = [Contest(id=1, statement=Statement(problems=[Problem(id=1)])),
+                Contest(id=2, statement=Statement(problems=[Problem(id=2)]))]
+
+    with patch.object(internal_rmatics, 'get_monitors') as mock_get_monitors:
+        mock_get_monitors.return_value = [{'context_id': 1, 'data': [{'my': 'data'}]}], 200
+        response = WorkshopMonitorApi._get_raw_data(monitor, [1], contests)
+
+    assert response == {1: [{'my': 'data'}], 2: None}, 'Contest missing in batched response is failed'
+
+
+def test_get_raw_data_when_batch_unavailable(local_client):
+    monitor = WorkshopMonitor()
+    contests = [Contest(id=1, statement=Statement(problems=[Problem(id=1)])),
+                Contest(id=2, statement=Statement(problems=[Problem(id=2)]))]
+
+    with patch('informatics_front'
+               '.view.course'
+               '.monitor.monitor'
+               '.internal_rmatics.get_monitors') as mock_get_monitors, \
+            patch('informatics_front'
+                  '.view.course'
+                  '.monitor.monitor'
+                  '.internal_rmatics.get_monitor') as mock_get_monitor:
+        mock_get_monitors.return_value = [], 404
+        mock_get_monitor.return_value = [{'my': 'data'}], 200
+        response = WorkshopMonitorApi._get_raw_data(monitor, [1, 2, 3], contests)
+
+    assert mock_get_monitor.call_count == 2
+    assert response == {1: [{'my': 'data'}], 2: [{'my': 'data'}]}
+
+
+def test_get_results_from_cache(local_client):
+    monitor = WorkshopMonitor(workshop_id=1, type=WorkshopMonitorType.IOI)
+    contests = [Contest(id=1, statement=Statement(problems=[Problem(id=1)])),
+                Contest(id=2, statement=Statement(problems=[Problem(id=2)]))]
+    cached_key = WorkshopMonitorApi._make_cache_key(monitor, contests[0], [1, 2], None)
+    cached_results = {1: {1: 'cached result'}}
+    cached_version = ContestVersion('cached', 0)
+
+    with patch('informatics_front.view.course.monitor.monitor.monitor_cacher.get_many') as mock_get_many, \
+            patch('informatics_front.view.course.monitor.monitor.monitor_cacher.set') as mock_set, \
+            patch('informatics_front.view.course.monitor.monitor.WorkshopMonitorApi._get_raw_data') as mock_raw_data, \
+            patch('informatics_front.view.course.monitor.monitor.WorkshopMonitorApi._prepare_data') as mock_prepare:
+        mock_get_many.return_value = {cached_key: {'results': cached_results, 'version': cached_version}}
+        mock_raw_data.return_value = {2: []}
+        fresh_results, fresh_version = {2: {2: 'fresh result'}}, ContestVersion('fresh', 0)
+        mock_prepare.return_value = fresh_results, fresh_version
+        results, versions = WorkshopMonitorApi._get_results(monitor, contests, [2, 1], None)
+
+    mock_raw_data.assert_called_once_with(monitor, [2, 1], [contests[1]], {})
+    mock_set.assert_called_once_with(WorkshopMonitorApi._make_cache_key(monitor, contests[1], [1, 2], None),
+                                     {'results': fresh_results, 'version': fresh_version},
+                                     invalidate_args=[2])
+    assert results == [{'contest_id': 1, 'results': cached_results},
+                       {'contest_id': 2, 'results': fresh_results}]
+    assert versions == {1: cached_version, 2: fresh_version}
+
+
+def test_get_results_incrementally(local_client, fake_rmatics):
+    local_client.application.config['MONITOR_INCREMENTAL'] = True
+    monitor = WorkshopMonitor(workshop_id=1, type=WorkshopMonitorType.IOI)
+    contest = Contest(id=1, statement=Statement(problems=[Problem(id=1)]))
+    fake_rmatics.monitors[1] = [{'problem_id': 1, 'runs': [
+        {'id': 1, 'user': {'id': 1}, 'ejudge_status': EjudgeStatuses.WA.value, 'ejudge_score': 0},
+        {'id': 2, 'user': {'id': 1}, 'ejudge_status': EjudgeStatuses.PARTIAL.value, 'ejudge_score': 50},
+    ]}]
+
+    with patch.object(internal_rmatics, 'service_url', fake_rmatics.url), \
+            patch.object(internal_rmatics, 'client', ApiClient()), \
+            patch.object(monitor_cacher, 'get_many', return_value={}), \
+            patch.object(monitor_cacher, 'set'), \
+            patch.object(monitor_state_cacher, 'get_many') as mock_get_states, \
+            patch.object(monitor_state_cacher, 'set') as mock_set_state:
+        mock_get_states.return_value = {}
+        first_results, first_versions = WorkshopMonitorApi._get_results(monitor, [contest], [1], None)
+
+        (state_key, state), _ = mock_set_state.call_args
+        mock_get_states.return_value = {state_key: state}
+        fake_rmatics.monitors[1][0]['runs'].append(
+            {'id': 3, 'user': {'id': 1}, 'ejudge_status': EjudgeStatuses.OK.value, 'ejudge_score': 0})
+        second_results, second_versions = WorkshopMonitorApi._get_results(monitor, [contest], [1], None)
+
+    local_client.application.config['MONITOR_INCREMENTAL'] = False
+
+    _, last_request = fake_rmatics.requests[-1]
+    assert json.loads(last_request.get_data(as_text=True))['contests'][0]['run_id_after'] == 2
+    assert first_results[0]['results'][1][1]['mark'] == '50'
+    assert second_results[0]['results'][1][1]['mark'] == '100'
+    assert second_results[0]['results'][1][1]['wrong_tries'] == 2
+    assert first_versions[1].version != second_versions[1].version
+
+
+def test_get_results_incrementally_with_folded_runs(local_client, fake_rmatics):
+    local_client.application.config['MONITOR_INCREMENTAL'] = True
+    monitor = WorkshopMonitor(workshop_id=1, type=WorkshopMonitorType.IOI)
+    contest = Contest(id=1, statement=Statement(problems=[Problem(id=1)]))
+    fake_rmatics.monitors[1] = [{'problem_id': 1, 'runs': [
+        {'id': 1, 'user': {'id': 1}, 'ejudge_status': EjudgeStatuses.WA.value, 'ejudge_score': 0},
+        {'id': 2, 'user': {'id': 1}, 'ejudge_status': EjudgeStatuses.PARTIAL.value, 'ejudge_score': 50},
+    ]}]
+    fake_rmatics.ignore_run_id_after = True
+
+    with patch.object(internal_rmatics, 'service_url', fake_rmatics.url), \
+            patch.object(internal_rmatics, 'client', ApiClient()), \
+            patch.object(monitor_cacher, 'get_many', return_value={}), \
+            patch.object(monitor_cacher, 'set'), \
+            patch.object(monitor_state_cacher, 'get_many') as mock_get_states, \
+            patch.object(monitor_state_cacher, 'set') as mock_set_state:
+        mock_get_states.return_value = {}
+        first_results, _ = WorkshopMonitorApi._get_results(monitor, [contest], [1], None)
+
+        (state_key, state), _ = mock_set_state.call_args
+        mock_get_states.return_value = {state_key: state}
+        second_results, _ = WorkshopMonitorApi._get_results(monitor, [contest], [1], None)
+
+    local_client.application.config['MONITOR_INCREMENTAL'] = False
+
+    assert first_results[0]['results'][1][1]['wrong_tries'] == 2
+    assert second_results == first_results, 'Runs sent again are not folded twice'
 
 
 def test_filter_not_started_contests(authorized_user):
@@ -116,17 +312,46 @@ def test_filter_not_started_contests_when_started(authorized_user):
 def test_make_function_user_start_time_when_not_virtual():
     time_start = datetime.datetime.utcnow().replace(tzinfo=UTC)
     c = Contest(is_virtual=False, time_start=time_start)
-    func = WorkshopMonitorApi._make_start_time_retriever(c, [1, 2, 3])
-    assert func() == time_start
+    func = WorkshopMonitorApi._make_start_time_retriever(c, {})
+    assert func() == to_epoch_microseconds(time_start)
+
 
+def test_make_function_user_start_time_when_virtual():
+    c = Contest(id=1, is_virtual=True)
+    func = WorkshopMonitorApi._make_start_time_retriever(c, {(1, 2): 100500, (3, 4): 1})
 
-def test_make_function_user_start_time_when_virtual(contest_connection):
+    assert func(2) == 100500
+    assert func(4) == 0, 'Start time of other contest'
+    assert func(123) == 0
+
+
+def test_get_start_times(contest_connection):
     c = contest_connection.contest
     c.is_virtual = True
-    func = WorkshopMonitorApi._make_start_time_retriever(c, [1, 2, contest_connection.user_id])
+    other_contest = Contest(id=c.id + 1, is_virtual=True)
+
+    with patch.object(db.session, 'query', wraps=db.session.query) as mock_query:
+        start_times = WorkshopMonitorApi._get_start_times([c, other_contest], [1, 2, contest_connection.user_id])
 
-    assert func(contest_connection.user_id) == contest_connection.created_at.replace(tzinfo=UTC)
-    assert func(123) == datetime.datetime.utcfromtimestamp(0).replace(tzinfo=UTC)
+    mock_query.assert_called_once()
+    assert start_times == {(c.id, contest_connection.user_id): to_epoch_microseconds(contest_connection.created_at)}
+
+
+def test_get_start_times_without_created_at():
+    c = Contest(id=1, is_virtual=True)
+
+    with patch.object(db.session, 'query') as mock_query:
+        mock_query.return_value.filter.return_value.filter.return_value = [(1, 2, None)]
+        start_times = WorkshopMonitorApi._get_start_times([c], [2])
+
+    assert start_times == {(1, 2): 0}
+
+
+def test_get_start_times_without_virtual_contests():
+    with patch.object(db.session, 'query') as mock_query:
+        assert WorkshopMonitorApi._get_start_times([Contest(id=1, is_virtual=False)], [1]) == {}
+
+    mock_query.assert_not_called()
 
 
 def test_simple_view(client, monitor, workshop_connection_builder):
@@ -142,4 +367,257 @@ def test_view_with_group(client, monitor, workshop_connection_builder, group):
     workshop = workshop_connection.workshop
     url = url_for('monitor.workshop', workshop_id=workshop.id, group_id=group.id)
     resp = client.get(url)
-    assert resp.status_code == 200
\ No newline at end of file
+    assert resp.status_code == 200
+
+def test_view_with_standings(client, monitor, workshop_connection_builder):
+    workshop_connection = workshop_connection_builder(WorkshopConnectionStatus.ACCEPTED)
+    workshop = workshop_connection.workshop
+    url = url_for('monitor.workshop', workshop_id=workshop.id, with_standings=True)
+    resp = client.get(url)
+    assert resp.status_code == 200
+    assert isinstance(resp.json['data']['standings'], list)
+
+
+def test_get_window():
+    users = [User(id=user_id) for user_id in (1, 2, 3)]
+    results = [{'contest_id': 1, 'results': {1: {1: 'a'}, 2: {1: 'b'}, 3: {1: 'c'}}}]
+    standings = [{'user_id': 3}, {'user_id': 1}, {'user_id': 2}]
+
+    window_users, window_results, window = WorkshopMonitorApi._get_window(users, results, standings, 1, 1)
+
+    assert [user.id for user in window_users] == [1]
+    assert window_results == [{'contest_id': 1, 'results': {1: {1: 'a'}}}]
+    assert window == [{'user_id': 1}]
+
+    window_users, _, _ = WorkshopMonitorApi._get_window(users, results, standings, 1, None)
+    assert [user.id for user in window_users] == [1, 2]
+
+
+def test_view_with_window(client, monitor, workshop_connection_builder):
+    workshop_connection = workshop_connection_builder(WorkshopConnectionStatus.ACCEPTED)
+    workshop = workshop_connection.workshop
+    url = url_for('monitor.workshop', workshop_id=workshop.id, offset=0, limit=1)
+    resp = client.get(url)
+    assert resp.status_code == 200
+    assert len(resp.json['data']['users']) <= 1
+    assert resp.json['data']['standings'] is None
+
+
+def test_view_with_unknown_contest(client, monitor, workshop_connection_builder):
+    workshop_connection = workshop_connection_builder(WorkshopConnectionStatus.ACCEPTED)
+    workshop = workshop_connection.workshop
+    url = url_for('monitor.workshop', workshop_id=workshop.id, contest_id=100500)
+    resp = client.get(url)
+    assert resp.status_code == 404
+
+
+def test_get_results_delta():
+    previous_results = [{'contest_id': 1, 'results': {1: {1: 'a', 2: 'b'}, 2: {1: 'c'}}}]
+    results = [{'contest_id': 1, 'results': {1: {1: 'a', 2: 'changed'}, 2: {1: 'c'}, 3: {1: 'new'}}},
+               {'contest_id': 2, 'results': {}, 'error': 'Не удалось получить результаты контеста'}]
+
+    delta = WorkshopMonitorApi._get_results_delta(previous_results, results)
+
+    assert delta == [{'contest_id': 1, 'results': {1: {2: 'changed'}, 3: {1: 'new'}}},
+                     {'contest_id': 2, 'results': {}, 'error': 'Не удалось получить результаты контеста'}]
+
+
+def test_make_version():
+    args = {'group_id': None, 'offset': 0, 'limit': None, 'since': None}
+    versions = {1: ContestVersion('a', 10), 2: ContestVersion('b', 20)}
+    version = WorkshopMonitorApi._make_version(versions, [1, 2], args)
+
+    assert version == WorkshopMonitorApi._make_version(versions, [1, 2], {**args, 'since': 'old version'})
+    assert version != WorkshopMonitorApi._make_version({**versions, 2: ContestVersion('c', 20)}, [1, 2], args)
+    assert version != WorkshopMonitorApi._make_version(versions, [1, 2], {**args, 'limit': 10})
+
+
+def test_is_not_modified(local_app):
+    with local_app.test_request_context(headers={'If-None-Match': '"version"'}):
+        assert WorkshopMonitorApi._is_not_modified('version', 0)
+        assert not WorkshopMonitorApi._is_not_modified('other version', 0)
+
+    with local_app.test_request_context(headers={'If-Modified-Since': 'Mon, 01 Apr 2019 10:00:00 GMT'}):
+        last_modified = int(datetime.datetime(2019, 4, 1, 10, 0, tzinfo=UTC).timestamp())
+        assert WorkshopMonitorApi._is_not_modified('version', last_modified)
+        assert not WorkshopMonitorApi._is_not_modified('version', last_modified + 1)
+        assert not WorkshopMonitorApi._is_not_modified('version', 0)
+
+
+def test_view_not_modified(client, monitor, workshop_connection_builder):
+    workshop_connection = workshop_connection_builder(WorkshopConnectionStatus.ACCEPTED)
+    workshop = workshop_connection.workshop
+    url = url_for('monitor.workshop', workshop_id=workshop.id)
+
+    def get_monitors(contests, *args, **kwargs):
+        return [{'context_id': contest_id, 'data': []} for contest_id in contests], 200
+
+    with patch.object(internal_rmatics, 'get_monitors', side_effect=get_monitors):
+        resp = client.get(url)
+    assert resp.status_code == 200
+    assert resp.headers['ETag'] == '"{}"'.format(resp.json['data']['version'])
+    assert resp.json['data']['results']
+    assert not any('error' in contest_results for contest_results in resp.json['data']['results']), \
+        'Results of every contest are cached, so the next request is answered without fetching'
+
+    with patch.object(WorkshopMonitorApi, '_get_results') as mock_get_results:
+        resp = client.get(url, headers={'If-None-Match': resp.headers['ETag']})
+    assert resp.status_code == 304
+    mock_get_results.assert_not_called()
+
+
+def test_view_delta(client, monitor, workshop_connection_builder):
+    workshop_connection = workshop_connection_builder(WorkshopConnectionStatus.ACCEPTED)
+    workshop = workshop_connection.workshop
+    url = url_for('monitor.workshop', workshop_id=workshop.id)
+    version = client.get(url).json['data']['version']
+
+    resp = client.get(url, query_string={'since': version})
+    assert resp.json['data']['is_delta']
+
+    resp = client.get(url, query_string={'since': 'overwritten version'})
+    assert not resp.json['data']['is_delta']
+
+
+def test_stream_disabled(client, monitor, workshop_connection_builder):
+    workshop_connection = workshop_connection_builder(WorkshopConnectionStatus.ACCEPTED)
+    url = url_for('monitor.stream', workshop_id=workshop_connection.workshop.id)
+
+    resp = client.get(url)
+    assert resp.status_code == 404
+
+
+def test_stream_lifetime_and_last_event_id(local_app):
+    local_app.config.update(MONITOR_STREAM=True, MONITOR_STREAM_LIFETIME=0.2)
+    monitor = WorkshopMonitor(workshop_id=1, type=WorkshopMonitorType.IOI)
+    subscription = Subscription((1, None))
+    subscription.offer(('snapshot', {'version': 'a', 'results': []}), None)
+
+    with local_app.test_request_context(headers={'Last-Event-ID': 'a'}), \
+            patch.object(WorkshopMonitorApi, '_ensure_permissions', return_value=True), \
+            patch.object(WorkshopMonitorApi, '_get_contests', return_value=[]), \
+            patch('informatics_front.view.course.monitor.monitor_stream.db') as mock_db, \
+            patch.object(monitor_streamer, 'subscribe', return_value=subscription), \
+            patch.object(monitor_streamer, 'unsubscribe') as mock_unsubscribe:
+        g.user = RequestUser({'id': 1, 'roles': ['teacher']})
+        mock_db.session.query.return_value.filter.return_value.first_or_404.return_value = monitor
+        response = WorkshopMonitorStreamApi().get(1)
+        events = list(response.response)
+
+    local_app.config.update(MONITOR_STREAM=False)
+
+    assert events[0].startswith('retry: ')
+    assert not any(event.startswith('event: snapshot') for event in events), \
+        'Client reconnected with the current version gets no snapshot'
+    mock_unsubscribe.assert_called_once_with(subscription)
+
+
+def test_stream_filter_results():
+    results = [{'contest_id': 1, 'results': {1: {1: 'a'}, 2: {1: 'b'}}},
+               {'contest_id': 2, 'results': {1: {2: 'c'}}}]
+
+    assert WorkshopMonitorStreamApi._filter_results(results, {1, 2}, None) == results
+    assert WorkshopMonitorStreamApi._filter_results(results, {1}, {2}) == [{'contest_id': 1, 'results': {2: {1: 'b'}}}]
+
+
+def test_stream_diff():
+    previous = {'version': 'a', 'results': [{'contest_id': 1, 'results': {1: {1: 'a'}}}]}
+    current = {'version': 'b', 'results': [{'contest_id': 1, 'results': {1: {1: 'a'}, 2: {1: 'b'}}}]}
+
+    assert WorkshopMonitorStreamApi._diff(previous, previous) is None
+    assert WorkshopMonitorStreamApi._diff(previous, current) == {
+        'version': 'b',
+        'results': [{'contest_id': 1, 'results': {2: {1: 'b'}}}],
+    }
+
+
+def test_is_frozen():
+    assert not WorkshopMonitorApi._is_frozen(WorkshopMonitor(freeze_time=None))
+    assert WorkshopMonitorApi._is_frozen(WorkshopMonitor(freeze_time=datetime.datetime(2019, 1, 1)))
+    future = datetime.datetime.now() + datetime.timedelta(days=1)
+    assert not WorkshopMonitorApi._is_frozen(WorkshopMonitor(freeze_time=future))
+
+
+def test_get_results_when_frozen(local_client):
+    monitor = WorkshopMonitor(id=1, workshop_id=1, type=WorkshopMonitorType.IOI,
+                              freeze_time=datetime.datetime(2019, 1, 1))
+    contests = [Contest(id=1, statement=Statement(problems=[Problem(id=1)])),
+                Contest(id=2, statement=Statement(problems=[Problem(id=2)])),
+                Contest(id=3, statement=Statement(problems=[Problem(id=3)]))]
+    frozen_key = WorkshopMonitorApi._make_cache_key(monitor, contests[0], [1], None)
+    frozen_results = {1: {1: 'frozen result'}}
+    testing_cell = {'on_testing': True}
+    settled_cell = {'on_testing': False}
+
+    with patch.object(WorkshopMonitorApi, '_get_frozen_results') as mock_get_frozen, \
+            patch.object(WorkshopMonitorApi, '_freeze_results') as mock_freeze, \
+            patch.object(WorkshopMonitorApi, '_get_raw_data') as mock_raw_data, \
+            patch.object(WorkshopMonitorApi, '_prepare_data') as mock_prepare, \
+            patch.object(monitor_cacher, 'get_many', return_value={}) as mock_get_many, \
+            patch.object(monitor_cacher, 'set'):
+        mock_get_frozen.return_value = {frozen_key: {'results': frozen_results, 'version': ContestVersion('a', 0)}}
+        mock_raw_data.return_value = {2: [], 3: []}
+        mock_prepare.side_effect = [({1: {2: settled_cell}}, ContestVersion('b', 0)),
+                                    ({1: {3: testing_cell}}, ContestVersion('c', 0))]
+        results, _ = WorkshopMonitorApi._get_results(monitor, contests, [1], None)
+
+    assert results[0] == {'contest_id': 1, 'results': frozen_results}
+    assert frozen_key not in list(mock_get_many.call_args[0][0])
+    mock_raw_data.assert_called_once_with(monitor, [1], contests[1:], {})
+    mock_freeze.assert_called_once()
+    assert mock_freeze.call_args[0][1] is contests[1], 'Results with runs on testing are not frozen'
+
+
+def test_get_results_when_frozen_with_missing_contest(local_client):
+    monitor = WorkshopMonitor(id=1, workshop_id=1, type=WorkshopMonitorType.IOI,
+                              freeze_time=datetime.datetime(2019, 1, 1))
+    contests = [Contest(id=1, statement=Statement(problems=[Problem(id=1)])),
+                Contest(id=2, statement=Statement(problems=[Problem(id=2)]))]
+
+    with patch.object(WorkshopMonitorApi, '_get_frozen_results', return_value={}), \
+            patch.object(WorkshopMonitorApi, '_freeze_results') as mock_freeze, \
+            patch.object(internal_rmatics, 'get_monitors') as mock_get_monitors, \
+            patch.object(monitor_cacher, 'get_many', return_value={}), \
+            patch.object(monitor_cacher, 'set') as mock_set:
+        mock_get_monitors.return_value = [{'context_id': 1, 'data': []}], 200
+        results, _ = WorkshopMonitorApi._get_results(monitor, contests, [1], None)
+
+    assert results[1]['error'], 'Contest missing in batched response is failed'
+    assert [call[0][1] for call in mock_freeze.call_args_list] == [contests[0]]
+    assert mock_set.call_count == 1
+
+
+def test_freeze_results(app, monitor):
+    monitor.freeze_time = datetime.datetime(2019, 1, 1)
+    contest = MonitorContest(id=1, workshop_id=monitor.workshop_id, position=1, time_start=None, time_stop=None,
+                             is_virtual=False, virtual_duration=None, created_at=None,
+                             statement=MonitorStatement(1, 'foo', 'bar', [MonitorProblem(1, 'A+B', 1)]),
+                             languages=[])
+    key = WorkshopMonitorApi._make_cache_key(monitor, contest, [1], None)
+    data = {1: {1: {'on_testing': False}}}
+
+    WorkshopMonitorApi._freeze_results(monitor, contest, key, data, ContestVersion('a', 0))
+    WorkshopMonitorApi._freeze_results(monitor, contest, key, data, ContestVersion('a', 0))
+
+    assert WorkshopMonitorApi._get_frozen_results([key]) == {key: {'results': data,
+                                                                   'version': ContestVersion('a', 0)}}
+
+
+def test_snapshot_is_loaded_with_int_ids():
+    data = {1: {2: {'on_testing': False, 'mark': 'OK'}}}
+
+    dumped = WorkshopMonitorApi._dump_snapshot(data, ContestVersion('a', 10))
+
+    assert WorkshopMonitorApi._load_snapshot(dumped) == {'results': data, 'version': ContestVersion('a', 10)}
+
+
+def test_get_result_maker_cls_without_numpy(local_client):
+    local_client.application.config['MONITOR_VECTORIZED'] = True
+    monitor = WorkshopMonitor(workshop_id=1, type=WorkshopMonitorType.ACM)
+
+    with patch('informatics_front.view.course.monitor.monitor.VectorizedACMResultMaker', None):
+        result_maker_cls = WorkshopMonitorApi._get_result_maker_cls(monitor)
+
+    local_client.application.config['MONITOR_VECTORIZED'] = False
+
+    assert result_maker_cls is ACMResultMaker
@@ -4,11 +4,21 @@ from unittest.mock import patch, MagicMock
 from informatics_front.utils.run import EjudgeStatuses
 from informatics_front.view.course.monitor.monitor_preprocessor import IOIResultMaker, BaseResultMaker, \
     MonitorPreprocessor, ACMResultMaker, PENALTY_TIME_SEC, LightACMResultMaker
+from informatics_front.view.course.monitor.run_table import RunTable, RunSlice, to_epoch_microseconds
+
+
+def make_runs(runs: list) -> RunSlice:
+    """ Makes runs of one cell from run dicts """
+    data = [{'problem_id': 1, 'runs': [{'user': {'id': 1}, **run} for run in runs]}]
+    _, _, cell_runs = next(RunTable(data).cells())
+    return cell_runs
 
 
 class FakeResultMaker:
     render_result = {'abc': 123}
 
+    render_table = BaseResultMaker.render_table
+
     def __init__(self):
         self.render = MagicMock()
         self.render.return_value = self.render_result
@@ -36,13 +46,13 @@ class TestBaseResultMaker:
                 {'ejudge_status': in_queue},
                 {'ejudge_status': any_other}]
 
-        assert not BaseResultMaker._is_still_testing(runs), 'The last one not in queue'
+        assert not BaseResultMaker._is_still_testing(make_runs(runs)), 'The last one not in queue'
 
         runs = [{'ejudge_status': any_other},
                 {'ejudge_status': any_other},
                 {'ejudge_status': in_queue}]
 
-        assert BaseResultMaker._is_still_testing(runs), 'The last one in queue'
+        assert BaseResultMaker._is_still_testing(make_runs(runs)), 'The last one in queue'
 
     def test_is_last_ignored(self):
         ignored = EjudgeStatuses.IGNORED.value
@@ -51,13 +61,13 @@ class TestBaseResultMaker:
                 {'ejudge_status': any_other},
                 {'ejudge_status': ignored}]
 
-        assert BaseResultMaker._is_last_ignored(runs)
+        assert BaseResultMaker._is_last_ignored(make_runs(runs))
 
         runs = [{'ejudge_status': any_other},
                 {'ejudge_status': ignored},
                 {'ejudge_status': any_other}]
 
-        assert not BaseResultMaker._is_last_ignored(runs)
+        assert not BaseResultMaker._is_last_ignored(make_runs(runs))
 
     def test_render(self):
         expected = {123: '456'}
@@ -115,7 +125,7 @@ class TestIOIResultMaker:
                 {'ejudge_status': good_status},
                 {'ejudge_status': wrong_status}]
 
-        assert IOIResultMaker.get_wrong_tries_count(runs) == 3
+        assert IOIResultMaker.get_wrong_tries_count(make_runs(runs)) == 3
 
     def test_get_current_mark(self):
         max_mark = 100500
@@ -127,27 +137,96 @@ class TestIOIResultMaker:
             {'ejudge_score': 4},
         ]
 
-        assert IOIResultMaker.get_current_mark(runs) == str(max_mark)
+        assert IOIResultMaker.get_current_mark(make_runs(runs)) == str(max_mark)
 
     def test_update_score_by_statuses(self):
         wrong_status = EjudgeStatuses.TL.value
         ok_status = EjudgeStatuses.OK.value
         pt_status = EjudgeStatuses.PARTIAL.value
 
-        runs = [{'ejudge_status': ok_status,
-                 'ejudge_score': 1}]
+        runs = make_runs([{'ejudge_status': ok_status,
+                           'ejudge_score': 1}])
         IOIResultMaker.update_score_by_statuses(runs)
-        assert runs[0]['ejudge_score'] == IOIResultMaker.MAX_POINTS
+        assert runs.scores[0] == IOIResultMaker.MAX_POINTS
 
-        runs = [{'ejudge_status': pt_status,
-                 'ejudge_score': 123}]
+        runs = make_runs([{'ejudge_status': pt_status,
+                           'ejudge_score': 123}])
         IOIResultMaker.update_score_by_statuses(runs)
-        assert runs[0]['ejudge_score'] == 123
+        assert runs.scores[0] == 123
 
-        runs = [{'ejudge_status': wrong_status,
-                 'ejudge_score': 123}]
+        runs = make_runs([{'ejudge_status': wrong_status,
+                           'ejudge_score': 123}])
         IOIResultMaker.update_score_by_statuses(runs)
-        assert runs[0]['ejudge_score'] == 0
+        assert runs.scores[0] == 0
+
+
+class TestIncrementalRender:
+    def test_merge_marks(self):
+        assert IOIResultMaker.merge_marks('20', '100') == '100'
+        assert IOIResultMaker.merge_marks('30', '3') == '30'
+        assert LightACMResultMaker.merge_marks('AC', 'OK') == 'AC'
+        assert LightACMResultMaker.merge_marks('WA', 'OK') == 'OK'
+        assert LightACMResultMaker.merge_marks('WA', 'WA') == 'WA'
+
+    def test_render_state_matches_render(self):
+        statuses = [EjudgeStatuses.WA.value, EjudgeStatuses.PARTIAL.value, EjudgeStatuses.OK.value,
+                    EjudgeStatuses.IGNORED.value, EjudgeStatuses.RUNNING.value, EjudgeStatuses.AC.value]
+        start_time = datetime.datetime(2019, 1, 1).astimezone()
+        result_makers = [IOIResultMaker(),
+                         LightACMResultMaker(lambda _: to_epoch_microseconds(start_time)),
+                         ACMResultMaker(lambda _: to_epoch_microseconds(start_time))]
+
+        for result_maker in result_makers:
+            for split in range(1, len(statuses)):
+                for last in range(split + 1, len(statuses) + 1):
+                    runs = [{'ejudge_status': status,
+                             'ejudge_score': 10 * i,
+                             'create_time': start_time.strftime('%Y-%m-%dT%H:%M:%S%z')}
+                            for i, status in enumerate(statuses[:last])]
+                    state = result_maker.merge_states(result_maker.make_state(make_runs(runs[:split]), 1),
+                                                      result_maker.make_state(make_runs(runs[split:]), 1))
+
+                    assert result_maker.render_state(state) == result_maker.render(make_runs(runs), 1)
+
+    def test_render_incrementally(self):
+        def make_run(run_id, user_id, status, score=0):
+            return {'id': run_id, 'user': {'id': user_id}, 'ejudge_status': status, 'ejudge_score': score}
+
+        first_data = [{'problem_id': 1, 'runs': [make_run(1, 1, EjudgeStatuses.WA.value),
+                                                 make_run(2, 2, EjudgeStatuses.PARTIAL.value, 40),
+                                                 make_run(3, 1, EjudgeStatuses.RUNNING.value)]}]
+        result, state = MonitorPreprocessor(first_data).render_incrementally(IOIResultMaker(), None)
+
+        assert state['last_run_id'] == 2, 'Run on testing and every newer one are not settled'
+        assert set(state['cells']) == {(1, 1), (2, 1)}
+        assert result[1][1]['on_testing']
+
+        next_data = [{'problem_id': 1, 'runs': [make_run(3, 1, EjudgeStatuses.OK.value),
+                                                make_run(4, 2, EjudgeStatuses.WA.value)]}]
+        result, state = MonitorPreprocessor(next_data).render_incrementally(IOIResultMaker(), state)
+
+        full_data = [{'problem_id': 1, 'runs': [make_run(1, 1, EjudgeStatuses.WA.value),
+                                                make_run(2, 2, EjudgeStatuses.PARTIAL.value, 40),
+                                                make_run(3, 1, EjudgeStatuses.OK.value),
+                                                make_run(4, 2, EjudgeStatuses.WA.value)]}]
+        assert state['last_run_id'] == 4
+        assert dict(result) == dict(MonitorPreprocessor(full_data).render(IOIResultMaker()))
+
+        result, same_state = MonitorPreprocessor(full_data).render_incrementally(IOIResultMaker(), state)
+
+        assert same_state == state, 'Runs which are already folded are skipped'
+        assert dict(result) == dict(MonitorPreprocessor(full_data).render(IOIResultMaker()))
+
+    def test_render_incrementally_without_run_ids(self):
+        data = [{'problem_id': 1, 'runs': [{'user': {'id': 1}, 'ejudge_status': EjudgeStatuses.WA.value},
+                                           {'user': {'id': 1}, 'ejudge_status': EjudgeStatuses.OK.value}]}]
+        state = {'last_run_id': 10, 'cells': {(1, 1): {'last_status': EjudgeStatuses.WA.value,
+                                                        'wrong_tries': 5, 'mark': '0', 'time': 0}}}
+
+        result, next_state = MonitorPreprocessor(data).render_incrementally(IOIResultMaker(), state)
+
+        assert next_state is None
+        assert dict(result) == dict(MonitorPreprocessor(data).render(IOIResultMaker()))
 
 
 class TestLightACMResultMaker:
@@ -158,7 +237,7 @@ class TestLightACMResultMaker:
             {'ejudge_status': EjudgeStatuses.REJECTED.value},
             {'ejudge_status': EjudgeStatuses.CE.value},
         ]
-        assert 'WA' == LightACMResultMaker.get_current_mark(runs)
+        assert 'WA' == LightACMResultMaker.get_current_mark(make_runs(runs))
 
         runs = [
             {'ejudge_status': EjudgeStatuses.PARTIAL.value},
@@ -166,7 +245,7 @@ class TestLightACMResultMaker:
             {'ejudge_status': EjudgeStatuses.OK.value},
             {'ejudge_status': EjudgeStatuses.CE.value},
         ]
-        assert 'OK' == LightACMResultMaker.get_current_mark(runs)
+        assert 'OK' == LightACMResultMaker.get_current_mark(make_runs(runs))
 
         runs = [
             {'ejudge_status': EjudgeStatuses.OK.value},
@@ -174,13 +253,13 @@ class TestLightACMResultMaker:
             {'ejudge_status': EjudgeStatuses.AC.value},
             {'ejudge_status': EjudgeStatuses.OK.value},
         ]
-        assert 'AC' == LightACMResultMaker.get_current_mark(runs)
+        assert 'AC' == LightACMResultMaker.get_current_mark(make_runs(runs))
 
     def test_get_time(self):
         time_now = datetime.datetime.utcnow()
         start_time = time_now - datetime.timedelta(days=1)
         get_user_start_time = MagicMock()
-        get_user_start_time.return_value = start_time.astimezone()
+        get_user_start_time.return_value = to_epoch_microseconds(start_time)
 
         result_maker = LightACMResultMaker(get_user_start_time)
 
@@ -188,79 +267,65 @@ class TestLightACMResultMaker:
             {'ejudge_status': EjudgeStatuses.PARTIAL.value},
             {'ejudge_status': EjudgeStatuses.WA.value},
         ]
-        assert result_maker.get_time(123, runs) == 0, 'There is not wright submission'
+        assert result_maker.get_time(123, make_runs(runs)) == 0, 'There is not wright submission'
         get_user_start_time.assert_not_called()
 
         runs = [
             {'ejudge_status': EjudgeStatuses.OK.value,
              'create_time': time_now.astimezone().strftime('%Y-%m-%dT%H:%M:%S%z')},
-            {'ejudge_status': EjudgeStatuses.WA},
+            {'ejudge_status': EjudgeStatuses.WA.value},
         ]
-        assert result_maker.get_time(123, runs) + 1 \
+        assert result_maker.get_time(123, make_runs(runs)) + 1 \
             == int(datetime.timedelta(days=1).total_seconds())
 
         runs = [
             {'ejudge_status': EjudgeStatuses.AC.value,
              'create_time': time_now.astimezone().strftime('%Y-%m-%dT%H:%M:%S%z')},
-            {'ejudge_status': EjudgeStatuses.WA},
+            {'ejudge_status': EjudgeStatuses.WA.value},
         ]
-        assert result_maker.get_time(123, runs) + 1 \
+        assert result_maker.get_time(123, make_runs(runs)) + 1 \
             == int(datetime.timedelta(days=1).total_seconds())
 
         runs = [
             {'ejudge_status': EjudgeStatuses.OK.value},
             {'ejudge_status': EjudgeStatuses.OK.value,
              'create_time': time_now.astimezone().strftime('%Y-%m-%dT%H:%M:%S%z')},
-            {'ejudge_status': EjudgeStatuses.WA},
+            {'ejudge_status': EjudgeStatuses.WA.value},
         ]
-        assert result_maker.get_time(123, runs) + 1 \
+        assert result_maker.get_time(123, make_runs(runs)) + 1 \
             == int(datetime.timedelta(days=1).total_seconds())
 
 
 class TestMonitorPreprocessor:
-    def test_group_by_users(self):
-        runs = [
-            {'user': {'id': 1}},
-            {'user': {'id': 1}},
-            {'user': {'id': 2}},
-            {'user': {'id': 2}},
-            {'user': {'id': 2}},
-            {'user': {'id': 3}},
+    def test_group_by_cells(self):
+        data = [
+            {'problem_id': 2, 'runs': [{'id': 1, 'user': {'id': 1}},
+                                       {'id': 2, 'user': {'id': 2}},
+                                       {'id': 3, 'user': {'id': 1}}]},
+            {'problem_id': 1, 'runs': [{'id': 4, 'user': {'id': 3}}]},
         ]
 
-        expects = {
-            1: [{'user': {'id': 1}}, {'user': {'id': 1}}],
-            2: [{'user': {'id': 2}}, {'user': {'id': 2}}, {'user': {'id': 2}}],
-            3: [{'user': {'id': 3}}]
-        }
-
-        resp = MonitorPreprocessor._group_by_users(runs)
+        runs = RunTable(data, with_create_time=False)
 
-        assert dict(resp) == expects
+        cells = [(user_id, problem_id, list(cell_runs.ids))
+                 for user_id, problem_id, cell_runs in runs.cells()]
+        assert cells == [(3, 1, [4]),
+                         (1, 2, [1, 3]),
+                         (2, 2, [2])]
+        assert sorted(runs.get_user_ids([2])) == [1, 2]
 
     def test_render(self):
         result_maker = FakeResultMaker()
 
         data = [
-            {'problem_id': 1, 'runs': []},
-            {'problem_id': 2, 'runs': []},
-            {'problem_id': 3, 'runs': []},
+            {'problem_id': problem_id, 'runs': [{'user': {'id': 1}}, {'user': {'id': 2}}, {'user': {'id': 1}}]}
+            for problem_id in (1, 2, 3)
         ]
 
-        with patch('informatics_front'
-                   '.view.'
-                   'course'
-                   '.monitor'
-                   '.monitor_preprocessor'
-                   '.MonitorPreprocessor'
-                   '._group_by_users') as mock_group_by_users:
-            mock_group_by_users.return_value = {1: [{'user': {'id': 1}}, {'user': {'id': 1}}],
-                                                2: [{'user': {'id': 1}}, {'user': {'id': 1}}]}
-            m = MonitorPreprocessor(data)
-            response = m.render(result_maker)
+        m = MonitorPreprocessor(data)
+        response = m.render(result_maker)
 
         assert result_maker.render.call_count == 6
-        assert mock_group_by_users.call_count == 3
         expected = {
             1: {1: result_maker.render_result,
                 2: result_maker.render_result,
@@ -270,3 +335,44 @@ class TestMonitorPreprocessor:
                 3: result_maker.render_result},
         }
         assert dict(response) == expected
+
+
+class TestACMResultMaker:
+    def test_wrong_tries_after_success(self):
+        runs = make_runs([
+            {'ejudge_status': EjudgeStatuses.WA.value},
+            {'ejudge_status': EjudgeStatuses.OK.value},
+            {'ejudge_status': EjudgeStatuses.WA.value},
+            {'ejudge_status': EjudgeStatuses.TL.value},
+        ])
+
+        result = ACMResultMaker(lambda _: 0).render(runs, 1)
+
+        assert result['success']
+        assert result['wrong_tries'] == 3
+        assert result['wrong_tries_before_success'] == 1
+
+    def test_wrong_tries_before_success_of_unsolved(self):
+        runs = make_runs([
+            {'ejudge_status': EjudgeStatuses.WA.value},
+            {'ejudge_status': EjudgeStatuses.TL.value},
+        ])
+
+        result = ACMResultMaker(lambda _: 0).render(runs, 1)
+
+        assert result['wrong_tries'] == 2
+        assert result['wrong_tries_before_success'] == 0
+
+    def test_time_of_first_right_run(self):
+        runs = make_runs([
+            {'ejudge_status': EjudgeStatuses.WA.value, 'create_time': '2019-01-01T00:01:00+0000'},
+            {'ejudge_status': EjudgeStatuses.OK.value, 'create_time': '2019-01-01T00:02:00+0000'},
+            {'ejudge_status': EjudgeStatuses.AC.value, 'create_time': '2019-01-01T00:05:00+0000'},
+        ])
+        start_time = to_epoch_microseconds(datetime.datetime(2019, 1, 1, tzinfo=datetime.timezone.utc))
+
+        result = ACMResultMaker(lambda _: start_time).render(runs, 1)
+        light_result = LightACMResultMaker(lambda _: start_time).render(runs, 1)
+
+        assert result['time'] == 120, 'Penalty is counted up to the first right run'
+        assert light_result['time'] == 300
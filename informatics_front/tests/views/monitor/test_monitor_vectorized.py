@@ -0,0 +1,58 @@
+import datetime
+import random
+
+import pytest
+
+from informatics_front.utils.run import EjudgeStatuses
+from informatics_front.view.course.monitor.monitor import VectorizedIOIResultMaker, \
+    VectorizedLightACMResultMaker, VectorizedACMResultMaker
+from informatics_front.view.course.monitor.monitor_preprocessor import MonitorPreprocessor, IOIResultMaker, \
+    LightACMResultMaker, ACMResultMaker
+from informatics_front.view.course.monitor.run_table import to_epoch_microseconds
+
+pytestmark = pytest.mark.skipif(VectorizedACMResultMaker is None, reason='NumPy is not installed')
+
+
+def make_data(seed: int) -> list:
+    rnd = random.Random(seed)
+    start_time = datetime.datetime(2019, 1, 1, tzinfo=datetime.timezone.utc)
+    statuses = [status.value for status in EjudgeStatuses]
+    run_id = 0
+    data = []
+    for problem_id in range(1, 5):
+        runs = []
+        for _ in range(rnd.randint(0, 40)):
+            run_id += 1
+            create_time = start_time + datetime.timedelta(seconds=rnd.randint(0, 10 ** 6))
+            runs.append({'id': run_id,
+                         'user': {'id': rnd.randint(1, 7)},
+                         'ejudge_status': rnd.choice(statuses),
+                         'ejudge_score': rnd.randint(0, 100),
+                         'create_time': create_time.strftime('%Y-%m-%dT%H:%M:%S%z')})
+        data.append({'problem_id': problem_id, 'runs': runs})
+    return data
+
+
+def get_user_start_time(user_id: int) -> int:
+    start_time = datetime.datetime(2019, 1, 1, 0, 0, user_id, 1000 * user_id, tzinfo=datetime.timezone.utc)
+    return to_epoch_microseconds(start_time)
+
+
+def test_render_same_as_per_cell():
+    makers = [
+        (IOIResultMaker(), VectorizedIOIResultMaker()),
+        (LightACMResultMaker(get_user_start_time), VectorizedLightACMResultMaker(get_user_start_time)),
+        (ACMResultMaker(get_user_start_time), VectorizedACMResultMaker(get_user_start_time)),
+    ]
+    for seed in range(20):
+        for result_maker, vectorized_result_maker in makers:
+            expected = MonitorPreprocessor(make_data(seed)).render(result_maker)
+            result = MonitorPreprocessor(make_data(seed)).render(vectorized_result_maker)
+
+            assert dict(result) == dict(expected)
+
+
+def test_render_empty():
+    result = MonitorPreprocessor([{'problem_id': 1, 'runs': []}]).render(VectorizedIOIResultMaker())
+
+    assert dict(result) == {}
@@ -0,0 +1,34 @@
+import datetime
+
+from informatics_front.view.course.monitor.monitor import MonitorData
+from informatics_front.view.course.monitor.rows import MonitorContest, MonitorLanguage, MonitorProblem, \
+    MonitorStatement
+from informatics_front.view.course.monitor.serializers.monitor import monitor_schema
+
+
+def make_contest(**kwargs) -> MonitorContest:
+    fields = dict(id=1, workshop_id=2, position=1,
+                  time_start=datetime.datetime(2019, 1, 1), time_stop=None,
+                  is_virtual=False, virtual_duration=datetime.timedelta(hours=1),
+                  created_at=datetime.datetime(2019, 1, 1),
+                  statement=MonitorStatement(3, 'foo', 'bar', [MonitorProblem(4, 'A+B', 1)]),
+                  languages=[MonitorLanguage(5, 1, 'GNU C', 'c')])
+    fields.update(kwargs)
+    return MonitorContest(**fields)
+
+
+def test_is_started():
+    assert make_contest().is_started(None)
+    assert not make_contest(time_start=datetime.datetime.utcnow() + datetime.timedelta(days=1)).is_started(None)
+    assert not make_contest(is_virtual=True).is_started(None)
+
+
+def test_contest_serialization():
+    monitor_data = MonitorData([make_contest()], [], [], 'IOI', None, 0, '', False)
+
+    contest, = monitor_schema.dump(monitor_data).data['contests']
+
+    assert contest['statement'] == {'id': 3, 'name': 'foo', 'summary': 'bar',
+                                    'problems': [{'id': 4, 'name': 'A+B', 'rank': 1}]}
+    assert contest['languages'] == [{'id': 5, 'code': 1, 'title': 'GNU C', 'mode': 'c'}]
+    assert contest['virtual_duration'] == 3600
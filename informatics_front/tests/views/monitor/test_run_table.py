@@ -0,0 +1,24 @@
+import datetime
+
+from informatics_front.view.course.monitor.run_table import parse_create_time, CREATE_TIME_FORMAT, \
+    seconds_between, to_epoch_microseconds
+
+
+def test_parse_create_time():
+    create_times = ['2019-04-01T10:20:30+0300', '2019-04-01T10:20:30-0430',
+                    '2019-04-01T10:20:30+03:00', '2019-12-31T23:59:59Z', '2020-02-29T00:00:00+0000']
+    for create_time in create_times:
+        expected = int(datetime.datetime.strptime(create_time, CREATE_TIME_FORMAT).timestamp())
+        assert parse_create_time(create_time) == expected
+
+    assert parse_create_time(1554103230) == 1554103230
+    assert parse_create_time(None) == 0
+
+
+def test_seconds_between():
+    start_time = datetime.datetime(2019, 1, 1, 10, 0, 0, 500000)
+    for seconds in (0, 1, 59, 3600):
+        delivery_time = datetime.datetime(2019, 1, 1, 10, 0, 0) + datetime.timedelta(seconds=seconds)
+        expected = int((delivery_time - start_time).total_seconds())
+
+        assert seconds_between(to_epoch_microseconds(start_time), to_epoch_microseconds(delivery_time)) == expected
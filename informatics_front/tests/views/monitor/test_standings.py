@@ -0,0 +1,72 @@
+from informatics_front.view.course.monitor.monitor_preprocessor import BaseResultMaker, PENALTY_TIME_SEC
+from informatics_front.view.course.monitor.standings import ACMStandingsMaker, IOIStandingsMaker, \
+    LightACMStandingsMaker
+
+
+def make_cell(mark: str, success: bool, time: int = 0, wrong_tries: int = 0,
+              wrong_tries_before_success: int = None) -> dict:
+    cell = BaseResultMaker._make_result(mark=mark, success=success, time=time, wrong_tries=wrong_tries)
+    cell['wrong_tries_before_success'] = wrong_tries if wrong_tries_before_success is None \
+        else wrong_tries_before_success
+    return cell
+
+
+def places(standings: list) -> list:
+    return [(user_totals['user_id'], user_totals['place_from'], user_totals['place_to'])
+            for user_totals in standings]
+
+
+def test_acm_standings():
+    results = [
+        {'contest_id': 1, 'results': {1: {1: make_cell('OK', True, 100, 1), 2: make_cell('WA', False, 0, 3)},
+                                      2: {1: make_cell('AC', True, 50)},
+                                      3: {1: make_cell('OK', True, 90), 2: make_cell('OK', True, 500)}}},
+        {'contest_id': 2, 'results': {1: {3: make_cell('OK', True, 40)},
+                                      5: {3: make_cell('OK', True, 40)}}},
+        {'contest_id': 3, 'results': {}, 'error': 'Не удалось получить результаты контеста'},
+    ]
+
+    standings = ACMStandingsMaker().make(results, [1, 2, 3, 4])
+
+    assert places(standings) == [(3, 1, 1), (1, 2, 2), (2, 3, 3), (4, 4, 4)]
+    assert standings[1] == {'user_id': 1, 'solved': 2, 'penalty': 140 + PENALTY_TIME_SEC, 'score': 0,
+                            'place_from': 2, 'place_to': 2}
+
+
+def test_acm_standings_wrong_tries_after_success():
+    results = [
+        {'contest_id': 1, 'results': {1: {1: make_cell('OK', True, 100, 3, wrong_tries_before_success=1)},
+                                      2: {1: make_cell('OK', True, 100, 2)}}},
+    ]
+
+    standings = ACMStandingsMaker().make(results, [1, 2])
+
+    assert places(standings) == [(1, 1, 1), (2, 2, 2)]
+    assert [user_totals['penalty'] for user_totals in standings] == [100 + PENALTY_TIME_SEC,
+                                                                     100 + 2 * PENALTY_TIME_SEC]
+
+
+def test_light_acm_standings_ties():
+    results = [
+        {'contest_id': 1, 'results': {1: {1: make_cell('OK', True, 100, 1)},
+                                      2: {1: make_cell('AC', True, 50)},
+                                      3: {1: make_cell('WA', False, 0, 1)}}},
+    ]
+
+    standings = LightACMStandingsMaker().make(results, [1, 2, 3])
+
+    assert places(standings) == [(1, 1, 2), (2, 1, 2), (3, 3, 3)]
+
+
+def test_ioi_standings():
+    results = [
+        {'contest_id': 1, 'results': {1: {1: make_cell('100', True), 2: make_cell('30', False)},
+                                      2: {1: make_cell('', False), 2: make_cell('40', False)},
+                                      3: {1: make_cell('70', False), 2: make_cell('60', False)}}},
+    ]
+
+    standings = IOIStandingsMaker().make(results, [1, 2, 3])
+
+    assert places(standings) == [(1, 1, 2), (3, 1, 2), (2, 3, 3)]
+    assert [user_totals['score'] for user_totals in standings] == [130, 130, 40]
+    assert [user_totals['solved'] for user_totals in standings] == [1, 0, 0]
@@ -0,0 +1,195 @@
+import datetime
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from flask import Flask
+
+from informatics_front.model.base import db
+from informatics_front.model.cache_meta import CacheInvalidateArg, CacheMeta
+from informatics_front.utils.cacher.storage import BaseStorage, MemoryStorage, RedisStorage
+
+
+class StorageCacher:
+    """Cache of values, which don't change until TTL, e.g. protocols of judged runs.
+
+    Values live in storage only (redis, if REDIS_URL is configured,
+    otherwise process memory) for `ttl_param` seconds from app config,
+    so neither get nor set touch DB. Use Cacher, if values have to be
+    invalidated.
+
+    Usage:
+        # plugins.py
+        run_protocol_cacher = StorageCacher(prefix='run_protocol', ttl_param='RUN_PROTOCOL_CACHE_TTL')
+
+        # views.py
+        key = run_protocol_cacher.make_key(run_id=1)
+        data = run_protocol_cacher.get(key)
+        if data is None:
+            data = ...
+            run_protocol_cacher.set(key, data)
+    """
+
+    default_ttl = 60
+
+    def __init__(self, prefix: str, ttl_param: str, app: Flask = None):
+        self.prefix = prefix
+        self.ttl_param = ttl_param
+        self.ttl = self.default_ttl
+        self.storage: BaseStorage = None
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        redis_url = app.config.get('REDIS_URL')
+        self.storage = RedisStorage(redis_url) if redis_url \
+            else MemoryStorage(app.config.get('MEMORY_CACHE_SIZE') or MemoryStorage.default_size)
+        self.ttl = app.config.get(self.ttl_param) or self.default_ttl
+        app.extensions[f'cacher_{self.prefix}'] = self
+
+    @classmethod
+    def make_key(cls, **kwargs) -> str:
+        """ Returns 64 symbols key, unique for provided kwargs """
+        dumped = json.dumps(kwargs, sort_keys=True, default=str)
+        return hashlib.sha256(dumped.encode('utf-8')).hexdigest()
+
+    def _storage_key(self, key: str) -> str:
+        return f'{self.prefix}:{key}'
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.storage.get(self._storage_key(key))
+
+    def set(self, key: str, value: Any):
+        self.storage.set(self._storage_key(key), value, self.ttl)
+
+
+class Cacher(StorageCacher):
+    """Cache with invalidation by args (e.g. problem ids).
+
+    Values live in storage (redis, if REDIS_URL is configured,
+    otherwise process memory), while `CacheMeta` rows keep expiration
+    time of every key and `CacheInvalidateArg` rows it's invalidation
+    args. Key is valid only while both meta row exists and it's
+    `when_expire` is not reached. Expired rows of prefix are purged
+    at most once in `purge_interval` seconds by `set`.
+
+    Meta rows are written by separate connection, so caching never
+    commits (and expires) objects of request's DB session.
+
+    Usage:
+        # plugins.py
+        monitor_cacher = Cacher(prefix='workshop_monitor', label='results',
+                                ttl_param='MONITOR_CACHE_TTL')
+
+        # views.py
+        key = monitor_cacher.make_key(contest_id=1, group_id=None)
+        data = monitor_cacher.get(key)
+        if data is None:
+            data = ...
+            monitor_cacher.set(key, data, invalidate_args=problem_ids)
+
+        # somewhere, when problem results are changed
+        monitor_cacher.invalidate(problem_id)
+    """
+
+    purge_interval = 60
+
+    def __init__(self, prefix: str, label: str, ttl_param: str, app: Flask = None):
+        self.label = label
+        self.purged_at = time.monotonic()
+        self.purge_lock = threading.Lock()
+        super().__init__(prefix, ttl_param, app)
+
+    def get(self, key: str) -> Optional[Any]:
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, Any]:
+        """ Returns only found values by key; checks expiration by one query """
+        keys = list(keys)
+        if not keys:
+            return {}
+
+        valid_keys = db.session.query(CacheMeta.key) \
+            .filter(CacheMeta.prefix == self.prefix,
+                    CacheMeta.key.in_(keys),
+                    CacheMeta.when_expire > datetime.datetime.utcnow()) \
+            .all()
+
+        values = {}
+        for key, in valid_keys:
+            value = self.storage.get(self._storage_key(key))
+            if value is not None:
+                values[key] = value
+
+        return values
+
+    def set(self, key: str, value: Any, invalidate_args: Iterable[int] = ()):
+        invalidate_args = [str(arg) for arg in invalidate_args]
+        now = datetime.datetime.utcnow()
+
+        meta_table = CacheMeta.__table__
+        with db.engine.begin() as connection:
+            self._delete_keys(connection, [key])
+            connection.execute(meta_table.insert().values(
+                prefix=self.prefix,
+                label=self.label,
+                key=key,
+                problem_id=int(invalidate_args[0]) if invalidate_args else 0,
+                invalidate_args=CacheMeta.get_invalidate_args(invalidate_args),
+                created=now,
+                when_expire=now + datetime.timedelta(seconds=self.ttl),
+            ))
+            if invalidate_args:
+                connection.execute(CacheInvalidateArg.__table__.insert(), [
+                    {'prefix': self.prefix, 'key': key, 'arg': arg}
+                    for arg in set(invalidate_args)
+                ])
+
+        self.storage.set(self._storage_key(key), value, self.ttl)
+
+        if self._is_purge_needed():
+            self.purge_expired()
+
+    def invalidate(self, arg: int):
+        """ Drops every key, which was set with `arg` in invalidate_args """
+        args_table = CacheInvalidateArg.__table__
+        with db.engine.begin() as connection:
+            keys = [key for key, in connection.execute(
+                db.select([args_table.c.key])
+                .where(args_table.c.prefix == self.prefix)
+                .where(args_table.c.arg == str(arg)))]
+            self._delete_keys(connection, keys)
+
+        self.storage.delete(*map(self._storage_key, keys))
+
+    def purge_expired(self):
+        """ Drops meta rows and invalidation args of expired keys """
+        meta_table = CacheMeta.__table__
+        with db.engine.begin() as connection:
+            keys = [key for key, in connection.execute(
+                db.select([meta_table.c.key])
+                .where(meta_table.c.prefix == self.prefix)
+                .where(meta_table.c.when_expire <= datetime.datetime.utcnow()))]
+            self._delete_keys(connection, keys)
+
+    def _is_purge_needed(self) -> bool:
+        with self.purge_lock:
+            now = time.monotonic()
+            if now - self.purged_at < self.purge_interval:
+                return False
+            self.purged_at = now
+            return True
+
+    def _delete_keys(self, connection, keys: List[str]):
+        if not keys:
+            return
+        meta_table = CacheMeta.__table__
+        args_table = CacheInvalidateArg.__table__
+        connection.execute(meta_table.delete()
+                           .where(meta_table.c.prefix == self.prefix)
+                           .where(meta_table.c.key.in_(keys)))
+        connection.execute(args_table.delete()
+                           .where(args_table.c.prefix == self.prefix)
+                           .where(args_table.c.key.in_(keys)))
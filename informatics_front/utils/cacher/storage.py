@@ -0,0 +1,83 @@
+import pickle
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Optional
+
+import redis
+
+
+class BaseStorage(ABC):
+    """Key-value storage for cached values.
+
+    Values are pickled, so every storage returns a fresh copy
+    and callers can't spoil cached value by mutating it.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: Any, ttl: int):
+        pass
+
+    @abstractmethod
+    def delete(self, *keys: str):
+        pass
+
+
+class MemoryStorage(BaseStorage):
+    """In-process storage. Used when redis is not configured.
+
+    Keeps at most `size` values; least recently used one is evicted
+    when it's exceeded.
+    """
+
+    default_size = 1024
+
+    def __init__(self, size: int = default_size):
+        self.size = size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value, expire_at = self._data.get(key, (None, 0))
+            if expire_at < time.monotonic():
+                self._data.pop(key, None)
+                return None
+            self._data.move_to_end(key)
+        return pickle.loads(value)
+
+    def set(self, key: str, value: Any, ttl: int):
+        dumped = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._data.pop(key, None)
+            self._data[key] = (dumped, time.monotonic() + ttl)
+            while len(self._data) > self.size:
+                self._data.popitem(last=False)
+
+    def delete(self, *keys: str):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+
+class RedisStorage(BaseStorage):
+    def __init__(self, url: str):
+        self.redis = redis.StrictRedis.from_url(url)
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.redis.get(key)
+        if value is None:
+            return None
+        return pickle.loads(value)
+
+    def set(self, key: str, value: Any, ttl: int):
+        self.redis.set(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), ex=ttl)
+
+    def delete(self, *keys: str):
+        if keys:
+            self.redis.delete(*keys)
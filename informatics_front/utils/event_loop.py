@@ -0,0 +1,55 @@
+import asyncio
+import concurrent.futures
+import os
+import threading
+from typing import Any, Awaitable, Optional
+
+from flask import Flask
+
+
+class EventLoop:
+    """Shared asyncio event loop running in background thread.
+
+    Lets synchronous views run coroutines (e.g. fan-out requests
+    by async service clients) without a loop per request. Thread is
+    started on first use, so every forked worker gets it's own loop.
+
+    Usage:
+        # plugins.py
+        event_loop = EventLoop()
+
+        # views.py
+        data, status = event_loop.run(async_internal_rmatics.get_run_source(run_id, user_id), timeout=10)
+    """
+
+    def __init__(self, app: Flask = None):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.thread: Optional[threading.Thread] = None
+        self.pid = None
+        self.lock = threading.Lock()
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        app.extensions['event_loop'] = self
+
+    def get_loop(self) -> asyncio.AbstractEventLoop:
+        with self.lock:
+            if self.loop is None or self.pid != os.getpid():
+                self.loop = asyncio.new_event_loop()
+                self.pid = os.getpid()
+                self.thread = threading.Thread(target=self.loop.run_forever, name='event-loop', daemon=True)
+                self.thread.start()
+            return self.loop
+
+    def run(self, coro: Awaitable, timeout: float = None) -> Any:
+        """ Runs coroutine in shared loop and waits for it's result
+
+        Coroutine is cancelled, if it's not finished in `timeout` seconds.
+        """
+        future = asyncio.run_coroutine_threadsafe(coro, self.get_loop())
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            raise
@@ -0,0 +1,45 @@
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable
+
+from flask import Flask, current_app
+
+DEFAULT_MAX_WORKERS = 16
+
+
+class AppExecutor:
+    """Bounded app-wide thread pool.
+
+    Tasks are executed inside app context of the submitting
+    request, so they can use app config, logger and extensions.
+
+    Usage:
+        # plugins.py
+        executor = AppExecutor()
+
+        # app_factory.py
+        executor.init_app(app)
+
+        # views.py
+        future = executor.submit(internal_rmatics.get_monitor, ...)
+        data, status = future.result(timeout=10)
+    """
+
+    def __init__(self, app: Flask = None):
+        self.executor = None
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        max_workers = app.config.get('EXECUTOR_MAX_WORKERS') or DEFAULT_MAX_WORKERS
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix='app-executor')
+        app.extensions['executor'] = self
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        app = current_app._get_current_object()
+
+        def with_app_context():
+            with app.app_context():
+                return func(*args, **kwargs)
+
+        return self.executor.submit(with_app_context)
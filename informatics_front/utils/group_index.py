@@ -0,0 +1,57 @@
+from collections import namedtuple
+from typing import Dict, Iterable, List
+
+from informatics_front.model.base import db
+from informatics_front.model.user.group import UserGroup
+from informatics_front.model.user.user import SimpleUser, User
+from informatics_front.utils.ttl_index import Listener, TTLIndex
+
+GroupMember = namedtuple('GroupMember', 'id firstname lastname city school')
+
+
+class GroupIndex(TTLIndex):
+    """Process-wide index of group members: group_id -> members ordered by id.
+
+    Members are plain namedtuples with profile fields needed by monitor,
+    loaded by one column query without building ORM objects. Changes made
+    by moodle are noticed when TTL expires, see TTLIndex.
+
+    Usage:
+        # plugins.py
+        group_index = GroupIndex(ttl_param='GROUP_INDEX_TTL')
+
+        # views.py
+        users = group_index.get_members(group_id)
+
+        # somewhere, when group is changed outside of ORM
+        group_index.invalidate(group_id)
+    """
+
+    extension_name = 'group_index'
+
+    def get_members(self, group_id: int) -> List[GroupMember]:
+        return self._get(group_id)
+
+    def _load(self, group_ids: List[int]) -> Dict[int, List[GroupMember]]:
+        return {group_id: self._load_members(group_id) for group_id in group_ids}
+
+    @classmethod
+    def _load_members(cls, group_id: int) -> List[GroupMember]:
+        rows = db.session.query(User.id, User.firstname, User.lastname, User.city, User.school) \
+            .join(UserGroup, UserGroup.user_id == User.id) \
+            .filter(UserGroup.group_id == group_id) \
+            .order_by(User.id) \
+            .all()
+        return [GroupMember(*row) for row in rows]
+
+    def _get_listeners(self) -> Iterable[Listener]:
+        return (
+            (UserGroup, 'after_insert', self._on_membership_changed),
+            (UserGroup, 'after_delete', self._on_membership_changed),
+            # membership may be moved to another group
+            (UserGroup, 'after_update', self._on_changed),
+            (SimpleUser, 'after_update', self._on_changed),
+        )
+
+    def _on_membership_changed(self, mapper, connection, user_group: UserGroup):
+        self.invalidate(user_group.group_id)
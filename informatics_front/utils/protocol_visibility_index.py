@@ -0,0 +1,59 @@
+from typing import Dict, Iterable, List, Optional
+
+from informatics_front.model.base import db
+from informatics_front.model.contest.contest import Contest
+from informatics_front.model.contest.statement import StatementProblem
+from informatics_front.utils.enums import ContestProtocolVisibility
+from informatics_front.utils.ttl_index import Listener, TTLIndex
+
+
+class ProtocolVisibilityIndex(TTLIndex):
+    """Process-wide index of protocol visibility: contest_id -> {problem_id: visibility}.
+
+    Contest is loaded with all of it's problems by one query on first
+    lookup of any of them, so views of protocols do no SQL while contest
+    is in index, see TTLIndex.
+
+    Usage:
+        # plugins.py
+        protocol_visibility_index = ProtocolVisibilityIndex(ttl_param='PROTOCOL_VISIBILITY_INDEX_TTL')
+
+        # views.py
+        visibility = protocol_visibility_index.get_visibility(contest_id, problem_id)
+        if visibility is None:
+            # problem is not in contest
+            ...
+    """
+
+    extension_name = 'protocol_visibility_index'
+
+    def get_visibility(self, contest_id: int, problem_id: int) -> Optional[ContestProtocolVisibility]:
+        """ Returns None if there is no such contest or problem is not in contest """
+        return self._get(contest_id).get(problem_id)
+
+    def _load(self, contest_ids: List[int]) -> Dict[int, Dict[int, ContestProtocolVisibility]]:
+        return self._load_contests(contest_ids)
+
+    @classmethod
+    def _load_contests(cls, contest_ids: Iterable[int]) -> Dict[int, Dict[int, ContestProtocolVisibility]]:
+        """ Unknown contests get no problems, so they are not queried again until TTL """
+        contests = {contest_id: {} for contest_id in contest_ids}
+        rows = db.session.query(Contest.id, StatementProblem.problem_id, Contest.protocol_visibility) \
+            .join(StatementProblem, StatementProblem.statement_id == Contest.statement_id) \
+            .filter(Contest.id.in_(contests)) \
+            .all()
+        for contest_id, problem_id, visibility in rows:
+            contests[contest_id][problem_id] = visibility
+        return contests
+
+    def _get_listeners(self) -> Iterable[Listener]:
+        return (
+            (Contest, 'after_update', self._on_contest_changed),
+            (Contest, 'after_delete', self._on_contest_changed),
+            (StatementProblem, 'after_insert', self._on_changed),
+            (StatementProblem, 'after_update', self._on_changed),
+            (StatementProblem, 'after_delete', self._on_changed),
+        )
+
+    def _on_contest_changed(self, mapper, connection, contest: Contest):
+        self.invalidate(contest.id)
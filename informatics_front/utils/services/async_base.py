@@ -0,0 +1,233 @@
+import asyncio
+import io
+import logging
+import time
+from json import loads
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+
+import aiohttp
+
+from informatics_front.utils.services.base import DEFAULT_POOL_SIZE, BaseService
+from informatics_front.utils.services.circuit_breaker import CircuitBreakers, StaleResponses
+from informatics_front.utils.services.errors import ServerError
+from informatics_front.utils.services.request_policy import RETRY_STATUSES, RequestPolicyMixin
+from informatics_front.utils.services.response_cache import CachePolicy, ResponseCache
+
+
+class AsyncApiClient(RequestPolicyMixin):
+    """Async counterpart of ApiClient with the same request semantics.
+
+    Every method returns (data, status_code) and handles `silent`,
+    `default`, `data_key` and `allow_bad_http_statuses` as ApiClient
+    does. aiohttp session is created on first request inside running
+    loop and is recreated, if client is used from another loop.
+    Stale cached responses are revalidated by task of the same loop.
+    """
+
+    def __init__(self,
+                 timeout=60,
+                 logger: logging.Logger = None,
+                 connect_timeout: float = None,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 retries: int = 0,
+                 backoff_factor: float = 0.3,
+                 breakers: CircuitBreakers = None,
+                 stale: StaleResponses = None,
+                 cache: ResponseCache = None,
+                 cache_policies: Dict[str, CachePolicy] = None,
+                 service_url: str = None):
+        self._init_request_policies(service_url, retries, backoff_factor, breakers, stale, cache, cache_policies)
+        self.timeout = aiohttp.ClientTimeout(sock_connect=connect_timeout or timeout, sock_read=timeout)
+        self.pool_size = pool_size
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.session_loop: Optional[asyncio.AbstractEventLoop] = None
+        self.in_use = 0
+        self.max_in_use = 0
+        self.requests = 0
+        self.waits = 0
+
+        self.logger = logger
+        # When Flask app logger is not passed
+        if not logger:
+            self.logger = logging.getLogger(self.__class__.__name__)
+            self.logger.setLevel(logging.ERROR)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        loop = asyncio.get_event_loop()
+        if self.session is None or self.session.closed or self.session_loop is not loop:
+            connector = aiohttp.TCPConnector(limit=self.pool_size)
+            self.session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+            self.session_loop = loop
+        return self.session
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+    @classmethod
+    def _make_params(cls, params: Optional[dict]) -> List[Tuple[str, str]]:
+        """ Encodes params as requests does: lists become repeated keys """
+        query = []
+        for key, value in (params or {}).items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            query += [(key, str(item)) for item in values if item is not None]
+        return query
+
+    @classmethod
+    def _make_form(cls, data: dict, files: dict) -> aiohttp.FormData:
+        form = aiohttp.FormData()
+        for key, value in data.items():
+            form.add_field(key, str(value))
+        for key, file in files.items():
+            form.add_field(key, file, filename=getattr(file, 'filename', None) or key)
+        return form
+
+    async def _request(self, url, method='GET', json=None, data_key=None,
+                       default=None, silent=False, allow_bad_http_statuses=True,
+                       params=None, files=None, headers=None) -> Tuple[dict, int]:
+        kwargs = {'params': self._make_params(params), 'headers': headers}
+        if method in ('POST', 'PUT', 'PATCH'):
+            if files:
+                kwargs['data'] = self._make_form(json or {}, files)
+            else:
+                kwargs['json'] = json
+
+        lookup = self._lookup_cache(method, url, params, data_key)
+        if lookup.cached is None:
+            return await self._send(url, method, params, kwargs, data_key, default, silent,
+                                    allow_bad_http_statuses, lookup.key, lookup.policy)
+
+        if lookup.revalidate:
+            asyncio.ensure_future(self._revalidate(url, method, params, kwargs, data_key, lookup.key, lookup.policy))
+        return lookup.cached
+
+    async def _revalidate(self, url, method, params, kwargs, data_key, cache_key, policy):
+        try:
+            await self._send(url, method, params, kwargs, data_key, None, True, False, cache_key, policy)
+        finally:
+            self._finish_revalidation(cache_key)
+
+    async def _send(self, url, method, params, kwargs, data_key, default, silent,
+                    allow_bad_http_statuses, cache_key=None, policy=None):
+        breaker = self._get_breaker(method, url)
+        stale_key = self._get_stale_key(method, url, params)
+        if breaker is not None and not breaker.allow():
+            return self._reject(url, stale_key, default, silent)
+
+        self.requests += 1
+        if self.in_use >= self.pool_size:
+            self.waits += 1
+        self.in_use += 1
+        self.max_in_use = max(self.max_in_use, self.in_use)
+        started = time.monotonic()
+        try:
+            status, content = await self._fetch(url, method, kwargs)
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            self._record(breaker, False, started)
+            return self._fail(url, kwargs, default, silent)
+        finally:
+            self.in_use -= 1
+
+        self._record(breaker, status < 500, started)
+        return self._handle_response(url, status, content, data_key, default, silent, allow_bad_http_statuses,
+                                     stale_key, cache_key, policy)
+
+    async def _fetch(self, url, method, kwargs) -> Tuple[int, bytes]:
+        """ Returns status and content of response, retried as by ApiClient
+
+        aiohttp raises the same error on connect and read timeouts,
+        so only failed connections are retried.
+        """
+        retries = self._get_retries(method)
+        for attempt in range(retries + 1):
+            if attempt:
+                await asyncio.sleep(self._get_backoff(attempt))
+            try:
+                async with self._get_session().request(method, url, **kwargs) as response:
+                    if response.status in RETRY_STATUSES and attempt < retries:
+                        continue
+                    return response.status, await response.read()
+            except aiohttp.ClientConnectorError:
+                if attempt == retries:
+                    raise
+
+    async def post_data(self, url, json=None, default=None,
+                        silent=False, data_key=None, **kwargs):
+        return await self._request(url, method='POST', json=json,
+                                   data_key=data_key, default=default,
+                                   silent=silent, **kwargs)
+
+    async def get_data(self, url, data_key=None, default=None,
+                       silent=False, **kwargs):
+        return await self._request(url, method='GET', data_key=data_key,
+                                   default=default, silent=silent, **kwargs)
+
+    async def get_stream(self, url, parse: Callable[[BinaryIO], Any], default=None,
+                         silent=False, params=None) -> Tuple[Any, int]:
+        """Same as ApiClient.get_stream, but body is read before `parse` gets it,
+        so only parsed data is smaller, not the memory taken while reading.
+        """
+        breaker = self._get_breaker('GET', url)
+        if breaker is not None and not breaker.allow():
+            return self._reject(url, None, default, silent)
+
+        kwargs = {'params': self._make_params(params)}
+        self.requests += 1
+        if self.in_use >= self.pool_size:
+            self.waits += 1
+        self.in_use += 1
+        self.max_in_use = max(self.max_in_use, self.in_use)
+        started = time.monotonic()
+        try:
+            status, content = await self._fetch(url, 'GET', kwargs)
+            if status >= 500:
+                data = None
+            elif status >= 400:
+                data = loads(content)['error']
+            else:
+                data = parse(io.BytesIO(content))
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            self._record(breaker, False, started)
+            return self._fail(url, kwargs, default, silent)
+        finally:
+            self.in_use -= 1
+
+        self._record(breaker, status < 500, started)
+
+        if status >= 500:
+            self.logger.error(f'Server error returned when sending request to "{url}"')
+            if not silent:
+                raise ServerError()
+            return default, status
+
+        return data, status
+
+    def get_pool_stats(self) -> dict:
+        """ Same as MeteredHTTPAdapter stats; `waits` are requests queued by connector """
+        return {
+            'pool_maxsize': self.pool_size,
+            'in_use': self.in_use,
+            'max_in_use': self.max_in_use,
+            'requests': self.requests,
+            'waits': self.waits,
+        }
+
+
+class BaseAsyncService(BaseService):
+    """Base async service extension, configured the same way as BaseService.
+
+    Methods are coroutines; synchronous code runs them by EventLoop:
+
+        # plugins.py
+        async_users_service = AsyncUsersService()
+        event_loop = EventLoop()
+
+        # views.py
+        async def get_users():
+            return await asyncio.gather(*[async_users_service.get_user(user_id)
+                                          for user_id in user_ids])
+
+        users = event_loop.run(get_users(), timeout=10)
+    """
+
+    client_cls = AsyncApiClient
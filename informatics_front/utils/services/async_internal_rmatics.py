@@ -0,0 +1,63 @@
+from typing import Tuple, Optional, List
+
+from werkzeug.datastructures import FileStorage
+
+from informatics_front.utils.services.async_base import BaseAsyncService
+from informatics_front.utils.services.internal_rmatics import InternalRmaticsRequests
+from informatics_front.utils.services.protocol_stream import parse_protocol
+
+
+class AsyncInternalRmatics(InternalRmaticsRequests, BaseAsyncService):
+    """Async client of internal rmatics with the same methods as InternalRmatics.
+
+    Meant for fan-out: several requests are awaited concurrently
+    in shared EventLoop instead of blocking worker one after another.
+    """
+
+    async def send_submit(self,
+                          file: FileStorage,
+                          user_id: int,
+                          problem_id: int,
+                          contest_id: int,
+                          lang_id: int) -> Tuple[dict, int]:
+        url, data = self._submit_request(user_id, problem_id, contest_id, lang_id)
+
+        content, status = await self.client.post_data(url, json=data, files={'file': file.stream}, silent=True)
+        if status < 300:
+            self.client.invalidate_cache(self._runs_filter_url(problem_id))
+        return content, status
+
+    async def get_runs_filter(self, problem_id: int, contest_id: int, args: dict) -> Tuple[dict, int]:
+        url, filter_args = self._runs_filter_request(problem_id, contest_id, args)
+
+        return await self.client.get_data(url, params=filter_args, silent=True, default=[])
+
+    async def get_run_source(self, run_id: int, user_id, is_admin: bool = False) -> Tuple[dict, int]:
+        url, user_args = self._run_source_request(run_id, user_id, is_admin)
+
+        return await self.client.get_data(url, params=user_args, silent=True)
+
+    async def get_run_protocol(self,
+                               run_id: int,
+                               user_id: int,
+                               exclude_fields: List[str],
+                               exclude_test_fields: List[str],
+                               first_bad_test: bool = False,
+                               is_admin: bool = False) -> Tuple[dict, int]:
+        url, user_args = self._run_protocol_request(run_id, user_id, is_admin,
+                                                    exclude_fields, exclude_test_fields)
+
+        def parse(file):
+            return parse_protocol(file, exclude_fields, exclude_test_fields, first_bad_test)
+
+        return await self.client.get_stream(url, parse, params=user_args, silent=True)
+
+    async def get_monitor(self,
+                          contest_id: int,
+                          problems: List[int],
+                          users: List[int],
+                          time_before: Optional[int],
+                          run_id_after: Optional[int] = None):
+        url, monitor_args = self._monitor_request(contest_id, problems, users, time_before, run_id_after)
+
+        return await self.client.get_data(url, params=monitor_args, silent=True, default=[])
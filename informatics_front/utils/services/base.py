@@ -1,24 +1,117 @@
 import inspect
 import logging
-from typing import Tuple
+import threading
+import time
+from typing import Any, BinaryIO, Callable, Dict, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError
+from urllib3.util.retry import Retry
 
-from informatics_front.utils.services.errors import ClientError, ServerError
+from informatics_front.utils.services.circuit_breaker import CircuitBreakers, StaleResponses
+from informatics_front.utils.services.errors import ServerError
+from informatics_front.utils.services.request_policy import RETRY_METHODS, RETRY_STATUSES, RequestPolicyMixin
+from informatics_front.utils.services.response_cache import CachePolicy, ResponseCache
 
+DEFAULT_POOL_SIZE = 10
 
-class ApiClient(requests.Session):
-    """Base class for API clients."""
+
+class MeteredHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter counting usage of its connection pools.
+
+    `waits` are requests, which found every pooled connection busy
+    and had to open one more connection, not kept after the request.
+    `connections` are connections opened since start.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.stats_lock = threading.Lock()
+        self.in_use = 0
+        self.max_in_use = 0
+        self.requests = 0
+        self.waits = 0
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        with self.stats_lock:
+            if self.in_use >= self._pool_maxsize:
+                self.waits += 1
+            self.in_use += 1
+            self.requests += 1
+            self.max_in_use = max(self.max_in_use, self.in_use)
+        try:
+            return super().send(request, **kwargs)
+        finally:
+            with self.stats_lock:
+                self.in_use -= 1
+
+    def get_stats(self) -> dict:
+        pools = [self.poolmanager.pools[key] for key in self.poolmanager.pools.keys()]
+        with self.stats_lock:
+            return {
+                'pool_maxsize': self._pool_maxsize,
+                'in_use': self.in_use,
+                'max_in_use': self.max_in_use,
+                'requests': self.requests,
+                'waits': self.waits,
+                'connections': sum(pool.num_connections for pool in pools),
+            }
+
+
+class ApiClient(RequestPolicyMixin, requests.Session):
+    """Base class for API clients.
+
+    Connections are kept alive in pool of `pool_size` connections
+    per host. `timeout` limits reading of response; connecting is
+    limited by `connect_timeout`, if it is passed. GET requests are
+    retried up to `retries` times with exponential backoff on
+    connection errors and 502, 503 and 504 statuses. Read timeouts
+    are not retried, otherwise slow endpoint holds worker for
+    `retries` + 1 timeouts.
+
+    If `breakers` are passed (see CircuitBreakers), requests to
+    failing endpoint are rejected at once with 503 or, for GET requests,
+    answered by one of last successful responses kept in `stale`.
+
+    If `cache` is passed, GET responses of endpoints from `cache_policies`
+    are cached (see CachePolicy); stale responses are returned at once
+    and revalidated by background thread. Endpoints are paths of URLs
+    relative to `service_url`, e.g. 'GET /problem/<id>/submissions/'.
+    """
 
     def __init__(self,
                  timeout=60,
-                 logger: logging.Logger = None):
+                 logger: logging.Logger = None,
+                 connect_timeout: float = None,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 retries: int = 0,
+                 backoff_factor: float = 0.3,
+                 breakers: CircuitBreakers = None,
+                 stale: StaleResponses = None,
+                 cache: ResponseCache = None,
+                 cache_policies: Dict[str, CachePolicy] = None,
+                 service_url: str = None):
 
         super().__init__()
+        self._init_request_policies(service_url, retries, backoff_factor, breakers, stale, cache, cache_policies)
 
-        self.timeout = timeout
+        self.timeout = (connect_timeout, timeout) if connect_timeout else timeout
         self.logger = logger
 
+        retry = Retry(total=retries,
+                      read=0,
+                      connect=retries,
+                      backoff_factor=backoff_factor,
+                      status_forcelist=RETRY_STATUSES,
+                      method_whitelist=frozenset(RETRY_METHODS),
+                      raise_on_status=False)
+        self.adapter = MeteredHTTPAdapter(pool_connections=pool_size,
+                                          pool_maxsize=pool_size,
+                                          max_retries=retry)
+        self.mount('http://', self.adapter)
+        self.mount('https://', self.adapter)
+
         # When Flask app logger is not passed
         if not logger:
             self.logger = logging.getLogger(self.__class__.__name__)
@@ -48,45 +141,97 @@ class ApiClient(requests.Session):
             if key in self._allowed_kwargs
         }
 
+        lookup = self._lookup_cache(method, url, clean_kwargs.get('params'), data_key)
+        if lookup.cached is None:
+            return self._send(url, method, headers, clean_kwargs, data_key, default, silent,
+                              allow_bad_http_statuses, lookup.key, lookup.policy)
+
+        if lookup.revalidate:
+            threading.Thread(target=self._revalidate,
+                             args=(url, method, headers, clean_kwargs, data_key, lookup.key, lookup.policy),
+                             daemon=True).start()
+        return lookup.cached
+
+    def _revalidate(self, url, method, headers, clean_kwargs, data_key, cache_key, policy):
+        try:
+            self._send(url, method, headers, clean_kwargs, data_key, None, True, False, cache_key, policy)
+        finally:
+            self._finish_revalidation(cache_key)
+
+    def _send(self, url, method, headers, clean_kwargs, data_key, default, silent,
+              allow_bad_http_statuses, cache_key=None, policy=None) -> Tuple[dict, int]:
+        breaker = self._get_breaker(method, url)
+        stale_key = self._get_stale_key(method, url, clean_kwargs.get('params'))
+        if breaker is not None and not breaker.allow():
+            return self._reject(url, stale_key, default, silent)
+
+        started = time.monotonic()
         try:
             response = self.request(method, url,
                                     headers=headers,
                                     **clean_kwargs)
         except requests.RequestException:
-            self.logger.exception(
-                f'Unable to get data from {url}. \n'
-                f'Kwargs: {clean_kwargs}. '
-                f'Passed kwargs: {kwargs}'
-            )
+            self._record(breaker, False, started)
+            return self._fail(url, clean_kwargs, default, silent)
+
+        self._record(breaker, response.status_code < 500, started)
+        return self._handle_response(url, response.status_code, response.content, data_key, default, silent,
+                                     allow_bad_http_statuses, stale_key, cache_key, policy)
+
+    def get_stream(self, url, parse: Callable[[BinaryIO], Any], default=None,
+                   silent=False, params=None) -> Tuple[Any, int]:
+        """GET request, which successful response is parsed by `parse` as it's received.
+
+        `parse` gets file-like response body and returns data; it should
+        raise ValueError on invalid body. Error of 4xx response is returned
+        as by get_data, 5xx response is handled as server error.
+        Responses are not cached.
+        """
+        breaker = self._get_breaker('GET', url)
+        if breaker is not None and not breaker.allow():
+            return self._reject(url, None, default, silent)
+
+        started = time.monotonic()
+        try:
+            with self.request('GET', url, params=params, timeout=self.timeout, stream=True) as response:
+                if response.status_code >= 500:
+                    data = None
+                elif response.status_code >= 400:
+                    data = response.json()['error']
+                else:
+                    response.raw.decode_content = True
+                    data = parse(response.raw)
+        except (requests.RequestException, HTTPError, ValueError):
+            self._record(breaker, False, started)
+            self.logger.exception(f'Unable to get data from {url}. \n'
+                                  f'Params: {params}. ')
 
             if not silent:
                 raise ServerError()
             return default, 500
 
-        if not allow_bad_http_statuses:
-            if 400 <= response.status_code < 500:
-                self.logger.error(f'URL: {url}.\n Response: {response.content}')
-                if not silent:
-                    raise ClientError(response.status_code)
-                return default, response.status_code
+        self._record(breaker, response.status_code < 500, started)
 
-            if 500 <= response.status_code < 600:
-                self.logger.exception(
-                    f'Server error returned when sending request to "{url}". '
-                    f'Got response: "{str(response.content)}"'
-                )
-
-                if not silent:
-                    raise ServerError()
-                return default, response.status_code
+        if response.status_code >= 500:
+            self.logger.error(f'Server error returned when sending request to "{url}"')
+            if not silent:
+                raise ServerError()
+            return default, response.status_code
 
-        data_key = data_key if data_key else 'data'
+        return data, response.status_code
 
-        if allow_bad_http_statuses and response.status_code >= 400:
-            data_key = 'error'
+    def get_pool_stats(self) -> dict:
+        return self.adapter.get_stats()
 
-        json_response = response.json()[data_key]
-        return json_response, response.status_code
+    def get_max_duration(self, method='GET') -> float:
+        """ Longest time request may take: connecting is retried,
+            while response is read once
+        """
+        connect_timeout, read_timeout = self.timeout if isinstance(self.timeout, tuple) \
+            else (self.timeout, self.timeout)
+        retries = self._get_retries(method)
+        backoff = sum(self._get_backoff(attempt) for attempt in range(1, retries + 1))
+        return (retries + 1) * connect_timeout + read_timeout + backoff
 
     def put_data(self, url, json, default=None,
                  silent=False, data_key=None, **kwargs):
@@ -126,10 +271,30 @@ class BaseService:
         def get(self, user_id):
             result = users_service.get_user(user_id)
             return result
+
+    Connection settings are read from app config by `config_prefix`,
+    e.g. for config_prefix = 'USERS_SERVICE':
+        USERS_SERVICE_READ_TIMEOUT - seconds, default_timeout if not set
+        USERS_SERVICE_CONNECT_TIMEOUT - seconds, same as read timeout if not set
+        USERS_SERVICE_POOL_SIZE - kept alive connections
+        USERS_SERVICE_RETRIES - retries of GET requests
+        USERS_SERVICE_BREAKER_FAILURE_RATE - share of failed calls to open circuit
+                                              of endpoint; circuit breaker is off if not set
+        USERS_SERVICE_BREAKER_SLOW_CALL_DURATION - seconds, slower calls are failures
+        USERS_SERVICE_BREAKER_OPEN_DURATION - seconds to reject calls before probing
+        USERS_SERVICE_STALE_SIZE - last GET responses answered while circuit is open
+        USERS_SERVICE_CACHE_SIZE - bytes of GET responses cached in process memory
+                                   by `cache_policies`; responses are not cached if not set
+        USERS_SERVICE_CACHE_DIR - directory to share cached responses by processes
+        USERS_SERVICE_CACHE_DIR_SIZE - bytes of responses kept in CACHE_DIR
     """
 
+    client_cls = ApiClient
     default_timeout: int = 5 * 60
     service_url_param: str
+    config_prefix: str = None
+    # endpoint, e.g. 'GET /users/<id>' -> CachePolicy
+    cache_policies: Dict[str, CachePolicy] = {}
 
     def __init__(self, app=None, timeout=None):
         self.timeout = timeout
@@ -139,6 +304,71 @@ class BaseService:
 
     def init_app(self, app):
         """Configure service settings based on flask app config."""
-        self.client = ApiClient(self.timeout or self.default_timeout, app.logger)
+        config = self._get_client_config(app)
         self.service_url = app.config.get(self.service_url_param)
-        app.extensions[self.service_url] = self
+        self.client = self.client_cls(self.timeout or config.get('READ_TIMEOUT') or self.default_timeout,
+                                      app.logger,
+                                      connect_timeout=config.get('CONNECT_TIMEOUT'),
+                                      pool_size=config.get('POOL_SIZE') or DEFAULT_POOL_SIZE,
+                                      retries=config.get('RETRIES') or 0,
+                                      cache_policies=self.cache_policies,
+                                      service_url=self.service_url,
+                                      **self._get_shared_policies(app, config))
+        app.extensions[f'{self.__class__.__name__}_{self.service_url}'] = self
+
+    def _get_client_config(self, app) -> dict:
+        if not self.config_prefix:
+            return {}
+        return app.config.get_namespace(f'{self.config_prefix}_', lowercase=False)
+
+    def _get_shared_policies(self, app, config: dict) -> dict:
+        """Circuit breakers, stale and cached responses of service.
+
+        They are kept in app by `config_prefix`, so every client of service,
+        e.g. sync and async ones, sees the same circuit states and cache:
+        submit sent by one of them drops responses cached by both.
+        """
+        extension = f'service_policies_{self.config_prefix}'
+        if self.config_prefix and extension in app.extensions:
+            return app.extensions[extension]
+
+        policies = {
+            'breakers': self._make_breakers(config),
+            'stale': StaleResponses(config.get('STALE_SIZE') or 0),
+            'cache': self._make_cache(config),
+        }
+        if self.config_prefix:
+            app.extensions[extension] = policies
+        return policies
+
+    @classmethod
+    def _make_breakers(cls, config: dict) -> Optional[CircuitBreakers]:
+        if not config.get('BREAKER_FAILURE_RATE'):
+            return None
+        breaker = {
+            'failure_rate': config['BREAKER_FAILURE_RATE'],
+            'slow_call_duration': config.get('BREAKER_SLOW_CALL_DURATION'),
+        }
+        if config.get('BREAKER_OPEN_DURATION'):
+            breaker['open_duration'] = config['BREAKER_OPEN_DURATION']
+        return CircuitBreakers(**breaker)
+
+    @classmethod
+    def _make_cache(cls, config: dict) -> Optional[ResponseCache]:
+        if not cls.cache_policies or not config.get('CACHE_SIZE'):
+            return None
+        return ResponseCache(config['CACHE_SIZE'],
+                             disk_path=config.get('CACHE_DIR'),
+                             disk_size=config.get('CACHE_DIR_SIZE') or 0)
+
+    def get_pool_stats(self) -> dict:
+        """ Usage of connection pool, see MeteredHTTPAdapter """
+        return self.client.get_pool_stats()
+
+    def get_circuit_states(self) -> Dict[str, str]:
+        """ State of circuit breaker by endpoint, see CircuitBreaker """
+        return self.client.get_circuit_states()
+
+    def get_cache_stats(self) -> dict:
+        """ Usage of response cache, see ResponseCache """
+        return self.client.get_cache_stats()
@@ -0,0 +1,213 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, Hashable, Optional, Tuple
+from urllib.parse import urlsplit
+
+from informatics_front.utils.services.errors import ServiceUnavailableError
+
+NUMERIC_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+class CircuitBreaker:
+    """Circuit breaker of one upstream endpoint.
+
+    closed    - calls pass; outcomes of last `window` calls are kept.
+                When there are at least `min_calls` of them and share
+                of failures reaches `failure_rate`, breaker opens.
+                Errors, 5xx and calls slower than `slow_call_duration`
+                are failures.
+    open      - calls are rejected for `open_duration` seconds.
+    half_open - up to `half_open_calls` probe calls pass. If all of them
+                succeed, breaker closes, otherwise opens again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self,
+                 failure_rate: float = 0.5,
+                 slow_call_duration: Optional[float] = None,
+                 window: int = 20,
+                 min_calls: int = 10,
+                 open_duration: float = 30,
+                 half_open_calls: int = 1):
+        self.failure_rate = failure_rate
+        self.slow_call_duration = slow_call_duration
+        self.min_calls = min(min_calls, window)
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+
+        self.lock = threading.Lock()
+        self.outcomes = deque(maxlen=window)
+        self._state = self.CLOSED
+        self.opened_at = 0
+        self.probes = 0
+        self.succeeded_probes = 0
+
+    @property
+    def state(self) -> str:
+        with self.lock:
+            return self._get_state()
+
+    def _get_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.open_duration:
+            self._state = self.HALF_OPEN
+            self.probes = 0
+            self.succeeded_probes = 0
+        return self._state
+
+    def allow(self) -> bool:
+        """ Returns True if call may be made; every allowed call must be recorded """
+        with self.lock:
+            state = self._get_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and self.probes < self.half_open_calls:
+                self.probes += 1
+                return True
+            return False
+
+    def record(self, success: bool, duration: float = 0):
+        if self.slow_call_duration is not None and duration > self.slow_call_duration:
+            success = False
+
+        with self.lock:
+            state = self._get_state()
+            if state == self.HALF_OPEN:
+                if not success:
+                    self._open()
+                    return
+                self.succeeded_probes += 1
+                if self.succeeded_probes >= self.half_open_calls:
+                    self._state = self.CLOSED
+                    self.outcomes.clear()
+                return
+
+            if state == self.OPEN:
+                return
+
+            self.outcomes.append(success)
+            if len(self.outcomes) < self.min_calls:
+                return
+            failures = self.outcomes.count(False)
+            if failures / len(self.outcomes) >= self.failure_rate:
+                self._open()
+
+    def _open(self):
+        self._state = self.OPEN
+        self.opened_at = time.monotonic()
+        self.outcomes.clear()
+
+
+class CircuitBreakers:
+    """Circuit breakers by endpoint; ids in URL path don't make new endpoints.
+
+    Endpoint is path of URL relative to `service_url`, so it doesn't
+    depend on path prefix, under which service is deployed.
+    """
+
+    def __init__(self, **settings):
+        self.settings = settings
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def make_endpoint(cls, method: str, url: str, service_url: Optional[str] = None) -> str:
+        if service_url and url.startswith(service_url):
+            url = url[len(service_url):]
+        path = NUMERIC_SEGMENT.sub('/<id>', urlsplit(url).path)
+        return f'{method} {path}'
+
+    def get(self, method: str, url: str, service_url: Optional[str] = None) -> CircuitBreaker:
+        endpoint = self.make_endpoint(method, url, service_url)
+        with self.lock:
+            breaker = self.breakers.get(endpoint)
+            if breaker is None:
+                breaker = self.breakers[endpoint] = CircuitBreaker(**self.settings)
+            return breaker
+
+    def get_states(self) -> Dict[str, str]:
+        with self.lock:
+            breakers = dict(self.breakers)
+        return {endpoint: breaker.state for endpoint, breaker in breakers.items()}
+
+
+class StaleResponses:
+    """Last successful responses of GET requests, returned while circuit is open.
+
+    Raw content is kept, so callers get their own parsed copy.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.responses: Dict[Hashable, Tuple[bytes, int, str]] = OrderedDict()
+        self.lock = threading.Lock()
+
+    @classmethod
+    def make_key(cls, url: str, params: Optional[dict]) -> Hashable:
+        params = params or {}
+        return url, tuple(sorted((key, str(value)) for key, value in params.items()))
+
+    def get(self, key: Hashable) -> Optional[Tuple[Any, int]]:
+        with self.lock:
+            response = self.responses.get(key)
+            if response is None:
+                return None
+            self.responses.move_to_end(key)
+
+        content, status_code, data_key = response
+        return json.loads(content)[data_key], status_code
+
+    def set(self, key: Hashable, response: Tuple[bytes, int, str]):
+        """ response is (content, status_code, data_key) """
+        if not self.size:
+            return
+        with self.lock:
+            self.responses[key] = response
+            self.responses.move_to_end(key)
+            while len(self.responses) > self.size:
+                self.responses.popitem(last=False)
+
+
+class CircuitBreakingMixin:
+    """ Circuit breaking and stale responses for API clients """
+
+    logger: logging.Logger
+    service_url: Optional[str]
+
+    def _init_circuit_breaking(self, breakers: Optional[CircuitBreakers], stale: Optional[StaleResponses]):
+        """ Without `breakers` calls are never rejected, without `stale` rejected calls get no response """
+        self.breakers = breakers
+        self.stale = stale or StaleResponses(0)
+
+    def _get_breaker(self, method: str, url: str) -> Optional[CircuitBreaker]:
+        return self.breakers.get(method, url, self.service_url) if self.breakers is not None else None
+
+    def _get_stale_key(self, method: str, url: str, params: Optional[dict]) -> Optional[Hashable]:
+        if method != 'GET' or not self.stale.size:
+            return None
+        return StaleResponses.make_key(url, params)
+
+    def _reject(self, url: str, stale_key: Optional[Hashable], default, silent: bool) -> Tuple[Any, int]:
+        stale = self.stale.get(stale_key) if stale_key is not None else None
+        if stale is not None:
+            self.logger.warning(f'Circuit of "{url}" is open, stale response is returned')
+            return stale
+
+        self.logger.warning(f'Circuit of "{url}" is open, request is rejected')
+        if not silent:
+            raise ServiceUnavailableError()
+        return default, 503
+
+    @classmethod
+    def _record(cls, breaker: Optional[CircuitBreaker], success: bool, started: float):
+        if breaker is not None:
+            breaker.record(success, time.monotonic() - started)
+
+    def get_circuit_states(self) -> Dict[str, str]:
+        return self.breakers.get_states() if self.breakers is not None else {}
@@ -1,3 +1,6 @@
+from werkzeug.exceptions import ServiceUnavailable
+
+
 class RequestError(Exception):
     """Base class for API exceptions."""
 
@@ -13,6 +16,16 @@ class ServerError(RequestError):
         super().__init__('Error communicating with service')
 
 
+class ServiceUnavailableError(ServerError, ServiceUnavailable):
+    """Raised when requests to service are rejected by open circuit.
+
+    It's HTTP exception, so views, which don't handle it, answer with 503.
+    """
+
+    def __init__(self):
+        RequestError.__init__(self, 'Service is unavailable')
+
+
 class ClientError(RequestError):
     """Raised when status code is not OK."""
 
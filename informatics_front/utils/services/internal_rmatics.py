@@ -1,21 +1,42 @@
-from typing import Tuple, Optional, List
+from typing import Tuple, Optional, List, Dict
 
 from werkzeug.datastructures import FileStorage
 
 from informatics_front.utils.services.base import BaseService
+from informatics_front.utils.services.protocol_stream import parse_protocol
+from informatics_front.utils.services.response_cache import CachePolicy
+from informatics_front.utils.single_flight import SingleFlight
 
 
-class InternalRmatics(BaseService):
+RUNS_FILTER_CACHE_TTL = 5
+RUNS_FILTER_STALE_TTL = 60
+
+
+def is_judged_protocol(protocol: dict) -> bool:
+    """ Protocol of judged run has results of tests or compilation error """
+    return bool(protocol.get('tests') or protocol.get('compiler_output'))
+
+
+class InternalRmaticsRequests:
+    """ URLs and arguments of internal rmatics requests, shared by sync and async clients """
+
     service_url_param = 'INTERNAL_RMATICS_URL'
+    config_prefix = 'INTERNAL_RMATICS'
     default_timeout = 60
     default_context_source = 2
 
-    def send_submit(self,
-                    file: FileStorage,
-                    user_id: int,
-                    problem_id: int,
-                    contest_id: int,
-                    lang_id: int) -> Tuple[dict, int]:
+    # Source of run never changes; runs of problem are refreshed
+    # in background and dropped on submit. Protocols are streamed
+    # by get_run_protocol, so they are cached by views, not here
+    cache_policies = {
+        'GET /problem/run/<id>/source/': CachePolicy(ttl=None),
+        'GET /problem/<id>/submissions/': CachePolicy(ttl=RUNS_FILTER_CACHE_TTL,
+                                                      stale_ttl=RUNS_FILTER_STALE_TTL),
+    }
+
+    service_url: str
+
+    def _submit_request(self, user_id: int, problem_id: int, contest_id: int, lang_id: int) -> Tuple[str, dict]:
         data = {
             'lang_id': lang_id,
             'user_id': user_id,
@@ -26,20 +47,21 @@ class InternalRmatics(BaseService):
         }
         url = f'{self.service_url}/problem/trusted/{problem_id}/submit_v2'
 
-        return self.client.post_data(url, json=data, files={'file': file.stream}, silent=True)
+        return url, data
 
-    def get_runs_filter(self, problem_id: int, contest_id: int, args: dict) -> Tuple[dict, int]:
+    def _runs_filter_request(self, problem_id: int, contest_id: int, args: dict) -> Tuple[str, dict]:
         filter_args = {
             **args,
             'context_id': contest_id,
             'context_source': self.default_context_source,
             'show_hidden': True
         }
-        url = f'{self.service_url}/problem/{problem_id}/submissions/'
+        return self._runs_filter_url(problem_id), filter_args
 
-        return self.client.get_data(url, params=filter_args, silent=True, default=[])
+    def _runs_filter_url(self, problem_id: int) -> str:
+        return f'{self.service_url}/problem/{problem_id}/submissions/'
 
-    def get_run_source(self, run_id: int, user_id, is_admin: bool = False) -> Tuple[dict, int]:
+    def _run_source_request(self, run_id: int, user_id: int, is_admin: bool) -> Tuple[str, dict]:
         url = f'{self.service_url}/problem/run/{run_id}/source/'
 
         user_args = {
@@ -47,19 +69,33 @@ class InternalRmatics(BaseService):
             'is_admin': is_admin,
         }
 
-        return self.client.get_data(url, params=user_args, silent=True)
+        return url, user_args
 
-    def get_full_run_protocol(self, run_id: int, user_id: int, is_admin: bool = False) -> Tuple[dict, int]:
+    def _run_protocol_request(self,
+                              run_id: int,
+                              user_id: int,
+                              is_admin: bool,
+                              exclude_fields: Optional[List[str]],
+                              exclude_test_fields: Optional[List[str]]) -> Tuple[str, dict]:
         url = f'{self.service_url}/problem/run/{run_id}/protocol'
 
         user_args = {
             'user_id': user_id,
             'is_admin': is_admin,
         }
-
-        return self.client.get_data(url, params=user_args, silent=True)
-
-    def get_monitor(self, contest_id: int, problems: List[int], users: List[int], time_before: Optional[int]):
+        if exclude_fields:
+            user_args['exclude_fields'] = exclude_fields
+        if exclude_test_fields:
+            user_args['exclude_test_fields'] = exclude_test_fields
+
+        return url, user_args
+
+    def _monitor_request(self,
+                         contest_id: int,
+                         problems: List[int],
+                         users: List[int],
+                         time_before: Optional[int],
+                         run_id_after: Optional[int]) -> Tuple[str, dict]:
         url = f'{self.service_url}/monitor/problem_monitor'
 
         monitor_args = {
@@ -72,5 +108,131 @@ class InternalRmatics(BaseService):
         }
         if time_before:
             monitor_args['time_before'] = time_before
+        if run_id_after:
+            monitor_args['run_id_after'] = run_id_after
+
+        return url, monitor_args
+
+    def _monitors_request(self,
+                          contests: Dict[int, List[int]],
+                          users: List[int],
+                          time_before: Optional[int],
+                          runs_after: Optional[Dict[int, int]]) -> Tuple[str, dict]:
+        url = f'{self.service_url}/monitor/problem_monitor/batch'
+
+        monitor_args = {
+            'user_id': users,
+            'contests': [self._make_batch_contest_args(contest_id, problems, runs_after)
+                         for contest_id, problems in contests.items()],
+
+            'context_source': self.default_context_source,
+            'show_hidden': True,
+        }
+        if time_before:
+            monitor_args['time_before'] = time_before
+
+        return url, monitor_args
+
+    @classmethod
+    def _make_batch_contest_args(cls,
+                                 contest_id: int,
+                                 problems: List[int],
+                                 runs_after: Optional[Dict[int, int]]) -> dict:
+        contest_args = {'context_id': contest_id, 'problem_id': problems}
+
+        run_id_after = runs_after and runs_after.get(contest_id)
+        if run_id_after:
+            contest_args['run_id_after'] = run_id_after
+
+        return contest_args
+
+
+class InternalRmatics(InternalRmaticsRequests, BaseService):
+    """Client of internal rmatics.
+
+    Identical monitor requests made concurrently by several threads
+    of process are coalesced: only one of them goes to rmatics and
+    the rest share its response.
+    """
+
+    def __init__(self, app=None, timeout=None):
+        self.single_flight = SingleFlight()
+        super().__init__(app, timeout)
+
+    def send_submit(self,
+                    file: FileStorage,
+                    user_id: int,
+                    problem_id: int,
+                    contest_id: int,
+                    lang_id: int) -> Tuple[dict, int]:
+        url, data = self._submit_request(user_id, problem_id, contest_id, lang_id)
+
+        content, status = self.client.post_data(url, json=data, files={'file': file.stream}, silent=True)
+        if status < 300:
+            self.client.invalidate_cache(self._runs_filter_url(problem_id))
+        return content, status
+
+    def get_runs_filter(self, problem_id: int, contest_id: int, args: dict) -> Tuple[dict, int]:
+        url, filter_args = self._runs_filter_request(problem_id, contest_id, args)
+
+        return self.client.get_data(url, params=filter_args, silent=True, default=[])
+
+    def get_run_source(self, run_id: int, user_id, is_admin: bool = False) -> Tuple[dict, int]:
+        url, user_args = self._run_source_request(run_id, user_id, is_admin)
 
-        return self.client.get_data(url, params=monitor_args, silent=True, default=[])
+        return self.client.get_data(url, params=user_args, silent=True)
+
+    def get_run_protocol(self,
+                         run_id: int,
+                         user_id: int,
+                         exclude_fields: List[str],
+                         exclude_test_fields: List[str],
+                         first_bad_test: bool = False,
+                         is_admin: bool = False) -> Tuple[dict, int]:
+        """Protocol filtered as it's received, see parse_protocol.
+
+        Fields of protocol and of it's tests are also asked to be excluded
+        by rmatics to send less data. Full protocol is never kept in memory,
+        so big protocols take as much as their visible part.
+        """
+        url, user_args = self._run_protocol_request(run_id, user_id, is_admin,
+                                                    exclude_fields, exclude_test_fields)
+
+        def parse(file):
+            return parse_protocol(file, exclude_fields, exclude_test_fields, first_bad_test)
+
+        return self.client.get_stream(url, parse, params=user_args, silent=True)
+
+    def get_monitor(self,
+                    contest_id: int,
+                    problems: List[int],
+                    users: List[int],
+                    time_before: Optional[int],
+                    run_id_after: Optional[int] = None):
+        url, monitor_args = self._monitor_request(contest_id, problems, users, time_before, run_id_after)
+
+        key = self.single_flight.make_key(url, monitor_args)
+        return self.single_flight.do(
+            key, lambda: self.client.get_data(url, params=monitor_args, silent=True, default=[]))
+
+    def get_monitors(self,
+                     contests: Dict[int, List[int]],
+                     users: List[int],
+                     time_before: Optional[int],
+                     runs_after: Optional[Dict[int, int]] = None):
+        """Batched version of get_monitor: one request for several contests.
+
+        :param contests: mapping contest_id -> list of problem ids of this contest
+        :param users: ids of users to get runs for
+        :param time_before: optional timestamp, runs after it are ignored
+        :param runs_after: optional mapping contest_id -> run id,
+                           only runs with greater id are returned for the contest
+        :return: list of {'context_id': contest_id, 'data': <get_monitor data>}
+                 and status code. Non 2xx status means batching is unavailable
+        """
+        url, monitor_args = self._monitors_request(contests, users, time_before, runs_after)
+
+        key = self.single_flight.make_key(url, monitor_args)
+        return self.single_flight.do(
+            key, lambda: self.client.post_data(url, json=monitor_args, silent=True, default=[],
+                                               allow_bad_http_statuses=False))
@@ -0,0 +1,134 @@
+import itertools
+from typing import Any, Iterable, Iterator, Optional, Set, Tuple
+
+import ijson
+
+Event = Tuple[str, str, Any]
+
+START_EVENTS = ('start_map', 'start_array')
+END_EVENTS = ('end_map', 'end_array')
+
+
+def _build(events: Iterator[Event], first: Event = None) -> Any:
+    """ Builds next value of events; `first` is it's already read event """
+    if first is not None:
+        events = itertools.chain([first], events)
+
+    builder = ijson.ObjectBuilder()
+    depth = 0
+    for _, event, value in events:
+        builder.event(event, value)
+        if event in START_EVENTS:
+            depth += 1
+        elif event in END_EVENTS:
+            depth -= 1
+        if depth == 0:
+            return builder.value
+
+
+def _skip(events: Iterator[Event]):
+    """ Reads next value of events without building it """
+    depth = 0
+    for _, event, _ in events:
+        if event in START_EVENTS:
+            depth += 1
+        elif event in END_EVENTS:
+            depth -= 1
+        if depth == 0:
+            return
+
+
+def _build_test(events: Iterator[Event], exclude_test_fields: Set[str]) -> Any:
+    first = next(events)
+    if first[1] != 'start_map':
+        return _build(events, first)
+
+    test = {}
+    for _, event, key in events:
+        if event == 'end_map':
+            return test
+        if key in exclude_test_fields:
+            _skip(events)
+        else:
+            test[key] = _build(events)
+
+
+def _build_tests(events: Iterator[Event], exclude_test_fields: Set[str], first_bad_test: bool) -> Any:
+    first = next(events)
+    if first[1] != 'start_map':
+        return _build(events, first)
+
+    tests = {}
+    bad_test = None
+    for _, event, test_id in events:
+        if event == 'end_map':
+            break
+
+        # Tests may come in any order, so tests before the first failed one
+        # are kept until it is known; tests after it are not even built
+        if bad_test is not None and int(test_id) > bad_test:
+            _skip(events)
+            continue
+
+        test = _build_test(events, exclude_test_fields)
+        tests[test_id] = test
+        if first_bad_test and isinstance(test, dict) and test.get('status') != 'OK':
+            bad_test = int(test_id)
+            tests = {key: value for key, value in tests.items() if int(key) <= bad_test}
+
+    if first_bad_test:
+        tests = dict(sorted(tests.items(), key=lambda t: int(t[0])))
+    return tests
+
+
+def _build_protocol(events: Iterator[Event],
+                    exclude_fields: Set[str],
+                    exclude_test_fields: Set[str],
+                    first_bad_test: bool) -> Any:
+    first = next(events)
+    if first[1] != 'start_map':
+        return _build(events, first)
+
+    protocol = {}
+    for _, event, key in events:
+        if event == 'end_map':
+            return protocol
+        if key in exclude_fields:
+            _skip(events)
+        elif key == 'tests':
+            protocol[key] = _build_tests(events, exclude_test_fields, first_bad_test)
+        else:
+            protocol[key] = _build(events)
+
+
+def parse_protocol(file,
+                   exclude_fields: Iterable[str] = (),
+                   exclude_test_fields: Iterable[str] = (),
+                   first_bad_test: bool = False,
+                   data_key: str = 'data') -> Optional[dict]:
+    """Parses protocol of rmatics response as it's read from `file`.
+
+    Excluded fields of protocol and of it's tests are read without
+    building, so memory is taken by visible part of protocol and
+    by the value being read, not by whole protocol.
+    With `first_bad_test` only tests up to the first failed one are
+    kept, ordered by number.
+
+    :raises ValueError: if response is not valid JSON
+    """
+    exclude_fields = set(exclude_fields)
+    exclude_test_fields = set(exclude_test_fields)
+    events = ijson.parse(file, use_float=True)
+
+    protocol = None
+    try:
+        for prefix, event, key in events:
+            if prefix != '' or event != 'map_key':
+                continue
+            if key == data_key:
+                protocol = _build_protocol(events, exclude_fields, exclude_test_fields, first_bad_test)
+            else:
+                _skip(events)
+    except ijson.JSONError as e:
+        raise ValueError(f'Invalid protocol response: {e}') from e
+    return protocol
@@ -0,0 +1,94 @@
+import logging
+from json import loads
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from informatics_front.utils.services.circuit_breaker import CircuitBreakers, CircuitBreakingMixin, StaleResponses
+from informatics_front.utils.services.errors import ClientError, ServerError
+from informatics_front.utils.services.response_cache import CachePolicy, ResponseCache, ResponseCachingMixin
+
+RETRY_STATUSES = (502, 503, 504)
+RETRY_METHODS = ('GET',)
+
+
+class RequestPolicyMixin(CircuitBreakingMixin, ResponseCachingMixin):
+    """Retries, circuit breaking and response caching of API clients.
+
+    Sync and async clients differ in transport only: they send requests
+    and pass received responses to _handle_response. Circuit breakers,
+    stale and cached responses are passed to client, so clients of one
+    service may share them. Endpoints are paths relative to `service_url`.
+    """
+
+    logger: logging.Logger
+
+    def _init_request_policies(self,
+                               service_url: Optional[str],
+                               retries: int,
+                               backoff_factor: float,
+                               breakers: Optional[CircuitBreakers],
+                               stale: Optional[StaleResponses],
+                               cache: Optional[ResponseCache],
+                               cache_policies: Optional[Dict[str, CachePolicy]]):
+        self.service_url = service_url
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self._init_circuit_breaking(breakers, stale)
+        self._init_response_cache(cache, cache_policies)
+
+    def _get_retries(self, method: str) -> int:
+        return self.retries if method in RETRY_METHODS else 0
+
+    def _get_backoff(self, attempt: int) -> float:
+        """ Seconds to wait before `attempt`, counted from 1 for the first retry """
+        return self.backoff_factor * 2 ** (attempt - 1)
+
+    def _fail(self, url: str, kwargs: dict, default, silent: bool) -> Tuple[Any, int]:
+        """ Result of request, which got no response; called from except block """
+        self.logger.exception(
+            f'Unable to get data from {url}. \n'
+            f'Kwargs: {kwargs}. '
+        )
+
+        if not silent:
+            raise ServerError()
+        return default, 500
+
+    def _handle_response(self,
+                         url: str,
+                         status_code: int,
+                         content: bytes,
+                         data_key: Optional[str],
+                         default,
+                         silent: bool,
+                         allow_bad_http_statuses: bool,
+                         stale_key: Optional[Hashable] = None,
+                         cache_key: Optional[Hashable] = None,
+                         policy: Optional[CachePolicy] = None) -> Tuple[Any, int]:
+        if not allow_bad_http_statuses:
+            if 400 <= status_code < 500:
+                self.logger.error(f'URL: {url}.\n Response: {content}')
+                if not silent:
+                    raise ClientError(status_code)
+                return default, status_code
+
+            if 500 <= status_code < 600:
+                self.logger.error(
+                    f'Server error returned when sending request to "{url}". '
+                    f'Got response: "{str(content)}"'
+                )
+
+                if not silent:
+                    raise ServerError()
+                return default, status_code
+
+        data_key = data_key if data_key else 'data'
+
+        if allow_bad_http_statuses and status_code >= 400:
+            data_key = 'error'
+
+        json_response = loads(content)[data_key]
+        if stale_key is not None and status_code < 400:
+            self.stale.set(stale_key, (content, status_code, data_key))
+        if cache_key is not None:
+            self._cache_response(cache_key, policy, content, status_code, json_response)
+        return json_response, status_code
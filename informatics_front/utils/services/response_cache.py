@@ -0,0 +1,297 @@
+import hashlib
+import logging
+import os
+import pickle
+import tempfile
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from json import loads
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from informatics_front.utils.services.circuit_breaker import CircuitBreakers, StaleResponses
+
+DISK_CLEANUP_EVERY = 100
+
+# expire_at and stale_until are None for immutable responses
+CachedResponse = namedtuple('CachedResponse', 'content status_code expire_at stale_until')
+
+# Result of cache lookup by client: policy and key are None if response of request
+# is not cached, cached (data, status_code) is None if there is no cached response,
+# revalidate is True if caller should revalidate stale response
+CacheLookup = namedtuple('CacheLookup', 'policy key cached revalidate')
+
+
+class CachePolicy:
+    """Caching rules of one endpoint.
+
+    Response is fresh for `ttl` seconds and then, for `stale_ttl` more
+    seconds, is returned while it's revalidated in background.
+    Responses, for which `is_immutable(data)` is True, never expire.
+    `ttl` = None makes every response of endpoint immutable.
+    """
+
+    def __init__(self,
+                 ttl: Optional[float],
+                 stale_ttl: float = 0,
+                 is_immutable: Callable[[Any], bool] = None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.is_immutable = is_immutable
+
+    def make_entry(self, content: bytes, status_code: int, data: Any) -> CachedResponse:
+        if self.ttl is None or (self.is_immutable is not None and self.is_immutable(data)):
+            return CachedResponse(content, status_code, None, None)
+        expire_at = time.time() + self.ttl
+        return CachedResponse(content, status_code, expire_at, expire_at + self.stale_ttl)
+
+
+class DiskStorage:
+    """Cached responses in files of `path`, shared by processes of host.
+
+    Files are replaced atomically, so readers never see partial response.
+    Every DISK_CLEANUP_EVERY writes least recently read files are removed
+    until they take less than `size` bytes.
+    """
+
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = size
+        self.writes = 0
+        os.makedirs(path, exist_ok=True)
+
+    @classmethod
+    def _hash(cls, value: Any) -> str:
+        return hashlib.sha256(repr(value).encode('utf-8')).hexdigest()
+
+    def _file_name(self, key: Tuple[str, tuple]) -> str:
+        url, params = key
+        return os.path.join(self.path, f'{self._hash(url)}_{self._hash(params)}')
+
+    def get(self, key: Tuple[str, tuple]) -> Optional[CachedResponse]:
+        file_name = self._file_name(key)
+        try:
+            with open(file_name, 'rb') as file:
+                entry = CachedResponse(*pickle.load(file))
+            os.utime(file_name)
+        except (OSError, EOFError, pickle.UnpicklingError, TypeError):
+            return None
+        return entry
+
+    def set(self, key: Tuple[str, tuple], entry: CachedResponse):
+        fd, temp_name = tempfile.mkstemp(dir=self.path, prefix='.')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                pickle.dump(tuple(entry), file, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_name, self._file_name(key))
+        except OSError:
+            os.unlink(temp_name)
+            raise
+
+        self.writes += 1
+        if self.writes % DISK_CLEANUP_EVERY == 0:
+            self.cleanup()
+
+    def delete(self, key: Tuple[str, tuple]):
+        self._remove(self._file_name(key))
+
+    def delete_url(self, url: str):
+        prefix = f'{self._hash(url)}_'
+        for entry in os.scandir(self.path):
+            if entry.name.startswith(prefix):
+                self._remove(entry.path)
+
+    def cleanup(self):
+        files = []
+        for entry in os.scandir(self.path):
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total_size = sum(size for _, size, _ in files)
+        for _, size, file_name in sorted(files):
+            if total_size <= self.size:
+                break
+            self._remove(file_name)
+            total_size -= size
+
+    @classmethod
+    def _remove(cls, file_name: str):
+        try:
+            os.unlink(file_name)
+        except OSError:
+            pass
+
+
+class ResponseCache:
+    """Cache of raw GET responses by URL and params.
+
+    Responses are kept in process memory, least recently used ones are
+    evicted when contents take more than `size` bytes. If `disk_path`
+    is passed, responses are also kept in files (see DiskStorage), so
+    processes of host share them. Invalidation reaches memory of
+    current process and disk only; memory of other processes is
+    refreshed by TTL. One cache may be shared by several clients
+    of service, e.g. by sync and async ones.
+    """
+
+    def __init__(self, size: int, disk_path: str = None, disk_size: int = 0):
+        self.size = size
+        self.used = 0
+        self.responses: Dict[Hashable, CachedResponse] = OrderedDict()
+        self.lock = threading.Lock()
+        self.disk = DiskStorage(disk_path, disk_size) if disk_path else None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.revalidating = set()
+
+    @classmethod
+    def make_key(cls, url: str, params: Optional[dict]) -> Tuple[str, tuple]:
+        return StaleResponses.make_key(url, params)
+
+    def get(self, key: Hashable) -> Optional[Tuple[CachedResponse, bool]]:
+        """ Returns entry and whether it is fresh; expired entries are not returned """
+        now = time.time()
+        with self.lock:
+            entry = self.responses.get(key)
+            if entry is not None:
+                self.responses.move_to_end(key)
+
+        if entry is None and self.disk is not None:
+            entry = self.disk.get(key)
+            if entry is not None:
+                self._set_memory(key, entry)
+
+        if entry is not None and entry.stale_until is not None and entry.stale_until <= now:
+            self.delete(key)
+            entry = None
+
+        with self.lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            is_fresh = entry.expire_at is None or entry.expire_at > now
+            if is_fresh:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+        return entry, is_fresh
+
+    def set(self, key: Hashable, entry: CachedResponse):
+        self._set_memory(key, entry)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, entry)
+            except OSError:
+                logging.getLogger(__name__).exception('Unable to write response to disk cache')
+
+    def _set_memory(self, key: Hashable, entry: CachedResponse):
+        if len(entry.content) > self.size:
+            return
+        with self.lock:
+            previous = self.responses.pop(key, None)
+            if previous is not None:
+                self.used -= len(previous.content)
+            self.responses[key] = entry
+            self.used += len(entry.content)
+            while self.used > self.size:
+                _, evicted = self.responses.popitem(last=False)
+                self.used -= len(evicted.content)
+
+    def delete(self, key: Hashable):
+        with self.lock:
+            entry = self.responses.pop(key, None)
+            if entry is not None:
+                self.used -= len(entry.content)
+        if self.disk is not None:
+            self.disk.delete(key)
+
+    def delete_url(self, url: str):
+        """ Drops responses of url with any params """
+        with self.lock:
+            for key in [key for key in self.responses if key[0] == url]:
+                self.used -= len(self.responses.pop(key).content)
+        if self.disk is not None:
+            self.disk.delete_url(url)
+
+    def start_revalidation(self, key: Hashable) -> bool:
+        """ Returns False if response is already revalidated by another call """
+        with self.lock:
+            if key in self.revalidating:
+                return False
+            self.revalidating.add(key)
+            return True
+
+    def finish_revalidation(self, key: Hashable):
+        with self.lock:
+            self.revalidating.discard(key)
+
+    def get_stats(self) -> dict:
+        with self.lock:
+            return {
+                'size': self.size,
+                'used': self.used,
+                'responses': len(self.responses),
+                'hits': self.hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.misses,
+            }
+
+
+class ResponseCachingMixin:
+    """ Response caching of GET requests for API clients; see CachePolicy """
+
+    logger: logging.Logger
+    service_url: Optional[str]
+
+    def _init_response_cache(self, cache: Optional[ResponseCache], cache_policies: Optional[Dict[str, CachePolicy]]):
+        """ cache_policies are by endpoint as in CircuitBreakers.make_endpoint """
+        self.cache = cache
+        self.cache_policies = cache_policies or {}
+
+    def _get_cache_policy(self, method: str, url: str) -> Optional[CachePolicy]:
+        if self.cache is None or method != 'GET':
+            return None
+        return self.cache_policies.get(CircuitBreakers.make_endpoint(method, url, self.service_url))
+
+    def _lookup_cache(self,
+                      method: str,
+                      url: str,
+                      params: Optional[dict],
+                      data_key: Optional[str]) -> CacheLookup:
+        """ Only one caller gets `revalidate` for stale response until it calls _finish_revalidation """
+        policy = self._get_cache_policy(method, url)
+        if policy is None:
+            return CacheLookup(None, None, None, False)
+
+        cache_key = ResponseCache.make_key(url, params)
+        cached = self.cache.get(cache_key)
+        if cached is None:
+            return CacheLookup(policy, cache_key, None, False)
+
+        entry, is_fresh = cached
+        data = loads(entry.content)[data_key or 'data'], entry.status_code
+        return CacheLookup(policy, cache_key, data, not is_fresh and self.cache.start_revalidation(cache_key))
+
+    def _cache_response(self,
+                        cache_key: Hashable,
+                        policy: CachePolicy,
+                        content: bytes,
+                        status_code: int,
+                        data: Any):
+        if 200 <= status_code < 300:
+            self.cache.set(cache_key, policy.make_entry(content, status_code, data))
+
+    def _finish_revalidation(self, cache_key: Hashable):
+        self.cache.finish_revalidation(cache_key)
+
+    def invalidate_cache(self, url: str):
+        """ Drops cached responses of url, e.g. after request changing them """
+        if self.cache is not None:
+            self.cache.delete_url(url)
+
+    def get_cache_stats(self) -> dict:
+        return self.cache.get_stats() if self.cache is not None else {}
@@ -0,0 +1,60 @@
+import hashlib
+import json
+import threading
+from typing import Any, Callable, Dict
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException = None
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls within process.
+
+    While call for key is in flight, other callers of the same key
+    don't call `func` themselves but wait for the first call and
+    get the same result (or the same exception). Result is shared,
+    so callers must not mutate it.
+
+    Usage:
+        single_flight = SingleFlight()
+
+        def get_monitor(self, contest_id, ...):
+            key = single_flight.make_key('get_monitor', contest_id, ...)
+            return single_flight.do(key, lambda: self.client.get_data(...))
+    """
+
+    def __init__(self):
+        self.calls: Dict[str, _Call] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def make_key(cls, *args, **kwargs) -> str:
+        dumped = json.dumps([args, kwargs], sort_keys=True, default=str)
+        return hashlib.sha256(dumped.encode('utf-8')).hexdigest()
+
+    def do(self, key: str, func: Callable[[], Any]) -> Any:
+        with self.lock:
+            call = self.calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self.calls[key] = _Call()
+
+        if not is_leader:
+            call.done.wait()
+        else:
+            try:
+                call.result = func()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self.lock:
+                    del self.calls[key]
+                call.done.set()
+
+        if call.error is not None:
+            raise call.error
+        return call.result
@@ -0,0 +1,183 @@
+import queue
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Set, Tuple
+
+from flask import Flask
+
+from informatics_front.model.base import db
+
+DEFAULT_INTERVAL = 5
+DEFAULT_QUEUE_SIZE = 16
+DEFAULT_MAX_SUBSCRIPTIONS = 16
+
+Event = Tuple[str, Any]
+
+
+class Subscription:
+    """ Queue of events of one subscriber """
+
+    def __init__(self, key: Hashable, maxsize: int = DEFAULT_QUEUE_SIZE):
+        self.key = key
+        self.queue = queue.Queue(maxsize=maxsize)
+
+    def offer(self, event: Event, snapshot: Any):
+        """ Puts event; if subscriber lags behind, it's events are replaced by snapshot """
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self._drain()
+            self.queue.put_nowait(('snapshot', snapshot))
+
+    def _drain(self):
+        while True:
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                return
+
+    def get(self, timeout: float) -> Optional[Event]:
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class Poller(threading.Thread):
+    """ Polls value by `poll` while there are subscribers and
+        publishes ('snapshot', value) or ('update', diff(previous, value))
+    """
+
+    def __init__(self,
+                 app: Flask,
+                 key: Hashable,
+                 poll: Callable[[], Any],
+                 diff: Callable[[Any, Any], Any],
+                 interval: float):
+        super().__init__(name=f'poller-{key}', daemon=True)
+        self.app = app
+        self.key = key
+        self.poll = poll
+        self.diff = diff
+        self.interval = interval
+        self.value = None
+        self.subscriptions: Set[Subscription] = set()
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.is_set():
+            with self.app.app_context():
+                try:
+                    value = self.poll()
+                except Exception:
+                    self.app.logger.exception(f'Polling of {self.key} has failed')
+                    value = None
+                finally:
+                    db.session.remove()
+
+            if value is not None:
+                self.publish(value)
+
+            self.stopped.wait(self.interval)
+
+    def publish(self, value: Any):
+        with self.lock:
+            previous, self.value = self.value, value
+            if previous is None:
+                event = ('snapshot', value)
+            else:
+                changes = self.diff(previous, value)
+                if changes is None:
+                    return
+                event = ('update', changes)
+
+            for subscription in self.subscriptions:
+                subscription.offer(event, value)
+
+    def add(self, subscription: Subscription):
+        with self.lock:
+            self.subscriptions.add(subscription)
+            if self.value is not None:
+                subscription.offer(('snapshot', self.value), self.value)
+
+    def remove(self, subscription: Subscription) -> bool:
+        """ Returns True if there are no subscribers left """
+        with self.lock:
+            self.subscriptions.discard(subscription)
+            return not self.subscriptions
+
+    def stop(self):
+        self.stopped.set()
+
+
+class Streamer:
+    """Shares one polling thread by key between all subscribers.
+
+    Thread polls every `interval_param` seconds from app config
+    and is stopped, when the last subscriber leaves. There are at most
+    `max_subscriptions_param` subscriptions at once in process.
+
+    Usage:
+        # plugins.py
+        monitor_streamer = Streamer(interval_param='MONITOR_STREAM_INTERVAL',
+                                    max_subscriptions_param='MONITOR_STREAM_MAX_CONNECTIONS')
+
+        # views.py
+        subscription = monitor_streamer.subscribe(key, poll, diff)
+        if subscription is None:
+            # too many subscribers
+            ...
+        try:
+            event = subscription.get(timeout=15)
+        finally:
+            monitor_streamer.unsubscribe(subscription)
+    """
+
+    def __init__(self, interval_param: str, max_subscriptions_param: str, app: Flask = None):
+        self.interval_param = interval_param
+        self.max_subscriptions_param = max_subscriptions_param
+        self.interval = DEFAULT_INTERVAL
+        self.max_subscriptions = DEFAULT_MAX_SUBSCRIPTIONS
+        self.subscriptions_count = 0
+        self.app = None
+        self.pollers: Dict[Hashable, Poller] = {}
+        self.lock = threading.Lock()
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        self.app = app
+        self.interval = app.config.get(self.interval_param) or DEFAULT_INTERVAL
+        self.max_subscriptions = app.config.get(self.max_subscriptions_param) or DEFAULT_MAX_SUBSCRIPTIONS
+        app.extensions[f'streamer_{self.interval_param.lower()}'] = self
+
+    def subscribe(self,
+                  key: Hashable,
+                  poll: Callable[[], Any],
+                  diff: Callable[[Any, Any], Any]) -> Optional[Subscription]:
+        """ Returns None if there are `max_subscriptions` already
+
+        `poll` and `diff` are used only if there is no poller for `key` yet
+        """
+        subscription = Subscription(key)
+        with self.lock:
+            if self.subscriptions_count >= self.max_subscriptions:
+                return None
+            self.subscriptions_count += 1
+
+            poller = self.pollers.get(key)
+            if poller is None:
+                poller = Poller(self.app, key, poll, diff, self.interval)
+                self.pollers[key] = poller
+                poller.start()
+            poller.add(subscription)
+
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        with self.lock:
+            self.subscriptions_count -= 1
+            poller = self.pollers.get(subscription.key)
+            if poller is not None and poller.remove(subscription):
+                poller.stop()
+                del self.pollers[subscription.key]
@@ -0,0 +1,84 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from flask import Flask
+from sqlalchemy import event
+
+Listener = Tuple[type, str, Callable]
+
+
+class TTLIndex(ABC):
+    """Base of process-wide indexes of DB data by key, e.g. GroupIndex.
+
+    Entries are loaded by `_load` of subclass, which gets all keys asked
+    at once and may load them by one query, and are kept for `ttl_param` seconds from app config or until
+    invalidation. At most `size` entries are kept; least recently used
+    one is evicted when it's exceeded. ORM events from `_get_listeners`
+    invalidate index, so changes made by this process are seen at once;
+    other changes are noticed when TTL expires.
+    """
+
+    default_ttl = 60
+    default_size = 1024
+    extension_name: str
+
+    def __init__(self, ttl_param: str, app: Flask = None, size: int = default_size):
+        self.ttl_param = ttl_param
+        self.ttl = self.default_ttl
+        self.size = size
+        self.entries: Dict[Hashable, Tuple[float, Any]] = OrderedDict()
+        self.lock = threading.Lock()
+        if app:
+            self.init_app(app)
+
+    def init_app(self, app: Flask):
+        self.ttl = app.config.get(self.ttl_param) or self.default_ttl
+        app.extensions[f'{self.extension_name}_{self.ttl_param.lower()}'] = self
+
+        for model, event_name, listener in self._get_listeners():
+            if not event.contains(model, event_name, listener):
+                event.listen(model, event_name, listener, propagate=True)
+
+    def _get(self, key: Hashable) -> Any:
+        with self.lock:
+            expire_at, value = self.entries.get(key, (0, None))
+            if value is not None:
+                self.entries.move_to_end(key)
+        if value is not None and expire_at > time.monotonic():
+            return value
+        return self.warm([key])[key]
+
+    def warm(self, keys: Iterable[Hashable]) -> Dict[Hashable, Any]:
+        """ Loads entries by one `_load` call, e.g. before they are looked up one by one """
+        values = self._load(list(keys))
+
+        expire_at = time.monotonic() + self.ttl
+        with self.lock:
+            for key, value in values.items():
+                self.entries.pop(key, None)
+                self.entries[key] = (expire_at, value)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+        return values
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """ Forgets entry or, if key is None, every entry """
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+    @abstractmethod
+    def _load(self, keys: List[Hashable]) -> Dict[Hashable, Any]:
+        """ Returns entry of every key; entry must not be None """
+        pass
+
+    def _get_listeners(self) -> Iterable[Listener]:
+        return ()
+
+    def _on_changed(self, mapper, connection, target):
+        self.invalidate()
@@ -9,7 +9,7 @@ from informatics_front.model import db
 from informatics_front.model.contest.contest import Contest
 from informatics_front.model.problem import EjudgeProblem
 from informatics_front.model.workshop.contest_connection import ContestConnection
-from informatics_front.plugins import internal_rmatics
+from informatics_front.plugins import internal_rmatics, monitor_cacher
 from informatics_front.utils.auth.middleware import login_required
 from informatics_front.utils.auth.request_user import current_user
 from informatics_front.utils.response import jsonify
@@ -117,6 +117,9 @@ class ProblemSubmissionApi(MethodView):
                                                        problem_id,
                                                        contest_id,
                                                        args['lang_id'])
+        if status < 300:
+            monitor_cacher.invalidate(problem_id)
+
         return jsonify(content, status_code=status)
 
     @login_required
@@ -2,7 +2,7 @@ from flask import Blueprint
 
 from informatics_front.view.course.contest.contest import ContestApi
 from informatics_front.view.course.contest.problem import ProblemApi, ProblemSubmissionApi
-from informatics_front.view.course.contest.run import RunSourceApi, RunProtocolApi, RunCommentsApi
+from informatics_front.view.course.contest.run import RunSourceApi, RunProtocolApi, RunCommentsApi, RunApi
 
 contest_blueprint = Blueprint('contest', __name__, url_prefix='/api/v1/contest/<int:contest_id>')
 
@@ -18,6 +18,9 @@ contest_blueprint.add_url_rule('/problem/<int:problem_id>/submission', methods=(
 contest_blueprint.add_url_rule('/problem/<int:problem_id>/run/<int:run_id>/protocol', methods=('GET',),
                                view_func=RunProtocolApi.as_view('run_protocol'))
 
+contest_blueprint.add_url_rule('/problem/<int:problem_id>/run/<int:run_id>', methods=('GET',),
+                               view_func=RunApi.as_view('run'))
+
 
 run_blueprint = Blueprint('run', __name__, url_prefix='/api/v1/run/<int:run_id>')
 
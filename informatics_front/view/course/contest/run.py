@@ -1,15 +1,19 @@
+import concurrent.futures
+import time
+from typing import List, Tuple
+
 from flask.views import MethodView
 from sqlalchemy.orm import joinedload
-from werkzeug.exceptions import BadRequest, NotFound
+from werkzeug.exceptions import BadRequest, NotFound, ServiceUnavailable
 
-from informatics_front.model.contest.contest import Contest
 from informatics_front.utils.enums import ContestProtocolVisibility
 from informatics_front.utils.auth.request_user import current_user
-from informatics_front.plugins import internal_rmatics
-from informatics_front.model import Comment, Statement, StatementProblem
+from informatics_front.plugins import internal_rmatics, run_protocol_cacher, protocol_visibility_index, executor
+from informatics_front.model import Comment
 from informatics_front.model.base import db
 from informatics_front.utils.auth.middleware import login_required
 from informatics_front.utils.response import jsonify
+from informatics_front.utils.services.internal_rmatics import is_judged_protocol
 from informatics_front.view.course.contest.serializers.comment import CommentSchema
 
 PROTOCOL_EXCLUDE_FIELDS = ['audit']
@@ -32,67 +36,55 @@ class RunSourceApi(MethodView):
 class RunProtocolApi(MethodView):
     @login_required
     def get(self, contest_id: int, problem_id: int, run_id: int):
-        contest_visibility = db.session.query(Contest.protocol_visibility) \
-            .filter_by(id=contest_id).join(Statement) \
-            .join(StatementProblem) \
-            .filter(StatementProblem.problem_id == problem_id) \
-            .one_or_none()
-
-        if contest_visibility is None:
-            raise BadRequest('Неправильный ID протокола или задачи')
-
-        contest_visibility = contest_visibility and contest_visibility[0]
+        contest_visibility = self._get_visibility(contest_id, problem_id)
 
         if contest_visibility is ContestProtocolVisibility.INVISIBLE:
             raise NotFound('Просмотр протокола для этой посылки недоступен')
 
-        context, status = internal_rmatics.get_full_run_protocol(run_id, current_user.id)
-
-        if status > 299:
-            return jsonify(context, status_code=status)
+        protocol, status = self._get_protocol(run_id, current_user.id, contest_visibility)
+        return jsonify(protocol, status_code=status)
 
-        # TODO: NFRMTCS-192: нужен контекст,
-        # TODO: чтобы нельзя было смотреть любой протокол, найдя открытый воркшоп
-        protocol = self._remove_fields_from_full_protocol(context)
+    @classmethod
+    def _get_visibility(cls, contest_id: int, problem_id: int) -> ContestProtocolVisibility:
+        contest_visibility = protocol_visibility_index.get_visibility(contest_id, problem_id)
 
-        if contest_visibility is ContestProtocolVisibility.FIRST_BAD_TEST:
-            protocol = self._remove_all_after_bad_test(protocol)
+        if contest_visibility is None:
+            raise BadRequest('Неправильный ID протокола или задачи')
 
-        return jsonify(protocol, status_code=status)
+        return contest_visibility
 
     @classmethod
-    def _remove_fields_from_full_protocol(cls, protocol: dict) -> dict:
-        # We need to remove some fields for student
-        for field in PROTOCOL_EXCLUDE_FIELDS:
-            protocol.pop(field, None)
+    def _get_protocol(cls,
+                      run_id: int,
+                      user_id: int,
+                      contest_visibility: ContestProtocolVisibility) -> Tuple[dict, int]:
+        # Protocol doesn't change after judging, so filtered one is kept
+        # for every visibility level without invalidation; rmatics checks
+        # access by user
+        cache_key = run_protocol_cacher.make_key(run_id=run_id,
+                                                 user_id=user_id,
+                                                 visibility=contest_visibility.value)
+        protocol = run_protocol_cacher.get(cache_key)
+        if protocol is not None:
+            return protocol, 200
 
-        tests = protocol.get('tests')
-
-        if not tests:
-            return protocol
+        # TODO: NFRMTCS-192: нужен контекст,
+        # TODO: чтобы нельзя было смотреть любой протокол, найдя открытый воркшоп
+        # Big fields are asked to be left out by rmatics and are skipped while
+        # parsing anyway, as older rmatics sends them
+        first_bad_test = contest_visibility is ContestProtocolVisibility.FIRST_BAD_TEST
+        protocol, status = internal_rmatics.get_run_protocol(run_id, user_id,
+                                                             exclude_fields=PROTOCOL_EXCLUDE_FIELDS,
+                                                             exclude_test_fields=PROTOCOL_EXCLUDE_TEST_FIELDS,
+                                                             first_bad_test=first_bad_test)
 
-        for test in tests.values():
-            for field in PROTOCOL_EXCLUDE_TEST_FIELDS:
-                test.pop(field, None)
+        if status > 299:
+            return protocol, status
 
-        return protocol
+        if is_judged_protocol(protocol):
+            run_protocol_cacher.set(cache_key, protocol)
 
-    @classmethod
-    def _remove_all_after_bad_test(cls, protocol: dict) -> dict:
-        """ Returns protocol where we have only first failed test
-            protocol tests are like:
-            {'1': {status: OK, ...<some_fields>},
-             '2': {status: WA, ...<some_fields>}}
-        """
-        tests = protocol.get('tests')
-        sorted_tests = list(sorted(tests.items(), key=lambda t: int(t[0])))
-        visible_tests = {}
-        for k, v in sorted_tests:
-            visible_tests[k] = v
-            if v.get('status') != 'OK':
-                break
-        protocol['tests'] = visible_tests
-        return protocol
+        return protocol, status
 
 
 class RunCommentsApi(MethodView):
@@ -101,11 +93,14 @@ class RunCommentsApi(MethodView):
         """
         Returns List[Comment] for current authorized user for requested run_id
         """
+        return jsonify(self._get_comments(run_id, current_user.id))
 
+    @classmethod
+    def _get_comments(cls, run_id: int, user_id: int) -> List[dict]:
         # if provided run_id not not found, return []
         comments = db.session.query(Comment) \
             .filter(Comment.py_run_id == run_id,
-                    Comment.user_id == current_user.id) \
+                    Comment.user_id == user_id) \
             .options(joinedload(Comment.author_user)) \
             .order_by(Comment.date.desc()) \
             .all()
@@ -113,4 +108,44 @@ class RunCommentsApi(MethodView):
         comment_schema = CommentSchema(many=True)
         response = comment_schema.dump(comments)
 
-        return jsonify(response.data)
+        return response.data
+
+
+class RunApi(MethodView):
+    @login_required
+    def get(self, contest_id: int, problem_id: int, run_id: int):
+        """
+        Returns source, protocol and comments of run at once:
+        source and protocol are requested from rmatics concurrently,
+        while comments are loaded. Protocol is null, if it is not visible
+        in contest or is not available yet
+        """
+        contest_visibility = RunProtocolApi._get_visibility(contest_id, problem_id)
+
+        # Threads, not async client: protocol is parsed as it's received
+        # and is cached the same way as by RunProtocolApi
+        source_future = executor.submit(internal_rmatics.get_run_source, run_id, current_user.id)
+        protocol_future = None
+        if contest_visibility is not ContestProtocolVisibility.INVISIBLE:
+            protocol_future = executor.submit(RunProtocolApi._get_protocol, run_id, current_user.id,
+                                              contest_visibility)
+        deadline = time.monotonic() + internal_rmatics.client.get_max_duration()
+
+        comments = RunCommentsApi._get_comments(run_id, current_user.id)
+
+        try:
+            source, status = source_future.result(timeout=max(deadline - time.monotonic(), 0))
+            protocol, protocol_status = protocol_future.result(timeout=max(deadline - time.monotonic(), 0)) \
+                if protocol_future else (None, None)
+        except concurrent.futures.TimeoutError:
+            raise ServiceUnavailable('Не удалось получить посылку, попробуйте позже')
+        if status == 404:
+            raise NotFound('Посылка не найдена')
+        if status > 299:
+            return jsonify(source, status_code=status)
+
+        return jsonify({
+            'source': source,
+            'protocol': protocol if protocol_status is not None and protocol_status < 300 else None,
+            'comments': comments,
+        })
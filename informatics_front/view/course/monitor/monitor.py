@@ -1,36 +1,61 @@
+import asyncio
 import datetime
+import hashlib
+import json
+import time
+import zlib
 from collections import namedtuple, defaultdict
-from typing import List, Type, Callable, Optional, Iterable
+from typing import List, Type, Callable, Optional, Iterable, Dict, Tuple
 
 from dateutil.tz import UTC
-from flask import request
+from flask import request, current_app, Response
 from flask.views import MethodView
-from marshmallow import fields
-from sqlalchemy.orm import joinedload, load_only, Load
+from marshmallow import fields, validate
+from sqlalchemy.exc import IntegrityError
 from webargs.flaskparser import parser
 from werkzeug.exceptions import NotFound
 
-from informatics_front.model import db, User, Group, UserGroup, StatementProblem, Problem
+from informatics_front.model import db, User, StatementProblem, Problem, Statement, Language, LanguageContest
 from informatics_front.model.contest.contest import Contest
-from informatics_front.model.contest.monitor import WorkshopMonitor
+from informatics_front.model.contest.monitor import WorkshopMonitor, WorkshopMonitorSnapshot
 from informatics_front.model.workshop.contest_connection import ContestConnection
 from informatics_front.model.workshop.workshop import WorkShop, WorkshopStatus
 from informatics_front.model.workshop.workshop_connection import WorkshopConnection, WorkshopConnectionStatus
-from informatics_front.plugins import internal_rmatics
+from informatics_front.plugins import internal_rmatics, executor, monitor_cacher, monitor_state_cacher, \
+    monitor_snapshot_cacher, group_index, async_internal_rmatics, event_loop
 from informatics_front.utils.auth.middleware import login_required
 from informatics_front.utils.auth.request_user import current_user
 from informatics_front.utils.enums import WorkshopMonitorType
+from informatics_front.utils.group_index import GroupMember
 from informatics_front.utils.response import jsonify
 from informatics_front.view.course.monitor.monitor_preprocessor import BaseResultMaker, IOIResultMaker, \
     MonitorPreprocessor, ACMResultMaker, LightACMResultMaker
+from informatics_front.view.course.monitor.rows import MonitorContest, MonitorLanguage, MonitorProblem, \
+    MonitorStatement
+from informatics_front.view.course.monitor.run_table import to_epoch_microseconds, EPOCH
 from informatics_front.view.course.monitor.serializers.monitor import monitor_schema
+from informatics_front.view.course.monitor.standings import BaseStandingsMaker, ACMStandingsMaker, \
+    IOIStandingsMaker, LightACMStandingsMaker
 
-MonitorData = namedtuple('MonitorData', 'contests users results type')
+try:
+    from informatics_front.view.course.monitor.monitor_vectorized import VectorizedACMResultMaker, \
+        VectorizedIOIResultMaker, VectorizedLightACMResultMaker
+except ImportError:
+    # NumPy is optional; without it MONITOR_VECTORIZED falls back to pure-Python result makers
+    VectorizedACMResultMaker = VectorizedIOIResultMaker = VectorizedLightACMResultMaker = None
+
+MonitorData = namedtuple('MonitorData', 'contests users results type standings users_count version is_delta')
+ContestVersion = namedtuple('ContestVersion', 'version last_modified')
 
 
 class WorkshopMonitorApi(MethodView):
     get_args = {
-        'group_id': fields.Integer(missing=None)
+        'group_id': fields.Integer(missing=None),
+        'with_standings': fields.Boolean(missing=False),
+        'contest_id': fields.Integer(missing=None),
+        'offset': fields.Integer(missing=0, validate=validate.Range(min=0)),
+        'limit': fields.Integer(missing=None, validate=validate.Range(min=1)),
+        'since': fields.String(missing=None),
     }
 
     @login_required
@@ -48,57 +73,360 @@ class WorkshopMonitorApi(MethodView):
             raise NotFound(f'Результаты сбора #{workshop_id} не найдены или у пользователя нет приглашения на него')
 
         contests = self._get_contests(workshop_id)
+        if args['contest_id'] is not None:
+            contests = [contest for contest in contests if contest.id == args['contest_id']]
+            if not contests:
+                raise NotFound(f'Контест #{args["contest_id"]} не найден в сборе #{workshop_id}')
 
         users = self._get_users(monitor, args.get('group_id'))
         user_ids = [user.id for user in users]
 
+        # When every contest is cached, version is known before results are rendered
+        cached_results = self._get_cached_results(monitor, contests, user_ids, args.get('group_id'))
+        if len(cached_results) == len(contests):
+            results = None
+            versions = {contest_id: cached['version'] for contest_id, cached in cached_results.items()}
+        else:
+            results, versions = self._get_results(monitor, contests, user_ids, args.get('group_id'), cached_results)
+
+        version = self._make_version(versions, user_ids, args)
+        last_modified = max((contest_version.last_modified for contest_version in versions.values()), default=0)
+        if self._is_not_modified(version, last_modified):
+            response = Response(status=304)
+            self._set_version_headers(response, version, last_modified)
+            return response
+
+        if results is None:
+            results, _ = self._get_results(monitor, contests, user_ids, args.get('group_id'), cached_results)
+
+        is_windowed = args['offset'] > 0 or args['limit'] is not None
+        standings = None
+        if args['with_standings'] or is_windowed:
+            standings = self._get_standings_maker_cls(monitor)().make(results, user_ids)
+
+        users_count = len(users)
+        if is_windowed:
+            users, results, standings = self._get_window(users, results, standings, args['offset'], args['limit'])
+
+        if not args['with_standings']:
+            standings = None
+
+        # The last response is kept for every workshop and args, the next version overwrites it
+        snapshot_key = self._make_snapshot_key(monitor, user_ids, args)
+        snapshot = monitor_snapshot_cacher.get(snapshot_key)
+        if snapshot is None or snapshot['version'] != version:
+            monitor_snapshot_cacher.set(snapshot_key, {'version': version, 'results': results})
+
+        is_delta = False
+        if args['since'] and snapshot is not None and snapshot['version'] == args['since']:
+            results = self._get_results_delta(snapshot['results'], results)
+            is_delta = True
+
+        monitor_data = MonitorData(contests, users, results, monitor.type.name, standings, users_count,
+                                   version, is_delta)
+
+        data = monitor_schema.dump(monitor_data)
+
+        response, status = jsonify(data.data)
+        self._set_version_headers(response, version, last_modified)
+        return response, status
+
+    @classmethod
+    def _make_version(cls, versions: Dict[int, ContestVersion], user_ids: List[int], args: dict) -> str:
+        """ Version of response: changes when results of any contest
+            are changed or response is asked with other args
+        """
+        contest_versions = [(contest_id, contest_version.version)
+                            for contest_id, contest_version in versions.items()]
+        args = {name: value for name, value in args.items() if name != 'since'}
+        return monitor_cacher.make_key(contests=contest_versions, user_ids=user_ids, args=args)
+
+    @classmethod
+    def _make_snapshot_key(cls, monitor: WorkshopMonitor, user_ids: List[int], args: dict) -> str:
+        args = {name: value for name, value in args.items() if name != 'since'}
+        return monitor_snapshot_cacher.make_key(workshop_id=monitor.workshop_id, user_ids=user_ids, args=args)
+
+    @classmethod
+    def _is_not_modified(cls, version: str, last_modified: int) -> bool:
+        if request.if_none_match:
+            return request.if_none_match.contains(version)
+        if request.if_modified_since and last_modified:
+            if_modified_since = int(request.if_modified_since.replace(tzinfo=UTC).timestamp())
+            return last_modified <= if_modified_since
+        return False
+
+    @classmethod
+    def _set_version_headers(cls, response: Response, version: str, last_modified: int):
+        response.set_etag(version)
+        if last_modified:
+            response.last_modified = datetime.datetime.utcfromtimestamp(last_modified)
+
+    @classmethod
+    def _get_results_delta(cls, previous_results: List[dict], results: List[dict]) -> List[dict]:
+        """ Leaves only cells, which are new or differ from `previous_results` """
+        previous_contests_results = {contest_results['contest_id']: contest_results['results']
+                                     for contest_results in previous_results}
+        delta = []
+        for contest_results in results:
+            previous_users_results = previous_contests_results.get(contest_results['contest_id'], {})
+            users_delta = {}
+            for user_id, user_results in contest_results['results'].items():
+                previous_user_results = previous_users_results.get(user_id, {})
+                user_delta = {problem_id: cell for problem_id, cell in user_results.items()
+                              if previous_user_results.get(problem_id) != cell}
+                if user_delta:
+                    users_delta[user_id] = user_delta
+            delta.append({**contest_results, 'results': users_delta})
+
+        return delta
+
+    @classmethod
+    def _get_results(cls,
+                     monitor: WorkshopMonitor,
+                     contests: List[MonitorContest],
+                     user_ids: List[int],
+                     group_id: Optional[int],
+                     cached_results: Optional[Dict[int, dict]] = None) -> Tuple[List[dict], Dict[int, ContestVersion]]:
+        """ Returns rendered results and version of every contest
+
+        Results are taken from frozen snapshots or monitor cache
+        if possible (see `_get_cached_results`), only the rest of contests
+        are fetched from rmatics. In incremental mode only runs newer
+        than folded state of contest are fetched.
+        """
+        cache_keys = {contest.id: cls._make_cache_key(monitor, contest, user_ids, group_id)
+                      for contest in contests}
+
+        is_frozen = cls._is_frozen(monitor)
+        if cached_results is None:
+            cached_results = cls._get_cached_results(monitor, contests, user_ids, group_id)
+
+        not_cached_contests = [contest for contest in contests
+                               if contest.id not in cached_results]
+
+        is_incremental = current_app.config.get('MONITOR_INCREMENTAL')
+        states = {}
+        if is_incremental:
+            states = monitor_state_cacher.get_many(cache_keys[contest.id]
+                                                   for contest in not_cached_contests)
+        runs_after = {contest.id: states[cache_keys[contest.id]]['last_run_id']
+                      for contest in not_cached_contests
+                      if cache_keys[contest.id] in states}
+
+        contests_raw_data = cls._get_raw_data(monitor, user_ids, not_cached_contests, runs_after)
+
+        start_times = {}
+        if cls._get_result_maker_cls(monitor).is_need_time:
+            contests_to_render = [contest for contest in not_cached_contests
+                                  if contests_raw_data.get(contest.id) is not None]
+            start_times = cls._get_start_times(contests_to_render, user_ids)
+
         results = []
+        versions = {}
         for contest in contests:
-            raw_data = self._get_raw_data_by_contest(monitor, user_ids, contest)
-            data = self._prepare_data(monitor, contest, raw_data)
+            cache_key = cache_keys[contest.id]
+            if contest.id in cached_results:
+                cached = cached_results[contest.id]
+                results.append({
+                    'contest_id': contest.id,
+                    'results': cached['results']
+                })
+                versions[contest.id] = cached['version']
+                continue
+
+            raw_data = contests_raw_data.get(contest.id)
+            if raw_data is None:
+                results.append({
+                    'contest_id': contest.id,
+                    'results': {},
+                    'error': 'Не удалось получить результаты контеста',
+                })
+                versions[contest.id] = ContestVersion(None, 0)
+                continue
+
+            problem_ids = cls._extract_problem_ids([contest])
+            if is_incremental:
+                data, state, version = cls._prepare_data_incrementally(monitor, contest, raw_data,
+                                                                       states.get(cache_key), start_times)
+                if state is not None:
+                    monitor_state_cacher.set(cache_key, state, invalidate_args=problem_ids)
+            else:
+                data, version = cls._prepare_data(monitor, contest, raw_data, start_times)
+
+            monitor_cacher.set(cache_key, {'results': data, 'version': version}, invalidate_args=problem_ids)
+            if is_frozen and not cls._has_testing_cells(data):
+                cls._freeze_results(monitor, contest, cache_key, data, version)
             results.append({
                 'contest_id': contest.id,
                 'results': data
             })
+            versions[contest.id] = version
 
-        monitor_data = MonitorData(contests, users, results, monitor.type.name)
+        return results, versions
 
-        data = monitor_schema.dump(monitor_data)
+    @classmethod
+    def _get_cached_results(cls,
+                            monitor: WorkshopMonitor,
+                            contests: List[MonitorContest],
+                            user_ids: List[int],
+                            group_id: Optional[int]) -> Dict[int, dict]:
+        """ Returns results and version of contests, which are frozen or cached, by contest id """
+        cache_keys = {cls._make_cache_key(monitor, contest, user_ids, group_id): contest.id
+                      for contest in contests}
+
+        cached_results = cls._get_frozen_results(cache_keys) if cls._is_frozen(monitor) else {}
+        cached_results.update(monitor_cacher.get_many(key for key in cache_keys
+                                                      if key not in cached_results))
+
+        return {cache_keys[key]: cached for key, cached in cached_results.items()}
+
+    @classmethod
+    def _is_frozen(cls, monitor: WorkshopMonitor) -> bool:
+        """ Runs after freeze are not shown, so results can't change after it,
+            except results of runs, which were on testing at freeze time
+        """
+        runs_until = cls._get_runs_until(monitor)
+        return runs_until is not None and runs_until <= time.time()
+
+    @classmethod
+    def _has_testing_cells(cls, data: dict) -> bool:
+        return any(cell['on_testing']
+                   for user_results in data.values()
+                   for cell in user_results.values())
+
+    @classmethod
+    def _get_frozen_results(cls, cache_keys: Iterable[str]) -> Dict[str, dict]:
+        """ Returns snapshots of frozen results by cache key """
+        snapshots = db.session.query(WorkshopMonitorSnapshot.key, WorkshopMonitorSnapshot.data) \
+            .filter(WorkshopMonitorSnapshot.key.in_(list(cache_keys))) \
+            .all()
+        return {key: cls._load_snapshot(data) for key, data in snapshots}
+
+    @classmethod
+    def _dump_snapshot(cls, data: dict, version: ContestVersion) -> bytes:
+        return zlib.compress(json.dumps({'results': data, 'version': list(version)}).encode())
+
+    @classmethod
+    def _load_snapshot(cls, dumped: bytes) -> dict:
+        """ JSON keys are strings, so ids of users and problems are converted back to int """
+        snapshot = json.loads(zlib.decompress(dumped).decode())
+        results = {int(user_id): {int(problem_id): cell for problem_id, cell in user_results.items()}
+                   for user_id, user_results in snapshot['results'].items()}
+        return {'results': results, 'version': ContestVersion(*snapshot['version'])}
+
+    @classmethod
+    def _freeze_results(cls,
+                        monitor: WorkshopMonitor,
+                        contest: MonitorContest,
+                        cache_key: str,
+                        data: dict,
+                        version: ContestVersion):
+        """ Saves frozen results of contest and drops snapshots of previous freezes
+
+        Saved by separate connection, so request's DB session is not committed
+        """
+        snapshot_table = WorkshopMonitorSnapshot.__table__
+        dumped = cls._dump_snapshot(data, version)
+        try:
+            with db.engine.begin() as connection:
+                connection.execute(snapshot_table.delete()
+                                   .where(snapshot_table.c.monitor_id == monitor.id)
+                                   .where(snapshot_table.c.freeze_time != monitor.freeze_time))
+                connection.execute(snapshot_table.insert().values(
+                    monitor_id=monitor.id,
+                    contest_id=contest.id,
+                    key=cache_key,
+                    freeze_time=monitor.freeze_time,
+                    data=dumped,
+                    created=datetime.datetime.utcnow(),
+                ))
+        except IntegrityError:
+            # Results are frozen by concurrent request
+            pass
+
+    @classmethod
+    def _get_window(cls,
+                    users: List[GroupMember],
+                    results: List[dict],
+                    standings: List[dict],
+                    offset: int,
+                    limit: Optional[int]) -> Tuple[List[GroupMember], List[dict], List[dict]]:
+        """ Leaves only users from offset to offset + limit by place,
+            users are ordered by place
+        """
+        window = standings[offset:] if limit is None else standings[offset:offset + limit]
+        window_user_ids = [user_totals['user_id'] for user_totals in window]
+
+        users_by_id = {user.id: user for user in users}
+        window_users = [users_by_id[user_id] for user_id in window_user_ids]
+
+        window_user_ids = set(window_user_ids)
+        window_results = [{**contest_results,
+                           'results': {user_id: user_results
+                                       for user_id, user_results in contest_results['results'].items()
+                                       if user_id in window_user_ids}}
+                          for contest_results in results]
+
+        return window_users, window_results, window
 
-        return jsonify(data.data)
+    @classmethod
+    def _make_cache_key(cls,
+                        monitor: WorkshopMonitor,
+                        contest: MonitorContest,
+                        user_ids: List[int],
+                        group_id: Optional[int]) -> str:
+        return monitor_cacher.make_key(
+            workshop_id=monitor.workshop_id,
+            contest_id=contest.id,
+            type=monitor.type.name,
+            group_id=group_id,
+            freeze_time=cls._get_runs_until(monitor),
+            problem_ids=cls._extract_problem_ids([contest]),
+            user_ids=sorted(user_ids),
+        )
 
     @classmethod
-    def _find_users_on_workshop(cls, workshop_id: int, load_fields: Iterable[str]) -> List[User]:
-        """ Returns list of ids of users who has connection to workshop """
-        users = db.session.query(User) \
-            .join(WorkshopConnection) \
+    def _find_users_on_workshop(cls, workshop_id: int) -> List[GroupMember]:
+        """ Returns users who has connection to workshop """
+        rows = db.session.query(*cls._user_columns()) \
+            .join(WorkshopConnection, WorkshopConnection.user_id == User.id) \
             .filter(WorkshopConnection.workshop_id == workshop_id) \
-            .options(load_only(*load_fields)) \
             .all()
 
-        return users
+        return [GroupMember(*row) for row in rows]
 
     @classmethod
-    def _find_users_by_group(cls, group_id: int, load_fields: Iterable[str]) -> List[User]:
-        users = db.session.query(User).join(UserGroup).join(Group).filter(Group.id == group_id) \
-            .options(load_only(*load_fields)) \
+    def _find_user(cls, user_id: int) -> List[GroupMember]:
+        rows = db.session.query(*cls._user_columns()) \
+            .filter(User.id == user_id) \
             .all()
-        return users
+
+        return [GroupMember(*row) for row in rows]
+
+    @classmethod
+    def _user_columns(cls) -> tuple:
+        return User.id, User.firstname, User.lastname, User.city, User.school
 
     @classmethod
-    def _get_users(cls, monitor, group_id: Optional[int]) -> List[User]:
-        load_only_fields = ('firstname', 'lastname', 'city', 'school',)
+    def _get_users(cls, monitor, group_id: Optional[int]) -> List[GroupMember]:
         if not current_user.is_teacher and monitor.is_for_user_only():
-            users = [db.session.query(User).get(current_user.id)]
-        elif group_id is not None:
-            users = cls._find_users_by_group(group_id, load_only_fields)
-        else:
-            users = cls._find_users_on_workshop(monitor.workshop_id, load_only_fields)
+            return cls._find_user(current_user.id)
+
+        return cls._load_users(monitor, group_id)
+
+    @classmethod
+    def _load_users(cls, monitor, group_id: Optional[int]) -> List[GroupMember]:
+        """ Returns every user of monitor, regardless of current user
 
-        return users
+        Members of group are taken from process-wide group index
+        """
+        if group_id is not None:
+            return group_index.get_members(group_id)
+
+        return cls._find_users_on_workshop(monitor.workshop_id)
 
     @classmethod
-    def _extract_problem_ids(cls, contests: List[Contest]) -> List[int]:
+    def _extract_problem_ids(cls, contests: List[MonitorContest]) -> List[int]:
         """ Returns list of ids of problems in this contests """
         problem_ids = []
         for contest in contests:
@@ -108,45 +436,69 @@ class WorkshopMonitorApi(MethodView):
         return problem_ids
 
     @classmethod
-    def _get_contests(cls, workshop_id) -> List[Contest]:
-        contests: List[Contest] = db.session.query(Contest) \
+    def _get_contests(cls, workshop_id) -> List[MonitorContest]:
+        contests = cls._load_contests(workshop_id)
+
+        return cls._filter_not_started_contests(contests)
+
+    @classmethod
+    def _load_contests(cls, workshop_id) -> List[MonitorContest]:
+        """ Returns every contest of workshop with problems, regardless of current user """
+        contest_rows = db.session.query(Contest.id,
+                                        Contest.workshop_id,
+                                        Contest.position,
+                                        Contest.time_start,
+                                        Contest.time_stop,
+                                        Contest.is_virtual,
+                                        Contest.virtual_duration,
+                                        Contest.created_at,
+                                        Statement.id,
+                                        Statement.name,
+                                        Statement.summary) \
+            .join(Statement, Statement.id == Contest.statement_id) \
             .filter(Contest.workshop_id == workshop_id) \
-            .options(joinedload(Contest.statement)) \
             .all()
 
-        statement_ids = [contest.statement.id for contest in contests]
+        statement_ids = [row[-3] for row in contest_rows]
+        contest_ids = [row[0] for row in contest_rows]
 
-        statement_problems: List[StatementProblem] = db.session.query(StatementProblem) \
+        # Inner join skips statement problems with removed problems
+        problem_rows = db.session.query(StatementProblem.statement_id,
+                                        Problem.id,
+                                        Problem.name,
+                                        StatementProblem.rank) \
+            .join(Problem, Problem.id == StatementProblem.problem_id) \
             .filter(StatementProblem.statement_id.in_(statement_ids)) \
-            .filter(StatementProblem.problem_id.isnot(None)) \
-            .options(joinedload(StatementProblem.problem).load_only('id', 'name')) \
-            .options(Load(StatementProblem).load_only('statement_id', 'rank')) \
-            .options(Load(Problem).load_only('id', 'name'))
-
-        # Filter statement problems with removed problems
-        statement_problems = [sp
-                              for sp in statement_problems
-                              if sp.problem is not None]
-
-        for sp in statement_problems:
-            sp.problem.rank = sp.rank
-
-        statement_id_statement_problems = defaultdict(list)
-
-        for sp in statement_problems:
-            statement_id_statement_problems[sp.statement_id].append(sp.problem)
-
-        for contest in contests:
-            statement_id = contest.statement_id
-            problems = statement_id_statement_problems[statement_id]
-            contest.problems = problems
-
-        contests = cls._filter_not_started_contests(contests)
+            .order_by(StatementProblem.statement_id, StatementProblem.rank) \
+            .all() if statement_ids else []
+
+        statement_problems = defaultdict(list)
+        for statement_id, *problem in problem_rows:
+            statement_problems[statement_id].append(MonitorProblem(*problem))
+
+        language_rows = db.session.query(LanguageContest.contest_id,
+                                         Language.id,
+                                         Language.code,
+                                         Language.title,
+                                         Language.mode) \
+            .join(Language, Language.id == LanguageContest.language_id) \
+            .filter(LanguageContest.contest_id.in_(contest_ids)) \
+            .all() if contest_ids else []
+
+        contest_languages = defaultdict(list)
+        for contest_id, *language in language_rows:
+            contest_languages[contest_id].append(MonitorLanguage(*language))
+
+        contests = []
+        for *contest, statement_id, statement_name, statement_summary in contest_rows:
+            statement = MonitorStatement(statement_id, statement_name, statement_summary,
+                                         statement_problems[statement_id])
+            contests.append(MonitorContest(*contest, statement, contest_languages[contest[0]]))
 
         return contests
 
     @classmethod
-    def _filter_not_started_contests(cls, contests) -> List[Contest]:
+    def _filter_not_started_contests(cls, contests: List[MonitorContest]) -> List[MonitorContest]:
         if current_user.is_teacher:
             return contests
 
@@ -174,67 +526,252 @@ class WorkshopMonitorApi(MethodView):
             .one_or_none()
 
     @classmethod
-    def _get_raw_data_by_contest(cls, monitor: WorkshopMonitor, user_ids: List[int], contest: Contest):
-        problem_ids = cls._extract_problem_ids([contest])
-
+    def _get_runs_until(cls, monitor: WorkshopMonitor) -> Optional[int]:
         runs_until = monitor.freeze_time
-        runs_until = runs_until and int(runs_until.timestamp())
+        return runs_until and int(runs_until.timestamp())
+
+    @classmethod
+    def _get_raw_data(cls,
+                      monitor: WorkshopMonitor,
+                      user_ids: List[int],
+                      contests: List[MonitorContest],
+                      runs_after: Optional[Dict[int, int]] = None) -> Dict[int, list]:
+        """ Returns raw monitor data by contest id for all contests at once
+
+        Data is fetched by one batched request. If internal rmatics
+        is not able to batch, falls back to request per contest.
+        If `runs_after` has run id for contest, only newer runs are fetched.
+        Data of contest is None, if it's missing in batched response.
+        """
+        if not contests:
+            return {}
+
+        runs_after = runs_after or {}
+        contest_problem_ids = {contest.id: cls._extract_problem_ids([contest])
+                               for contest in contests}
+
+        data, status = internal_rmatics.get_monitors(contest_problem_ids,
+                                                     user_ids,
+                                                     cls._get_runs_until(monitor),
+                                                     runs_after)
+        if status == 200:
+            contests_raw_data = {contest.id: None for contest in contests}
+            contests_raw_data.update((contest_data['context_id'], contest_data['data'])
+                                     for contest_data in data)
+            return contests_raw_data
+
+        if current_app.config['MONITOR_ASYNC_FETCH']:
+            return cls._get_raw_data_async(monitor, user_ids, contests, runs_after)
+        return cls._get_raw_data_concurrently(monitor, user_ids, contests, runs_after)
+
+    @classmethod
+    def _get_raw_data_concurrently(cls,
+                                   monitor: WorkshopMonitor,
+                                   user_ids: List[int],
+                                   contests: List[MonitorContest],
+                                   runs_after: Optional[Dict[int, int]] = None) -> Dict[int, Optional[list]]:
+        """ Returns raw monitor data by contest id, fetched by concurrent request per contest
+
+        Data of contest is None, if rmatics responded with error
+        or didn't respond in MONITOR_FETCH_TIMEOUT seconds.
+        """
+        runs_until = cls._get_runs_until(monitor)
+        runs_after = runs_after or {}
+
+        # Worker threads have no access to request's DB session,
+        # so everything needed is prepared here
+        futures = {
+            contest.id: executor.submit(internal_rmatics.get_monitor,
+                                        contest.id,
+                                        cls._extract_problem_ids([contest]),
+                                        user_ids,
+                                        runs_until,
+                                        run_id_after=runs_after.get(contest.id))
+            for contest in contests
+        }
+
+        deadline = time.monotonic() + current_app.config['MONITOR_FETCH_TIMEOUT']
+        contests_raw_data = {}
+        for contest_id, future in futures.items():
+            try:
+                data, status = future.result(timeout=max(deadline - time.monotonic(), 0))
+            except Exception:
+                current_app.logger.exception(f'Unable to get monitor data of contest #{contest_id}')
+                future.cancel()
+                data, status = None, None
+
+            contests_raw_data[contest_id] = data if status == 200 else None
+
+        return contests_raw_data
+
+    @classmethod
+    def _get_raw_data_async(cls,
+                            monitor: WorkshopMonitor,
+                            user_ids: List[int],
+                            contests: List[MonitorContest],
+                            runs_after: Optional[Dict[int, int]] = None) -> Dict[int, Optional[list]]:
+        """ Same as `_get_raw_data_concurrently`, but requests are awaited
+            in shared event loop instead of occupying executor threads
+        """
+        runs_until = cls._get_runs_until(monitor)
+        runs_after = runs_after or {}
+        timeout = current_app.config['MONITOR_FETCH_TIMEOUT']
+
+        requests = [async_internal_rmatics.get_monitor(contest.id,
+                                                       cls._extract_problem_ids([contest]),
+                                                       user_ids,
+                                                       runs_until,
+                                                       run_id_after=runs_after.get(contest.id))
+                    for contest in contests]
+
+        async def fetch() -> list:
+            tasks = [asyncio.ensure_future(request) for request in requests]
+            done, pending = await asyncio.wait(tasks, timeout=timeout)
+            for task in pending:
+                task.cancel()
+            return [task.exception() or task.result() if task in done else None
+                    for task in tasks]
+
+        contests_raw_data = {}
+        for contest, response in zip(contests, event_loop.run(fetch())):
+            if not isinstance(response, tuple):
+                current_app.logger.error(f'Unable to get monitor data of contest #{contest.id}: {response!r}')
+                contests_raw_data[contest.id] = None
+                continue
+
+            data, status = response
+            contests_raw_data[contest.id] = data if status == 200 else None
+
+        return contests_raw_data
+
+    @classmethod
+    def _get_start_times(cls, contests: List[MonitorContest], user_ids: List[int]) -> Dict[Tuple[int, int], int]:
+        """
+        Returns start times of users in virtual contests by (contest_id, user_id)
+        as epoch microseconds; loaded by one query for every contest
+        """
+        virtual_contest_ids = [contest.id for contest in contests if contest.is_virtual]
+        if not virtual_contest_ids or not user_ids:
+            return {}
+
+        start_times = {}
+        contest_connections_q = db.session.query(ContestConnection.contest_id,
+                                                 ContestConnection.user_id,
+                                                 ContestConnection.created_at) \
+            .filter(ContestConnection.contest_id.in_(virtual_contest_ids)) \
+            .filter(ContestConnection.user_id.in_(user_ids))
+        for contest_id, user_id, created_time in contest_connections_q:
+            # Connection without created_at is started at epoch
+            created_time = created_time or EPOCH
+            start_times[(contest_id, user_id)] = to_epoch_microseconds(created_time.replace(tzinfo=UTC))
 
-        data, _ = internal_rmatics.get_monitor(contest.id,
-                                               problem_ids,
-                                               user_ids,
-                                               runs_until)
-        return data
+        return start_times
 
     @classmethod
-    def _make_start_time_retriever(cls, contest, user_ids: List[int]) -> Callable:
+    def _make_start_time_retriever(cls, contest, start_times: Dict[Tuple[int, int], int]) -> Callable:
         """
         Returns function for getting contest start time by user_id
+        as epoch microseconds
+
+        start_times are start times of virtual contests from `_get_start_times`
         """
         if not contest.is_virtual:
             start_time = contest.time_start or contest.created_at
+            start_time = to_epoch_microseconds(start_time.replace(tzinfo=UTC))
 
             def const_time(*__, **___):
-                return start_time.replace(tzinfo=UTC)
+                return start_time
 
             return const_time
 
-        user_id_time = {}
-        created_time_user_id_q = db.session.query(ContestConnection.created_at,
-                                                  ContestConnection.user_id) \
-            .filter(ContestConnection.user_id.in_(user_ids))
-        for created_time, user_id in created_time_user_id_q:
-            user_id_time[user_id] = created_time
-
         def time_by_cc(user_id: int):
-            time = user_id_time.get(user_id) or datetime.datetime.utcfromtimestamp(0)
-            return time.replace(tzinfo=UTC)
+            return start_times.get((contest.id, user_id)) or 0
 
         return time_by_cc
 
     @classmethod
-    def _prepare_data(cls, monitor: WorkshopMonitor, contest: Contest, raw_data: List[dict]) -> dict:
+    def _prepare_data(cls,
+                      monitor: WorkshopMonitor,
+                      contest: MonitorContest,
+                      raw_data: List[dict],
+                      start_times: Dict[Tuple[int, int], int]) -> Tuple[dict, ContestVersion]:
         monitor_processor = MonitorPreprocessor(raw_data)
 
-        result_maker_cls = cls._get_result_maker_cls(monitor)
-        if result_maker_cls.is_need_time:
-            problem_ids = cls._extract_problem_ids([contest])
-            user_ids = monitor_processor.get_user_ids(problem_ids)
-            get_user_start_time = cls._make_start_time_retriever(contest, user_ids)
-            result_maker = result_maker_cls(get_user_start_time)
-        else:
-            result_maker = result_maker_cls()
+        result_maker = cls._make_result_maker(monitor, contest, start_times)
 
         data = monitor_processor.render(result_maker)
 
-        return data
+        return data, cls._make_contest_version(data, monitor_processor.runs.last_create_time)
+
+    @classmethod
+    def _prepare_data_incrementally(cls,
+                                    monitor: WorkshopMonitor,
+                                    contest: MonitorContest,
+                                    raw_data: List[dict],
+                                    state: Optional[dict],
+                                    start_times: Dict[Tuple[int, int], int]) -> Tuple[dict, Optional[dict], ContestVersion]:
+        """ Renders new runs of `raw_data` on top of folded `state` of contest
+
+        Returns rendered data, state for the next call and version.
+        State is None, if runs can't be rendered incrementally.
+        """
+        monitor_processor = MonitorPreprocessor(raw_data)
+
+        result_maker = cls._make_result_maker(monitor, contest, start_times)
+
+        data, next_state = monitor_processor.render_incrementally(result_maker, state)
+        if next_state is None:
+            return data, None, cls._make_contest_version(data, monitor_processor.runs.last_create_time)
+
+        # Settled runs are not fetched again, so the latest time is kept in state
+        last_modified = max(monitor_processor.runs.last_create_time, (state or {}).get('last_modified', 0))
+        next_state['last_modified'] = last_modified
+
+        return data, next_state, cls._make_contest_version(data, last_modified)
+
+    @classmethod
+    def _make_contest_version(cls, data: dict, last_modified: int) -> ContestVersion:
+        """ Version is a digest of rendered results, so it's changed by
+            new runs as well as by rejudges and finished testing
+        """
+        dumped = json.dumps(data, sort_keys=True)
+        return ContestVersion(hashlib.md5(dumped.encode('utf-8')).hexdigest(), last_modified)
+
+    @classmethod
+    def _make_result_maker(cls,
+                           monitor: WorkshopMonitor,
+                           contest: MonitorContest,
+                           start_times: Dict[Tuple[int, int], int]) -> BaseResultMaker:
+        result_maker_cls = cls._get_result_maker_cls(monitor)
+        if result_maker_cls.is_need_time:
+            get_user_start_time = cls._make_start_time_retriever(contest, start_times)
+            return result_maker_cls(get_user_start_time)
+
+        return result_maker_cls()
 
     @classmethod
     def _get_result_maker_cls(cls, monitor: WorkshopMonitor) -> Type[BaseResultMaker]:
-        result_maker_map = {
-            WorkshopMonitorType.ACM: ACMResultMaker,
-            WorkshopMonitorType.IOI: IOIResultMaker,
-            WorkshopMonitorType.LightACM: LightACMResultMaker
-        }
+        if current_app.config.get('MONITOR_VECTORIZED') and VectorizedACMResultMaker is not None:
+            result_maker_map = {
+                WorkshopMonitorType.ACM: VectorizedACMResultMaker,
+                WorkshopMonitorType.IOI: VectorizedIOIResultMaker,
+                WorkshopMonitorType.LightACM: VectorizedLightACMResultMaker
+            }
+        else:
+            result_maker_map = {
+                WorkshopMonitorType.ACM: ACMResultMaker,
+                WorkshopMonitorType.IOI: IOIResultMaker,
+                WorkshopMonitorType.LightACM: LightACMResultMaker
+            }
 
         return result_maker_map[monitor.type]
+
+    @classmethod
+    def _get_standings_maker_cls(cls, monitor: WorkshopMonitor) -> Type[BaseStandingsMaker]:
+        standings_maker_map = {
+            WorkshopMonitorType.ACM: ACMStandingsMaker,
+            WorkshopMonitorType.IOI: IOIStandingsMaker,
+            WorkshopMonitorType.LightACM: LightACMStandingsMaker
+        }
+
+        return standings_maker_map[monitor.type]
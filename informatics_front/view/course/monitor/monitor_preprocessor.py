@@ -1,9 +1,10 @@
-import datetime
 from abc import ABC, abstractmethod
 from collections import defaultdict
-from typing import List, Callable
+from typing import List, Callable, Optional, Tuple, Iterator
 
 from informatics_front.utils.run import EjudgeStatuses
+from informatics_front.view.course.monitor.run_table import RunTable, RunSlice, MICROSECONDS_IN_SECOND, \
+    seconds_between
 
 
 PENALTY_TIME_SEC = 20 * 60
@@ -14,7 +15,7 @@ class BaseResultMaker(ABC):
 
     is_need_time = False
 
-    def render(self, runs: List[dict], user_id: int) -> dict:
+    def render(self, runs: RunSlice, user_id: int) -> dict:
         if self._is_still_testing(runs):
             return self._make_result(
                 on_testing=True,
@@ -50,16 +51,81 @@ class BaseResultMaker(ABC):
             wrong_tries=wrong_tries
         )
 
+    def render_table(self, runs: RunTable) -> Iterator[Tuple[int, int, dict]]:
+        """ Yields (user_id, problem_id, result) for every cell of runs """
+        for user_id, problem_id, user_runs in runs.cells():
+            yield user_id, problem_id, self.render(user_runs, user_id)
+
+    def make_state(self, runs: RunSlice, user_id: int) -> dict:
+        """ Folds runs of cell into state, which can be merged
+            with state of later runs and rendered as `render` does
+        """
+        self.update_score_by_statuses(runs)
+        return {
+            'last_status': runs.statuses[-1],
+            'wrong_tries': self.get_wrong_tries_count(runs),
+            'mark': self.get_current_mark(runs),
+            'time': self.get_time(user_id, runs),
+        }
+
+    def merge_states(self, state: dict, next_state: dict) -> dict:
+        """ Returns state of runs of `state` followed by runs of `next_state` """
+        return {
+            'last_status': next_state['last_status'],
+            'wrong_tries': state['wrong_tries'] + next_state['wrong_tries'],
+            'mark': self.merge_marks(state['mark'], next_state['mark']),
+            'time': next_state['time'] if self.is_success(next_state['mark']) else state['time'],
+        }
+
+    def render_state(self, state: dict) -> dict:
+        """ The same as `render`, but for folded runs """
+        if self._is_testing_status(state['last_status']):
+            return self._make_result(
+                on_testing=True,
+                is_ignored=False,
+                mark='',
+                time=0,
+                success=False,
+                wrong_tries=0
+            )
+
+        if self._is_ignored_status(state['last_status']):
+            return self._make_result(
+                on_testing=False,
+                is_ignored=True,
+                mark='',
+                time=0,
+                success=False,
+                wrong_tries=state['wrong_tries']
+            )
+
+        return self._make_result(
+            on_testing=False,
+            is_ignored=False,
+            mark=state['mark'],
+            time=state['time'],
+            success=self.is_success(state['mark']),
+            wrong_tries=state['wrong_tries']
+        )
+
     @classmethod
-    def _is_still_testing(cls, runs: List[dict]):
+    def _is_testing_status(cls, status: int):
         testing_statuses = (EjudgeStatuses.IN_QUEUE.value,
                             EjudgeStatuses.COMPILING.value,
                             EjudgeStatuses.RUNNING.value)
-        return runs[-1]['ejudge_status'] in testing_statuses
+        return status in testing_statuses
+
+    @classmethod
+    def _is_ignored_status(cls, status: int):
+        return status == EjudgeStatuses.IGNORED.value
+
+    @classmethod
+    def _is_still_testing(cls, runs: RunSlice):
+        return cls._is_testing_status(runs.statuses[-1])
 
     @classmethod
-    def _is_last_ignored(cls, runs: List[dict]):
-        return runs[-1]['ejudge_status'] == EjudgeStatuses.IGNORED.value
+    def _is_last_ignored(cls, runs: RunSlice):
+        return cls._is_ignored_status(runs.statuses[-1])
 
     @classmethod
     def _make_result(cls,
@@ -79,20 +145,26 @@ class BaseResultMaker(ABC):
         }
 
     @abstractmethod
-    def update_score_by_statuses(self, runs: List[dict]):
+    def update_score_by_statuses(self, runs: RunSlice):
         pass
 
     @classmethod
     @abstractmethod
-    def get_wrong_tries_count(cls, runs: List[dict]):
+    def get_wrong_tries_count(cls, runs: RunSlice):
         pass
 
     @abstractmethod
-    def get_current_mark(self, runs: List[dict]):
+    def get_current_mark(self, runs: RunSlice):
+        pass
+
+    @classmethod
+    @abstractmethod
+    def merge_marks(cls, mark: str, next_mark: str) -> str:
+        """ Returns mark of runs, when `mark` and `next_mark` are marks of it's parts """
         pass
 
     @abstractmethod
-    def is_success(self, runs: List[dict]):
+    def is_success(self, mark: str):
         pass
 
     @abstractmethod
@@ -119,9 +191,9 @@ class IOIResultMaker(BaseResultMaker):
 
     @classmethod
     def update_score_by_statuses(cls, runs):
-        """ Changes data inside runs param
+        """ Changes scores inside runs param
             OK -> 100
-            PT -> run['ejudge_score']
+            PT -> the same score
             otherwise -> 0
         """
         def is_right_status(status_code):
@@ -131,23 +203,27 @@ class IOIResultMaker(BaseResultMaker):
         def is_partial(status_code):
             return status_code == EjudgeStatuses.PARTIAL.value
 
-        for run in runs:
-            status_code = run['ejudge_status']
+        scores = runs.scores
+        for i, status_code in enumerate(runs.statuses):
             if is_right_status(status_code):
-                run['ejudge_score'] = cls.MAX_POINTS
+                scores[i] = cls.MAX_POINTS
             elif is_partial(status_code):
                 # If PT we have the same score
                 pass
             else:
-                run['ejudge_score'] = 0
+                scores[i] = 0
 
     @classmethod
     def get_wrong_tries_count(cls, runs):
-        return sum(run['ejudge_status'] in cls.wrong_statuses for run in runs)
+        return sum(status in cls.wrong_statuses for status in runs.statuses)
 
     @classmethod
-    def get_current_mark(cls, runs: List[dict]) -> str:
-        return str(max(run['ejudge_score'] for run in runs))
+    def get_current_mark(cls, runs: RunSlice) -> str:
+        return str(max(runs.scores))
+
+    @classmethod
+    def merge_marks(cls, mark: str, next_mark: str) -> str:
+        return str(max(int(mark), int(next_mark)))
 
     @classmethod
     def is_success(cls, mark: str):
@@ -164,6 +240,7 @@ class LightACMResultMaker(BaseResultMaker):
     is_need_time = True
 
     def __init__(self, get_user_start_time: Callable):
+        """ get_user_start_time returns epoch microseconds of user start """
         self.get_user_start_time = get_user_start_time
 
     wrong_statuses = {
@@ -185,10 +262,10 @@ class LightACMResultMaker(BaseResultMaker):
 
     @classmethod
     def get_wrong_tries_count(cls, runs):
-        return sum(run['ejudge_status'] in cls.wrong_statuses for run in runs)
+        return sum(status in cls.wrong_statuses for status in runs.statuses)
 
     @classmethod
-    def get_current_mark(cls, runs: List[dict]) -> str:
+    def get_current_mark(cls, runs: RunSlice) -> str:
         """
         Return
         -----
@@ -196,65 +273,110 @@ class LightACMResultMaker(BaseResultMaker):
          OK if any of statuses was OK
          WA otherwise
         """
-        is_ac = any(run['ejudge_status'] == EjudgeStatuses.AC.value for run in runs)
-        is_ok = is_ac or any(run['ejudge_status'] == EjudgeStatuses.OK.value for run in runs)
+        statuses = runs.statuses
+        is_ac = EjudgeStatuses.AC.value in statuses
+        is_ok = is_ac or EjudgeStatuses.OK.value in statuses
         if is_ac:
             return 'AC'
         if is_ok:
             return 'OK'
         return 'WA'
 
+    @classmethod
+    def merge_marks(cls, mark: str, next_mark: str) -> str:
+        marks_priority = ('WA', 'OK', 'AC')
+        return max(mark, next_mark, key=marks_priority.index)
+
     @classmethod
     def is_success(cls, mark: str):
         return mark in {'OK', 'AC'}
 
-    def get_time(self, user_id, runs) -> int:
-        reversed_runs = reversed(runs)
-        first_right_run = None
-        for run in reversed_runs:
-            if run['ejudge_status'] == EjudgeStatuses.AC.value \
-                    or run['ejudge_status'] == EjudgeStatuses.OK.value:
-                first_right_run = run
-                break
-
-        if first_right_run is None:
+    @classmethod
+    def get_timed_run(cls, runs: RunSlice) -> Optional[int]:
+        """ Index of right run, which time is shown: the last one """
+        statuses = runs.statuses
+        for i in reversed(range(len(statuses))):
+            if statuses[i] == EjudgeStatuses.AC.value \
+                    or statuses[i] == EjudgeStatuses.OK.value:
+                return i
+        return None
+
+    def get_time(self, user_id, runs: RunSlice) -> int:
+        timed_run = self.get_timed_run(runs)
+        if timed_run is None:
             return 0
 
-        delivery_time = datetime\
-            .datetime\
-            .strptime(first_right_run['create_time'],
-                      '%Y-%m-%dT%H:%M:%S%z')
+        delivery_time = runs.create_times[timed_run] * MICROSECONDS_IN_SECOND
 
         start_time = self.get_user_start_time(user_id)
-        return int((delivery_time - start_time).total_seconds())
+        return seconds_between(start_time, delivery_time)
 
 
 class ACMResultMaker(LightACMResultMaker):
     """No custom LightACMResultMaker.get_time
     for appeding penalty time: it's counted on frontned.
+
+    Time of solved cell is time of the first right run, and solved
+    cells also have wrong tries before it, as only they are penalized.
     """
-    pass
+
+    right_statuses = {
+        EjudgeStatuses.OK.value,
+        EjudgeStatuses.AC.value,
+    }
+
+    @classmethod
+    def get_timed_run(cls, runs: RunSlice) -> Optional[int]:
+        """ Index of the first right run """
+        for i, status in enumerate(runs.statuses):
+            if status in cls.right_statuses:
+                return i
+        return None
+
+    @classmethod
+    def get_wrong_tries_before_success(cls, runs: RunSlice) -> int:
+        wrong_tries = 0
+        for status in runs.statuses:
+            if status in cls.right_statuses:
+                break
+            wrong_tries += status in cls.wrong_statuses
+        return wrong_tries
+
+    def render(self, runs: RunSlice, user_id: int) -> dict:
+        result = super().render(runs, user_id)
+        result['wrong_tries_before_success'] = self.get_wrong_tries_before_success(runs) \
+            if result['success'] else 0
+        return result
+
+    def make_state(self, runs: RunSlice, user_id: int) -> dict:
+        state = super().make_state(runs, user_id)
+        state['wrong_tries_before_success'] = self.get_wrong_tries_before_success(runs)
+        return state
+
+    def merge_states(self, state: dict, next_state: dict) -> dict:
+        merged = super().merge_states(state, next_state)
+        if self.is_success(state['mark']):
+            merged['time'] = state['time']
+            merged['wrong_tries_before_success'] = state['wrong_tries_before_success']
+        else:
+            merged['wrong_tries_before_success'] = state['wrong_tries'] + next_state['wrong_tries_before_success']
+        return merged
+
+    def render_state(self, state: dict) -> dict:
+        result = super().render_state(state)
+        result['wrong_tries_before_success'] = state['wrong_tries_before_success'] if result['success'] else 0
+        return result
 
 
 class MonitorPreprocessor:
     """ Превращает сырые данные из мониторов в представление """
 
-    def __init__(self, data: List[dict]):
-        self.problem_ids_user_ids_runs = {}
-        problem_ids_runs = {d['problem_id']: d['runs'] for d in data}
-        for problem_id, runs in problem_ids_runs.items():
-            user_ids_runs = self._group_by_users(runs)
-            self.problem_ids_user_ids_runs[problem_id] = user_ids_runs
+    def __init__(self, data: List[dict], with_create_time: bool = True):
+        self.runs = RunTable(data, with_create_time)
 
     def get_user_ids(self, problem_ids: List[int]) -> List[int]:
         """ Returns user ids who have at least one run for this problem """
-        acc = set()
-        for problem_id in problem_ids:
-            users_runs = self.problem_ids_user_ids_runs.get(problem_id) or {}
-            acc.update(users_runs.keys())
-        user_ids = list(acc)
-
-        return user_ids
+        return self.runs.get_user_ids(problem_ids)
 
     def render(self, result_maker: BaseResultMaker) -> dict:
         """
@@ -269,29 +391,73 @@ class MonitorPreprocessor:
             }
         """
         result = defaultdict(dict)
-        for problem_id, user_ids_runs in self.problem_ids_user_ids_runs.items():
-            for user_id, user_runs in user_ids_runs.items():
-                result[user_id][problem_id] = result_maker.render(user_runs, user_id)
+        for user_id, problem_id, cell_result in result_maker.render_table(self.runs):
+            result[user_id][problem_id] = cell_result
 
         return result
 
-    @classmethod
-    def _group_by_users(cls, runs: List[dict]) -> dict:
-        """ Group list of runs by users
-        Transform:
-            [Run1(user=1), Run2(user=2), Run3(user=3), Run4(user=1)]
-         ->
+    def render_incrementally(self,
+                             result_maker: BaseResultMaker,
+                             previous: Optional[dict]) -> Tuple[dict, Optional[dict]]:
+        """ Renders runs, which are newer than `previous` state, on top of it
+
+        Runs of every cell should be ordered by id. State looks like
             {
-                1: [Run1(user=1), Run4(user=1)],
-                2: [Run2(user=2)],
-                3: [Run3(user=3)],
-                ...
+                'last_run_id': 123,
+                'cells': {(user_id, problem_id): <BaseResultMaker.make_state>, ...}
             }
-        """
+        where cells fold every run up to `last_run_id`. Runs up to it
+        are skipped, even if rmatics sends them again. State is moved
+        forward only over runs which are not testing anymore, so
+        runs on testing are fetched and folded again next time.
 
-        result = defaultdict(list)
+        Runs without id can't be told from folded ones, so if there are
+        any, every run is rendered as `render` does and state is None.
+
+        Returns
+        -------
+            rendered result as `render` returns and state for the next call
+        """
+        if 0 in self.runs.ids:
+            return self.render(result_maker), None
+
+        previous = previous or {'last_run_id': 0, 'cells': {}}
+        previous_run_id = previous['last_run_id']
+
+        testing_run_ids = [run_id for run_id, status in zip(self.runs.ids, self.runs.statuses)
+                           if run_id > previous_run_id and result_maker._is_testing_status(status)]
+
+        if testing_run_ids:
+            last_run_id = min(testing_run_ids) - 1
+        else:
+            last_run_id = max(self.runs.ids, default=0)
+        last_run_id = max(last_run_id, previous_run_id)
+
+        cells = dict(previous['cells'])
+        settled_cells = dict(previous['cells'])
+        for user_id, problem_id, user_runs in self.runs.cells():
+            # Runs of cell are ordered by id, so folded ones are the head
+            new_count = sum(run_id > previous_run_id for run_id in user_runs.ids)
+            if not new_count:
+                continue
+            user_runs = user_runs.tail(new_count)
+
+            cell_key = (user_id, problem_id)
+            cell = previous['cells'].get(cell_key)
+
+            state = result_maker.make_state(user_runs, user_id)
+            cells[cell_key] = result_maker.merge_states(cell, state) if cell else state
+
+            # Settled runs are the head as well
+            settled_count = sum(run_id <= last_run_id for run_id in user_runs.ids)
+            if not settled_count:
+                continue
+            if settled_count != len(user_runs):
+                state = result_maker.make_state(user_runs.head(settled_count), user_id)
+            settled_cells[cell_key] = result_maker.merge_states(cell, state) if cell else state
 
-        for run in runs:
-            result[run['user']['id']].append(run)
+        result = defaultdict(dict)
+        for (user_id, problem_id), cell in cells.items():
+            result[user_id][problem_id] = result_maker.render_state(cell)
 
-        return result
+        return result, {'last_run_id': last_run_id, 'cells': settled_cells}
@@ -0,0 +1,146 @@
+import time
+from typing import List, Optional, Set
+
+from flask import request, Response, json, current_app
+from flask.views import MethodView
+from marshmallow import fields
+from webargs.flaskparser import parser
+from werkzeug.exceptions import NotFound, ServiceUnavailable
+
+from informatics_front.model import db
+from informatics_front.model.contest.monitor import WorkshopMonitor
+from informatics_front.plugins import monitor_streamer
+from informatics_front.utils.auth.middleware import login_required
+from informatics_front.utils.auth.request_user import current_user
+from informatics_front.view.course.monitor.monitor import WorkshopMonitorApi
+
+KEEPALIVE_TIMEOUT = 15
+
+
+class WorkshopMonitorStreamApi(MethodView):
+    """ Pushes changed monitor cells as server-sent events
+
+    Results of (workshop, group) are polled by one shared thread
+    of the process, however many viewers there are. Events are
+        event: snapshot  - every cell, sent first
+        event: update    - only cells changed since the previous event
+    with data {"version": ..., "results": [...]} in the same format as
+    results of WorkshopMonitorApi.
+
+    Streams are enabled by MONITOR_STREAM and there are at most
+    MONITOR_STREAM_MAX_CONNECTIONS of them in process, otherwise clients
+    poll WorkshopMonitorApi with ETag. Stream is closed after
+    MONITOR_STREAM_LIFETIME seconds; when EventSource reconnects with
+    Last-Event-ID of the current version, snapshot is not sent again.
+    """
+
+    get_args = {
+        'group_id': fields.Integer(missing=None),
+    }
+
+    @login_required
+    def get(self, workshop_id):
+        if not current_app.config['MONITOR_STREAM']:
+            raise NotFound('Поток результатов сборов отключен')
+
+        args = parser.parse(self.get_args, request, error_status_code=400)
+        group_id = args['group_id']
+
+        if not WorkshopMonitorApi._ensure_permissions(workshop_id):
+            raise NotFound(f'Результаты сбора #{workshop_id} не найдены или у пользователя нет приглашения на него')
+
+        monitor: WorkshopMonitor = db.session.query(WorkshopMonitor) \
+            .filter(WorkshopMonitor.workshop_id == workshop_id) \
+            .first_or_404()
+
+        if not current_user.is_teacher and monitor.is_disabled_for_students():
+            raise NotFound(f'Результаты сбора #{workshop_id} не найдены или у пользователя нет приглашения на него')
+
+        # Shared results are the same for every viewer, so they are
+        # filtered by what current user is allowed to see
+        contest_ids = {contest.id for contest in WorkshopMonitorApi._get_contests(workshop_id)}
+        user_ids = None
+        if not current_user.is_teacher and monitor.is_for_user_only():
+            user_ids = {current_user.id}
+
+        subscription = monitor_streamer.subscribe((workshop_id, group_id),
+                                                  lambda: self._poll(workshop_id, group_id),
+                                                  self._diff)
+        if subscription is None:
+            raise ServiceUnavailable('Слишком много потоков результатов, используйте опрос монитора')
+
+        deadline = time.monotonic() + current_app.config['MONITOR_STREAM_LIFETIME']
+        retry = current_app.config['MONITOR_STREAM_INTERVAL'] * 1000
+        last_event_id = request.headers.get('Last-Event-ID')
+
+        def stream():
+            try:
+                yield f'retry: {retry}\n\n'
+                while True:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        return
+
+                    event = subscription.get(timeout=min(timeout, KEEPALIVE_TIMEOUT))
+                    if event is None:
+                        yield ': keepalive\n\n'
+                        continue
+
+                    name, value = event
+                    if name == 'snapshot' and value['version'] == last_event_id:
+                        # Client has reconnected and already has this version
+                        continue
+                    data = {
+                        'version': value['version'],
+                        'results': self._filter_results(value['results'], contest_ids, user_ids),
+                    }
+                    yield f'event: {name}\nid: {value["version"]}\ndata: {json.dumps(data)}\n\n'
+            finally:
+                monitor_streamer.unsubscribe(subscription)
+
+        response = Response(stream(), mimetype='text/event-stream')
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'
+        return response
+
+    @classmethod
+    def _poll(cls, workshop_id: int, group_id: Optional[int]) -> Optional[dict]:
+        """ Returns every result of workshop monitor; runs in poller thread without request """
+        monitor: WorkshopMonitor = db.session.query(WorkshopMonitor) \
+            .filter(WorkshopMonitor.workshop_id == workshop_id) \
+            .first()
+        if monitor is None:
+            return None
+
+        contests = WorkshopMonitorApi._load_contests(workshop_id)
+        user_ids = [user.id for user in WorkshopMonitorApi._load_users(monitor, group_id)]
+
+        results, versions = WorkshopMonitorApi._get_results(monitor, contests, user_ids, group_id)
+
+        return {
+            'version': WorkshopMonitorApi._make_version(versions, user_ids, {'group_id': group_id}),
+            'results': results,
+        }
+
+    @classmethod
+    def _diff(cls, previous: dict, current: dict) -> Optional[dict]:
+        if previous['version'] == current['version']:
+            return None
+
+        return {
+            'version': current['version'],
+            'results': WorkshopMonitorApi._get_results_delta(previous['results'], current['results']),
+        }
+
+    @classmethod
+    def _filter_results(cls, results: List[dict], contest_ids: Set[int], user_ids: Optional[Set[int]]) -> List[dict]:
+        results = [contest_results for contest_results in results
+                   if contest_results['contest_id'] in contest_ids]
+        if user_ids is None:
+            return results
+
+        return [{**contest_results,
+                 'results': {user_id: user_results
+                             for user_id, user_results in contest_results['results'].items()
+                             if user_id in user_ids}}
+                for contest_results in results]
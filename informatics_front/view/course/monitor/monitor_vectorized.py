@@ -0,0 +1,168 @@
+from abc import ABC, abstractmethod
+from typing import Iterator, Tuple
+
+import numpy as np
+
+from informatics_front.utils.run import EjudgeStatuses
+from informatics_front.view.course.monitor.monitor_preprocessor import IOIResultMaker, LightACMResultMaker, \
+    ACMResultMaker
+from informatics_front.view.course.monitor.run_table import RunTable, MICROSECONDS_IN_SECOND
+
+TESTING_STATUSES = [EjudgeStatuses.IN_QUEUE.value,
+                    EjudgeStatuses.COMPILING.value,
+                    EjudgeStatuses.RUNNING.value]
+
+
+class ContestColumns:
+    """ NumPy views over RunTable columns and per-cell aggregates, which
+        are the same for every result maker
+    """
+
+    def __init__(self, runs: RunTable):
+        self.statuses = np.frombuffer(runs.statuses, dtype=np.int64)
+        self.scores = np.frombuffer(runs.scores, dtype=np.int64)
+        self.create_times = np.frombuffer(runs.create_times, dtype=np.int64)
+
+        bounds = np.frombuffer(runs.cell_bounds, dtype=np.int64)
+        self.starts = bounds[:-1]
+        self.lengths = np.diff(bounds)
+        last_runs = bounds[1:] - 1
+
+        self.user_ids = np.frombuffer(runs.user_ids, dtype=np.int64)[self.starts]
+        self.problem_ids = np.frombuffer(runs.problem_ids, dtype=np.int64)[self.starts]
+
+        last_statuses = self.statuses[last_runs]
+        self.on_testing = np.isin(last_statuses, TESTING_STATUSES)
+        self.is_ignored = ~self.on_testing & (last_statuses == EjudgeStatuses.IGNORED.value)
+
+    def count(self, mask: np.ndarray) -> np.ndarray:
+        """ Count of runs by cell, where mask is set """
+        return np.add.reduceat(mask.astype(np.int64), self.starts)
+
+    def maximum(self, values: np.ndarray) -> np.ndarray:
+        return np.maximum.reduceat(values, self.starts)
+
+    def minimum(self, values: np.ndarray) -> np.ndarray:
+        return np.minimum.reduceat(values, self.starts)
+
+    def spread(self, values: np.ndarray) -> np.ndarray:
+        """ Value of cell for every run of it """
+        return np.repeat(values, self.lengths)
+
+
+class VectorizedResultMakerMixin(ABC):
+    """ Renders all cells of contest at once with array operations.
+
+    Result is the same as of per cell `render` of base result maker,
+    which is still used for incremental rendering.
+    """
+
+    def render_table(self, runs: RunTable) -> Iterator[Tuple[int, int, dict]]:
+        if not len(runs):
+            return
+
+        yield from self.render_columns(ContestColumns(runs))
+
+    def render_columns(self, columns: ContestColumns) -> Iterator[Tuple[int, int, dict]]:
+        wrong_tries = columns.count(np.isin(columns.statuses, list(self.wrong_statuses)))
+        marks, success, times = self.render_marks(columns)
+
+        # Cells on testing or ignored don't show results
+        is_shown = ~(columns.on_testing | columns.is_ignored)
+        wrong_tries[columns.on_testing] = 0
+
+        cells = zip(columns.user_ids.tolist(), columns.problem_ids.tolist(),
+                    columns.on_testing.tolist(), columns.is_ignored.tolist(), is_shown.tolist(),
+                    marks, (success & is_shown).tolist(), np.where(is_shown, times, 0).tolist(),
+                    wrong_tries.tolist())
+        for user_id, problem_id, on_testing, is_ignored, shown, mark, is_success, time, tries in cells:
+            yield user_id, problem_id, self._make_result(
+                on_testing=on_testing,
+                is_ignored=is_ignored,
+                mark=mark if shown else '',
+                time=time,
+                success=is_success,
+                wrong_tries=tries
+            )
+
+    @abstractmethod
+    def render_marks(self, columns: ContestColumns) -> Tuple[list, np.ndarray, np.ndarray]:
+        """ Returns mark, success and time of every cell """
+        pass
+
+
+class VectorizedIOIResultMaker(VectorizedResultMakerMixin, IOIResultMaker):
+
+    def render_marks(self, columns: ContestColumns) -> Tuple[list, np.ndarray, np.ndarray]:
+        statuses = columns.statuses
+        is_right = (statuses == EjudgeStatuses.OK.value) | (statuses == EjudgeStatuses.AC.value)
+        is_partial = statuses == EjudgeStatuses.PARTIAL.value
+        scores = np.where(is_right, self.MAX_POINTS, np.where(is_partial, columns.scores, 0))
+
+        points = columns.maximum(scores)
+        marks = [str(point) for point in points.tolist()]
+
+        return marks, points == self.MAX_POINTS, np.zeros_like(points)
+
+
+class VectorizedLightACMResultMaker(VectorizedResultMakerMixin, LightACMResultMaker):
+    MARKS = np.array(['WA', 'OK', 'AC'])
+
+    def render_marks(self, columns: ContestColumns) -> Tuple[list, np.ndarray, np.ndarray]:
+        statuses = columns.statuses
+        is_ok = statuses == EjudgeStatuses.OK.value
+        is_ac = statuses == EjudgeStatuses.AC.value
+
+        mark_indexes = columns.maximum(is_ok + 2 * is_ac)
+        marks = self.MARKS[mark_indexes].tolist()
+        success = mark_indexes > 0
+
+        return marks, success, self._get_times(columns, self.get_timed_runs(columns, is_ok | is_ac))
+
+    @classmethod
+    def get_timed_runs(cls, columns: ContestColumns, is_right: np.ndarray) -> np.ndarray:
+        """ Position of the last right run of every cell, -1 if there is not any """
+        positions = np.arange(len(is_right))
+        return columns.maximum(np.where(is_right, positions, -1))
+
+    def _get_times(self, columns: ContestColumns, timed_runs: np.ndarray) -> np.ndarray:
+        """ Seconds from user start to the run, truncated
+            as `LightACMResultMaker.get_time` does
+        """
+        times = np.zeros(len(timed_runs), dtype=np.int64)
+        has_right_run = timed_runs >= 0
+        if not has_right_run.any():
+            return times
+
+        user_ids = columns.user_ids[has_right_run]
+        start_times = {user_id: self.get_user_start_time(user_id)
+                       for user_id in np.unique(user_ids).tolist()}
+        start_times = np.array([start_times[user_id] for user_id in user_ids.tolist()], dtype=np.int64)
+
+        delivery_times = columns.create_times[timed_runs[has_right_run]] * MICROSECONDS_IN_SECOND
+        deltas = delivery_times - start_times
+        times[has_right_run] = np.sign(deltas) * (np.abs(deltas) // MICROSECONDS_IN_SECOND)
+        return times
+
+
+class VectorizedACMResultMaker(VectorizedLightACMResultMaker, ACMResultMaker):
+
+    @classmethod
+    def get_timed_runs(cls, columns: ContestColumns, is_right: np.ndarray) -> np.ndarray:
+        """ Position of the first right run of every cell, -1 if there is not any """
+        positions = np.arange(len(is_right))
+        first_right_runs = columns.minimum(np.where(is_right, positions, len(is_right)))
+        return np.where(first_right_runs < len(is_right), first_right_runs, -1)
+
+    def render_columns(self, columns: ContestColumns) -> Iterator[Tuple[int, int, dict]]:
+        statuses = columns.statuses
+        positions = np.arange(len(statuses))
+        is_right = np.isin(statuses, list(self.right_statuses))
+        first_right_runs = columns.minimum(np.where(is_right, positions, len(statuses)))
+
+        is_wrong = np.isin(statuses, list(self.wrong_statuses))
+        wrong_tries = columns.count(is_wrong & (positions < columns.spread(first_right_runs))).tolist()
+
+        for (user_id, problem_id, result), tries in zip(super().render_columns(columns), wrong_tries):
+            result['wrong_tries_before_success'] = tries if result['success'] else 0
+            yield user_id, problem_id, result
@@ -0,0 +1,20 @@
+from collections import namedtuple
+
+from informatics_front.model.contest.contest import Contest
+
+# Plain rows of monitor data. They are selected by columns, so monitor
+# never builds (and never accidentally flushes) ORM objects; schemas
+# serialize them the same way as models.
+
+MonitorProblem = namedtuple('MonitorProblem', 'id name rank')
+
+MonitorStatement = namedtuple('MonitorStatement', 'id name summary problems')
+
+MonitorLanguage = namedtuple('MonitorLanguage', 'id code title mode')
+
+
+class MonitorContest(namedtuple('MonitorContest', 'id workshop_id position time_start time_stop is_virtual '
+                                                  'virtual_duration created_at statement languages')):
+    __slots__ = ()
+
+    is_started = Contest.is_started
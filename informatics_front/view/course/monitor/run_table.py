@@ -0,0 +1,167 @@
+import calendar
+import datetime
+from array import array
+from typing import List, Iterator, Tuple, Union
+
+CREATE_TIME_FORMAT = '%Y-%m-%dT%H:%M:%S%z'
+
+MICROSECONDS_IN_SECOND = 10 ** 6
+EPOCH = datetime.datetime(1970, 1, 1, tzinfo=datetime.timezone.utc)
+
+# Cell key is packed into one int to sort runs by (problem_id, user_id)
+CELL_KEY_SHIFT = 32
+
+
+def parse_create_time(create_time: Union[str, int, None]) -> int:
+    """ Returns epoch seconds of run create_time
+
+    rmatics sends create_time as '2019-01-01T10:00:00+0300', it is parsed
+    by slicing, which is much faster than strptime. Epoch seconds are
+    taken as they are, other formats fall back to strptime.
+    """
+    if not create_time:
+        return 0
+    if isinstance(create_time, int):
+        return create_time
+
+    if len(create_time) == 20 and create_time[19] == 'Z':
+        offset = 0
+    elif len(create_time) in (24, 25) and create_time[19] in '+-':
+        offset = int(create_time[20:22]) * 3600 + int(create_time[-2:]) * 60
+        if create_time[19] == '-':
+            offset = -offset
+    else:
+        return int(datetime.datetime.strptime(create_time, CREATE_TIME_FORMAT).timestamp())
+
+    if create_time[4] != '-' or create_time[10] != 'T':
+        return int(datetime.datetime.strptime(create_time, CREATE_TIME_FORMAT).timestamp())
+
+    return calendar.timegm((int(create_time[0:4]), int(create_time[5:7]), int(create_time[8:10]),
+                            int(create_time[11:13]), int(create_time[14:16]), int(create_time[17:19]))) - offset
+
+
+def to_epoch_microseconds(time: datetime.datetime) -> int:
+    """ Naive time is treated as UTC """
+    if time.tzinfo is None:
+        time = time.replace(tzinfo=datetime.timezone.utc)
+    return (time - EPOCH) // datetime.timedelta(microseconds=1)
+
+
+def seconds_between(start: int, end: int) -> int:
+    """ Whole seconds between epoch microseconds, truncated to zero
+        as int(timedelta.total_seconds()) does
+    """
+    delta = end - start
+    seconds = abs(delta) // MICROSECONDS_IN_SECOND
+    return seconds if delta >= 0 else -seconds
+
+
+class RunSlice:
+    """ Runs of one monitor cell: a window over RunTable columns
+
+    Columns are exposed as memoryviews, so slicing does not copy data
+    and writes (e.g. IOI score update) go directly into the table.
+    """
+
+    __slots__ = ('table', 'start', 'stop')
+
+    def __init__(self, table: 'RunTable', start: int, stop: int):
+        self.table = table
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def _column(self, name: str) -> memoryview:
+        return memoryview(getattr(self.table, name))[self.start:self.stop]
+
+    @property
+    def ids(self) -> memoryview:
+        return self._column('ids')
+
+    @property
+    def statuses(self) -> memoryview:
+        return self._column('statuses')
+
+    @property
+    def scores(self) -> memoryview:
+        return self._column('scores')
+
+    @property
+    def create_times(self) -> memoryview:
+        return self._column('create_times')
+
+    def head(self, count: int) -> 'RunSlice':
+        """ Returns slice of the first `count` runs """
+        return RunSlice(self.table, self.start, self.start + count)
+
+    def tail(self, count: int) -> 'RunSlice':
+        """ Returns slice of the last `count` runs """
+        return RunSlice(self.table, self.stop - count, self.stop)
+
+
+class RunTable:
+    """ Columnar representation of raw monitor data from rmatics
+
+    Every run is stored as ints in parallel arrays. Runs of one
+    (problem, user) cell are contiguous and keep rmatics order,
+    cells are ordered by (problem_id, user_id).
+
+    create_time is stored as epoch seconds and is parsed only
+    if `with_create_time` is set, otherwise it is 0.
+    """
+
+    def __init__(self, data: List[dict], with_create_time: bool = True):
+        ids, user_ids, problem_ids, statuses, scores, create_times = [], [], [], [], [], []
+        for problem_data in data:
+            problem_id = problem_data['problem_id']
+            for run in problem_data['runs']:
+                ids.append(run.get('id', 0))
+                user_ids.append(run['user']['id'])
+                problem_ids.append(problem_id)
+                statuses.append(run.get('ejudge_status', 0))
+                scores.append(run.get('ejudge_score') or 0)
+                create_times.append(parse_create_time(run.get('create_time'))
+                                    if with_create_time else 0)
+
+        # Stable sort keeps rmatics order of runs inside cell
+        cell_keys = [(problem_id << CELL_KEY_SHIFT) | user_id
+                     for problem_id, user_id in zip(problem_ids, user_ids)]
+        order = sorted(range(len(cell_keys)), key=cell_keys.__getitem__)
+
+        self.ids = array('q', (ids[i] for i in order))
+        self.user_ids = array('q', (user_ids[i] for i in order))
+        self.problem_ids = array('q', (problem_ids[i] for i in order))
+        self.statuses = array('q', (statuses[i] for i in order))
+        self.scores = array('q', (scores[i] for i in order))
+        self.create_times = array('q', (create_times[i] for i in order))
+
+        self.cell_bounds = self._partition([cell_keys[i] for i in order])
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def last_create_time(self) -> int:
+        return max(self.create_times, default=0)
+
+    @classmethod
+    def _partition(cls, sorted_keys: List[int]) -> array:
+        """ Returns start index of every group of equal keys and total length at the end """
+        bounds = array('q', (i for i in range(len(sorted_keys))
+                             if i == 0 or sorted_keys[i] != sorted_keys[i - 1]))
+        bounds.append(len(sorted_keys))
+        return bounds
+
+    def cells(self) -> Iterator[Tuple[int, int, RunSlice]]:
+        """ Yields (user_id, problem_id, runs) for every cell """
+        for start, stop in zip(self.cell_bounds, self.cell_bounds[1:]):
+            yield self.user_ids[start], self.problem_ids[start], RunSlice(self, start, stop)
+
+    def get_user_ids(self, problem_ids: List[int]) -> List[int]:
+        """ Returns user ids who have at least one run for this problems """
+        problem_ids = set(problem_ids)
+        return list({user_id
+                     for user_id, problem_id in zip(self.user_ids, self.problem_ids)
+                     if problem_id in problem_ids})
@@ -16,6 +16,10 @@ class MonitorSchema(Schema):
     users = fields.Nested(UserSchema, many=True)
     results = fields.Raw()
     type = fields.String()
+    standings = fields.Raw()
+    users_count = fields.Integer()
+    version = fields.String()
+    is_delta = fields.Boolean()
 
 
 monitor_schema = MonitorSchema()
@@ -0,0 +1,90 @@
+from abc import ABC, abstractmethod
+from itertools import groupby
+from typing import List, Tuple
+
+from informatics_front.view.course.monitor.monitor_preprocessor import PENALTY_TIME_SEC
+
+
+class BaseStandingsMaker(ABC):
+    """ Считает итоги и места учеников по результатам монитора """
+
+    def make(self, results: List[dict], user_ids: List[int]) -> List[dict]:
+        """ Totals of users ordered by place
+
+        Users with equal totals share places: every one of them gets
+        place_from and place_to of the whole group.
+
+        Returns
+        -------
+            [
+                {'user_id': 1, 'solved': 3, 'penalty': 1234, 'score': 300,
+                 'place_from': 1, 'place_to': 1},
+                ...
+            ]
+        """
+        totals = {user_id: {'user_id': user_id, 'solved': 0, 'penalty': 0, 'score': 0}
+                  for user_id in user_ids}
+        for contest_results in results:
+            for user_id, problems_results in contest_results['results'].items():
+                user_totals = totals.get(user_id)
+                if user_totals is None:
+                    continue
+                for cell in problems_results.values():
+                    self.add_cell(user_totals, cell)
+
+        standings = sorted(totals.values(), key=self.sort_key)
+        place = 1
+        for _, group in groupby(standings, key=self.sort_key):
+            group = list(group)
+            for user_totals in group:
+                user_totals['place_from'] = place
+                user_totals['place_to'] = place + len(group) - 1
+            place += len(group)
+
+        return standings
+
+    @abstractmethod
+    def add_cell(self, user_totals: dict, cell: dict):
+        pass
+
+    @abstractmethod
+    def sort_key(self, user_totals: dict) -> Tuple:
+        pass
+
+
+class IOIStandingsMaker(BaseStandingsMaker):
+    """ Places by sum of points """
+
+    def add_cell(self, user_totals: dict, cell: dict):
+        if not cell['mark']:
+            return
+        user_totals['score'] += int(cell['mark'])
+        user_totals['solved'] += cell['success']
+
+    def sort_key(self, user_totals: dict) -> Tuple:
+        return -user_totals['score'],
+
+
+class LightACMStandingsMaker(BaseStandingsMaker):
+    """ Places by count of solved problems """
+
+    def add_cell(self, user_totals: dict, cell: dict):
+        user_totals['solved'] += cell['success']
+
+    def sort_key(self, user_totals: dict) -> Tuple:
+        return -user_totals['solved'],
+
+
+class ACMStandingsMaker(LightACMStandingsMaker):
+    """ Places by count of solved problems, then by penalty:
+        time of the first right run and PENALTY_TIME_SEC for every wrong try before it
+    """
+
+    def add_cell(self, user_totals: dict, cell: dict):
+        if not cell['success']:
+            return
+        user_totals['solved'] += 1
+        user_totals['penalty'] += cell['time'] + cell['wrong_tries_before_success'] * PENALTY_TIME_SEC
+
+    def sort_key(self, user_totals: dict) -> Tuple:
+        return -user_totals['solved'], user_totals['penalty']
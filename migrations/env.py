@@ -22,6 +22,8 @@ WHITELISTED_TABLES = (
     'workshop',
     'workshop_connection',
     'contest_monitor',
+    'contest_monitor_snapshot',
+    'monitor_cache_invalidate_arg',
     'languages',
     'language_contest',
 )